@@ -7,14 +7,34 @@ from lib.materials.Metal import Metal
 from lib.materials.Lambertian import Lambertian
 from lib.vec.Vec3 import Vec3, Point3, Color
 from lib.Camera import Camera
-from lib.CameraMulti import CameraMulti
+from lib.ATrousDenoiser import ATrousDenoiser
+from lib.TemporalAccumulator import TemporalAccumulator
+from lib.executors.Executor import Executor
+from lib.sinks.Sink import Sink
+from lib.sinks.FileSink import FileSink
+
+import numpy as np
+from multiprocessing import Pool
+from time import perf_counter
+import os
+import sys
 
 class Animation:
 
-    def __init__(self, image_width: int, samples_per_pixel: int, max_depth: int, num_cores: int):
+    # Configurações da animação:
+    FRAMES_PER_SECOND = 24
+    ANIMATION_DURATION = 5  # Em segundos
+    FRAME_COUNT = FRAMES_PER_SECOND * ANIMATION_DURATION  # Quantidade de frames da animação completa
+    SPHERES_ROTATION_SPEED = 2 / 5  # A cada 5 segundos, as esferas dão 2 voltas
+    CAMERA_ROTATION_SPEED = 1 / 5  # A cada 5 segundos, a câmera se move 1 
+    DIRTY_REGION_SCALE = 3.0  # Raio da região de re-renderização de cada esfera, em raios da esfera (inclui a sombra e a luz refletida no chão)
+
+    def __init__(self, image_width: int, samples_per_pixel: int, max_depth: int, num_cores: int, wavefront: bool = False, accelerator: str = None, tile_size: int = 32, rr_min_depth: int = 5, rr_threshold: float = 0.5, adaptive: bool = False, min_samples_per_pixel: int = 16, adaptive_tolerance: float = 0.01, samples_per_pass: int = None, backend: str = None, seed: int = None, sinks: 'list[Sink]' = None, sampler: str = 'random', denoise: bool = False, save_aovs: bool = False, temporal: bool = False, static_camera: bool = False, dirty_regions: bool = False):
         '''
         Construtor da animação. A animação consiste em um cubo metálico (reflexivo) no centro (0,0,0) e ao redor dele terão duas esferas difusas que giram em torno do cubo. A câmera também gira em torno do cubo.
 
+        A animação pode ser usada como um gerenciador de contexto (with). Nesse caso, um executor persistente (por exemplo, um pool de processos) é criado e reaproveitado por todos os frames gerados dentro do bloco, com a parte estática da cena (cubo e chão) já guardada nele.
+
         ---
 
         Parâmetros:
@@ -25,18 +45,71 @@ class Animation:
 
             - max_depth: int - Quantidade máxima de reflexões/refrações de um raio.
 
-            - num_cores: int - Número de cores (núcleos / subprocessos) a serem utilizadas na renderização.
+            - num_cores: int - Número de cores (núcleos / subprocessos ou threads) a serem utilizadas na renderização.
+
+            - wavefront: bool - Se verdadeiro, os frames serão renderizados com o integrador wavefront (vetorizado com NumPy).
+
+            - accelerator: str - Estrutura de aceleração construída sobre os objetos de cada frame: 'bvh' ou 'flat_bvh' (ver lib.accelerators.accelerators). Se não for informada, cada raio testa todos os objetos. O cubo é um único objeto, que testa todas as suas faces de uma só vez (ver Model.hit). O integrador wavefront só usa a 'flat_bvh'.
+
+            - tile_size: int - Tamanho (em pixels) do lado de cada bloco da imagem distribuído entre os workers.
+
+            - rr_min_depth: int - Quantidade mínima de reflexões/refrações de um raio antes que a roleta russa possa terminá-lo.
+
+            - rr_threshold: float - Limiar da roleta russa (0 desativa a roleta russa).
+
+            - adaptive: bool - Se verdadeiro, utiliza amostragem adaptativa (samples_per_pixel passa a ser o limite de amostras por pixel) e salva, junto de cada frame, uma imagem com a quantidade de amostras de cada pixel.
+
+            - min_samples_per_pixel: int - Quantidade mínima de amostras por pixel na amostragem adaptativa.
+
+            - adaptive_tolerance: float - Erro padrão máximo (na luminância linear) aceito para que um pixel pare de ser amostrado na amostragem adaptativa.
+
+            - samples_per_pass: int - Se informado, os frames são renderizados progressivamente, em passadas com essa quantidade de amostras por pixel. Após cada passada, o buffer de acumulação (frame_N_checkpoint.npz) e uma prévia (frame_N_preview.png) são salvos, e um frame interrompido continua da última passada salva.
+
+            - backend: str - Backend de execução: 'serial', 'thread' ou 'process' (ver lib.executors.backends). Se não for informado, será 'serial' quando num_cores = 1 e 'process' caso contrário.
+
+            - seed: int - Semente global dos números aleatórios. Com uma semente, os números aleatórios são derivados da semente, do número do frame, do pixel e da amostra, então cada frame é sempre renderizado da mesma forma, independente do backend, de num_cores, do tamanho dos blocos e do modo paralelo por frame.
+
+            - sinks: list[Sink] - Destinos de cada frame renderizado (ver lib.sinks). Se não for informado, os frames são apenas salvos em arquivo (FileSink), sem depender do IPython.
+
+            - sampler: str - Amostrador do jitter dos pixels e das reflexões: 'random' ou 'sobol' (quasi-Monte Carlo, ver lib.samplers.samplers).
+
+            - denoise: bool - Se True, remove o ruído de cada frame com o ATrousDenoiser, guiado pelas características de cada pixel (normal, albedo e distância).
+
+            - save_aovs: bool - Se True, salva as AOVs de cada frame (normal, albedo, distância e identificadores do objeto e do material do primeiro acerto) em frame_N_aovs.npz, ao lado de frame_N.png.
+
+            - temporal: bool - Se True, reaproveita as amostras dos frames anteriores (reprojeção temporal, ver lib.TemporalAccumulator), permitindo bem menos amostras por frame. As esferas, que se movem, não reaproveitam amostras. Os frames devem ser gerados em ordem, sem o modo paralelo por frame.
+
+            - static_camera: bool - Se True, a câmera fica parada na posição inicial (apenas as esferas giram).
+
+            - dirty_regions: bool - Se True, cada frame re-renderiza apenas a região que pode ter mudado desde o frame anterior (esferas nas posições anterior e atual, com as suas sombras, e os reflexos do cubo), copiando os demais pixels do frame anterior (ver Camera.render). Só tem efeito com a câmera parada (static_camera), e não pode ser usado com a reprojeção temporal nem com o modo paralelo por frame.
         '''
+        if dirty_regions and temporal:
+            raise ValueError('A re-renderização por região não pode ser usada com a reprojeção temporal.')
+
         self.image_width = image_width
         self.samples_per_pixel = samples_per_pixel
         self.max_depth = max_depth
         self.num_cores = num_cores
-        
-        # Configurações da animação:
-        self.FRAMES_PER_SECOND = 24
-        self.ANIMATION_DURATION = 5  # Em segundos
-        self.SPHERES_ROTATION_SPEED = 2 / 5  # A cada 5 segundos, as esferas dão 2 voltas
-        self.CAMERA_ROTATION_SPEED = 1 / 5  # A cada 5 segundos, a câmera se move 1 
+        self.wavefront = wavefront
+        self.accelerator = accelerator
+        self.tile_size = tile_size
+        self.rr_min_depth = rr_min_depth
+        self.rr_threshold = rr_threshold
+        self.adaptive = adaptive
+        self.min_samples_per_pixel = min_samples_per_pixel
+        self.adaptive_tolerance = adaptive_tolerance
+        self.samples_per_pass = samples_per_pass
+        self.backend = backend if backend is not None else ('serial' if num_cores == 1 else 'process')
+        self.seed = seed
+        self.sinks = sinks if sinks is not None else [FileSink()]
+        self.sampler = sampler
+        self.denoise = denoise
+        self.save_aovs = save_aovs
+        self.temporal = temporal
+        self.static_camera = static_camera
+        self.dirty_regions = dirty_regions
+        self.previous_spheres: 'list[Sphere]' = None  # Esferas do último frame gerado, para a região de re-renderização
+        self.executor: Executor = None
 
         # Construindo a cena inicial:
         self.cube = Model("objs/Cube.obj", Metal(Color([0.7, 0.7, 0.7]), 0.0))
@@ -57,30 +130,57 @@ class Animation:
             Lambertian(Color([0.5, 1, 0.5]))
         )
 
+        # Identificadores dos objetos e dos materiais nas AOVs
+        for object_id, obj in enumerate([self.cube, self.first_sphere, self.second_sphere, self.floor], start=1):
+            obj.object_id = object_id
+            obj.material.material_id = object_id
+
         self.camera_initial_position = Point3([0, 2, 5])
 
-        if self.num_cores == 1:
-            self.camera = Camera(
-                image_width=self.image_width,
-                samples_per_pixel=self.samples_per_pixel,
-                max_depth=self.max_depth,
-                vfov=40,
-                lookfrom=self.camera_initial_position,
-                lookat=Point3([0, 0, 0]),
-                vup=Vec3([0, 1, 0])
-            )
-        else:
-            self.camera = CameraMulti(
-                image_width=self.image_width,
-                samples_per_pixel=self.samples_per_pixel,
-                max_depth=self.max_depth,
-                vfov=40,
-                lookfrom=self.camera_initial_position,
-                lookat=Point3([0, 0, 0]),
-                vup=Vec3([0, 1, 0]),
-                num_cores=self.num_cores
-            )
+        self.camera = Camera(
+            image_width=self.image_width,
+            samples_per_pixel=self.samples_per_pixel,
+            max_depth=self.max_depth,
+            vfov=40,
+            lookfrom=self.camera_initial_position,
+            lookat=Point3([0, 0, 0]),
+            vup=Vec3([0, 1, 0]),
+            wavefront=self.wavefront,
+            rr_min_depth=self.rr_min_depth,
+            rr_threshold=self.rr_threshold,
+            adaptive=self.adaptive,
+            min_samples_per_pixel=self.min_samples_per_pixel,
+            adaptive_tolerance=self.adaptive_tolerance,
+            samples_per_pass=self.samples_per_pass,
+            tile_size=self.tile_size,
+            backend=self.backend,
+            num_workers=self.num_cores,
+            seed=self.seed,
+            sinks=self.sinks,
+            sampler=self.sampler,
+            denoiser=ATrousDenoiser() if self.denoise else None,
+            save_aovs=self.save_aovs,
+            temporal=TemporalAccumulator(dynamic_object_ids=[self.first_sphere.object_id, self.second_sphere.object_id]) if self.temporal else None
+        )
     
+    def __enter__(self) -> 'Animation':
+        '''
+        Cria o executor persistente, com a parte estática da cena.
+        '''
+        static_world = HittableList(self.accelerator)
+        static_world.add(self.cube, flatten=False)
+        static_world.add(self.floor)
+        self.executor = self.camera.create_executor(static_world)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        '''
+        Finaliza o executor persistente, caso exista.
+        '''
+        if self.executor is not None:
+            self.executor.close()
+            self.executor = None
+
     def generate_frame(self, frame_number: int, save_path: str):
         '''
         Gera um frame da animação.
@@ -97,9 +197,13 @@ class Animation:
         current_time = frame_number / self.FRAMES_PER_SECOND
 
         # Atualizando posição da camera
-        self.camera.lookfrom = self.camera_initial_position.rotate(
-            'y', current_time * self.CAMERA_ROTATION_SPEED * 360
-        )
+        self.camera.frame = frame_number
+        if self.static_camera:
+            self.camera.lookfrom = self.camera_initial_position
+        else:
+            self.camera.lookfrom = self.camera_initial_position.rotate(
+                'y', current_time * self.CAMERA_ROTATION_SPEED * 360
+            )
 
         # Atualizando posição das esferas
         new_first_sphere = self.first_sphere.rotate(
@@ -110,13 +214,135 @@ class Animation:
             'y', current_time * self.SPHERES_ROTATION_SPEED * 360
         )
 
+        region = self.dirty_region([new_first_sphere, new_second_sphere]) if self.dirty_regions else None
+        self.previous_spheres = [new_first_sphere, new_second_sphere]
+
+        if self.executor is not None:
+            # O cubo e o chão já estão guardados no executor, apenas as esferas precisam ser enviadas
+            world = HittableList(self.accelerator)
+            world.add(new_first_sphere)
+            world.add(new_second_sphere)
+
+            self.camera.render(world, save_path, executor=self.executor, region=region)
+            return
+
         # Criando a cena
-        world = HittableList()
-        world.add(self.cube)
+        world = HittableList(self.accelerator)
+        world.add(self.cube, flatten=False)
         world.add(new_first_sphere)
         world.add(new_second_sphere)
         world.add(self.floor)
 
         # Renderizando a imagem
-        self.camera.render(world, save_path)
+        self.camera.render(world, save_path, region=region)
+
+    def dirty_region(self, spheres: 'list[Sphere]') -> np.ndarray:
+        '''
+        Região do frame atual que pode ter mudado desde o frame anterior (ver Camera.render): as esferas nas posições anterior e atual, com raio DIRTY_REGION_SCALE vezes maior (para incluir a sombra e a luz que elas refletem no chão), e os pixels em que o cubo aparece, já que ele reflete as esferas.
+
+        ---
+
+        Parâmetros:
+
+            - spheres: list[Sphere] - Esferas na posição do frame atual.
+
+        ---
+
+        Retorno:
+
+            - np.ndarray - Matriz (altura, largura) de booleanos, ou None se não houver um frame anterior (a imagem inteira é renderizada).
+        '''
+        if self.previous_spheres is None or self.camera.aovs is None:
+            return None
+
+        self.camera.initialize()
+        moved = self.previous_spheres + spheres
+        region = self.camera.sphere_region(
+            np.array([sphere.center.vec for sphere in moved]),
+            np.array([sphere.radius * self.DIRTY_REGION_SCALE for sphere in moved])
+        )
+        # AOVs do frame anterior: com a câmera parada, o cubo ocupa os mesmos pixels
+        if self.camera.aovs['object_id'].shape == region.shape:
+            region |= self.camera.aovs['object_id'] == self.cube.object_id
+        return region
+
+    def generate_frames_parallel(self, frames: 'list[tuple[int, str]]', num_processes: int):
+        '''
+        Gera vários frames em paralelo, distribuindo frames inteiros entre os processos: cada processo renderiza um frame completo de forma serial (sem dividir a imagem em blocos entre processos). É mais eficiente que o paralelismo por blocos quando cada frame é pequeno, já que não há comunicação entre os processos durante a renderização de um frame.
+
+        O término de cada frame é informado na ordem dos frames. As mensagens e barras de progresso de cada frame são suprimidas nos processos. Se os frames são salvos em arquivo (FileSink), um frame só é dado como gerado depois que o arquivo existe.
+
+        Não deve ser usado dentro de um bloco with da animação, nem com a reprojeção temporal ou a re-renderização por região (que dependem do frame anterior).
+
+        ---
+
+        Parâmetros:
+
+            - frames: list[tuple[int, str]] - Lista de frames a serem gerados: (número do frame, caminho para salvar a imagem).
+
+            - num_processes: int - Quantidade de processos.
+        '''
+        if self.temporal:
+            raise ValueError('A reprojeção temporal precisa que os frames sejam gerados em ordem, no mesmo processo.')
+        if self.dirty_regions:
+            raise ValueError('A re-renderização por região precisa que os frames sejam gerados em ordem, no mesmo processo.')
+
+        saves_files = any(isinstance(sink, FileSink) for sink in self.sinks)
+        start_time = perf_counter()
+        with Pool(num_processes, initializer=init_frame_worker, initargs=(self,)) as pool:
+            for done, ((frame_number, frame_time), (_, save_path)) in enumerate(zip(pool.imap(render_frame, frames, chunksize=1), frames), 1):
+                if saves_files and not os.path.exists(save_path):
+                    raise RuntimeError(f'O frame {frame_number} foi renderizado, mas o arquivo {save_path} não foi salvo.')
+                print(f'[{done}/{len(frames)}] Frame {frame_number} gerado em {frame_time:.2f} segundos ({perf_counter() - start_time:.2f} segundos no total).')
+
+
+# Animação de cada processo do modo paralelo por frame (generate_frames_parallel)
+worker_animation: Animation = None
+
+
+def init_frame_worker(animation: Animation):
+    '''
+    Inicializa um processo do modo paralelo por frame: a animação passa a renderizar de forma serial, com um executor persistente, e a saída do processo é descartada.
+
+    Quando a animação chega ao processo por pickle (método spawn, o padrão no Windows e no macOS), a câmera chega sem os destinos da imagem (ver Camera.__getstate__), que são restaurados a partir dos destinos da animação.
+
+    ---
+
+    Parâmetros:
+
+        - animation: Animation - Animação a ser renderizada.
+    '''
+    global worker_animation
+    sys.stdout = open(os.devnull, 'w')
+    sys.stderr = open(os.devnull, 'w')
+
+    worker_animation = animation
+    worker_animation.executor = None
+    worker_animation.num_cores = 1
+    worker_animation.backend = 'serial'
+    worker_animation.camera.backend = 'serial'
+    worker_animation.camera.num_workers = 1
+    worker_animation.camera.sinks = worker_animation.sinks
+    worker_animation.__enter__()
+
+
+def render_frame(task: 'tuple[int, str]') -> 'tuple[int, float]':
+    '''
+    Gera um frame no processo atual (usado pelo modo paralelo por frame).
+
+    ---
+
+    Parâmetros:
+
+        - task: tuple[int, str] - Número do frame e caminho para salvar a imagem.
+
+    ---
+
+    Retorno:
 
+        - tuple[int, float] - Número do frame e tempo (em segundos) gasto para gerá-lo.
+    '''
+    frame_number, save_path = task
+    start_time = perf_counter()
+    worker_animation.generate_frame(frame_number, save_path)
+    return frame_number, perf_counter() - start_time
@@ -0,0 +1,111 @@
+'''
+Script para comparar as estruturas de aceleração (lib/accelerators) com o teste linear de todos os objetos (HittableList sem estrutura), em duas cenas: a cena da animação (cubo de objs/Cube.obj, esferas e chão) e uma malha procedural grande (uma esfera triangulada).
+
+Para cada cena e estrutura, mostra o tempo de construção, o tempo por raio de HittableList.hit (um raio por vez, como em Camera.ray_color) e o tempo de WavefrontIntegrator.intersect para um bloco com os raios primários da imagem e para um bloco de raios incoerentes (saindo dos pontos atingidos em direções aleatórias, como após uma reflexão difusa), além da média de nós visitados por raio.
+
+Deve ser executado a partir do repositório base, da seguinte forma: `python3 src/compare_accelerators.py`
+'''
+
+# Configuração da comparação
+IMAGE_WIDTH = 160
+FRAME = 0
+SCALAR_RAYS = 100  # Raios (amostrados da imagem) testados um por vez
+MESH_RESOLUTION = 48  # A malha procedural tem 2 * MESH_RESOLUTION² triângulos
+SEED = 0
+
+if __name__ == '__main__':
+    from Animation import Animation
+    from lib.HittableList import HittableList
+    from lib.WavefrontIntegrator import WavefrontIntegrator
+    from lib.accelerators.accelerators import accelerators
+    from lib.objects.Triangle import Triangle
+    from lib.materials.Lambertian import Lambertian
+    from lib.vec.Vec3 import Point3, Vec3, Color
+    from lib.Interval import Interval
+    from lib.Ray import Ray
+    from lib.RandomPool import uniform_unit_vectors
+    from time import perf_counter
+    import numpy as np
+    import math
+
+    def sphere_mesh(resolution: int, radius: float, material) -> 'list[Triangle]':
+        # Esfera triangulada por latitude e longitude
+        def point(i: int, j: int) -> Point3:
+            theta = math.pi * i / resolution
+            phi = 2 * math.pi * j / resolution
+            return Point3([radius * math.sin(theta) * math.cos(phi), radius * math.cos(theta), radius * math.sin(theta) * math.sin(phi)])
+
+        triangles = []
+        for i in range(resolution):
+            for j in range(resolution):
+                a, b, c, d = point(i, j), point(i + 1, j), point(i + 1, j + 1), point(i, j + 1)
+                triangles.append(Triangle(a, b, c, material))
+                triangles.append(Triangle(a, c, d, material))
+        return triangles
+
+    animation = Animation(image_width=IMAGE_WIDTH, samples_per_pixel=1, max_depth=1, num_cores=1)
+    camera = animation.camera
+    camera.initialize()
+
+    animation_scene = [animation.cube, animation.first_sphere, animation.second_sphere, animation.floor]
+    material = Lambertian(Color([0.5, 0.5, 0.5]))
+    mesh_scene = [sphere_mesh(MESH_RESOLUTION, 1.2, material), animation.floor]
+    scenes = {'Cube.obj': animation_scene, 'malha procedural': mesh_scene}
+
+    # Raios primários (centro de cada pixel)
+    directions = (camera.pixel_centers - camera.camera_center.vec).reshape(-1, 3)
+    origins = np.broadcast_to(camera.camera_center.vec, directions.shape).copy()
+    generator = np.random.default_rng(SEED)
+    scalar_rays = generator.choice(len(directions), SCALAR_RAYS, replace=False)
+
+    print(f'Imagem de {camera.image_width}x{camera.image_height} ({len(directions)} raios primários), {SCALAR_RAYS} raios testados um por vez.')
+    print()
+    print(f'{"Cena":>17} | {"Objetos":>7} | {"Estrutura":>9} | {"Construção":>10} | {"Um raio":>10} | {"Primários":>10} | {"Incoerentes":>11} | Nós por raio')
+    for scene_name, scene_objects in scenes.items():
+        incoherent = None
+        for accelerator in [None] + accelerators:
+            world = HittableList(accelerator)
+            for obj in scene_objects:
+                if isinstance(obj, list):
+                    world.objects.extend(obj)
+                else:
+                    world.add(obj)
+
+            start_time = perf_counter()
+            world.build_accelerator()
+            build_time = perf_counter() - start_time
+
+            start_time = perf_counter()
+            for k in scalar_rays:
+                world.hit(Ray(Point3(origins[k]), Vec3(directions[k])), Interval(0.001, math.inf))
+            scalar_time = (perf_counter() - start_time) / SCALAR_RAYS
+
+            integrator = WavefrontIntegrator(world)
+            if integrator.accelerator is not None:
+                # Nós visitados pelos blocos de raios (e não pelos raios testados um por vez)
+                integrator.accelerator.reset_statistics()
+            start_time = perf_counter()
+            primitive, t = integrator.intersect(origins, directions)
+            primary_time = perf_counter() - start_time
+
+            if incoherent is None:
+                # Raios incoerentes: dos pontos atingidos pelos raios primários, em direções aleatórias
+                hit = primitive >= 0
+                incoherent = (
+                    origins[hit] + t[hit][:, None] * directions[hit],
+                    uniform_unit_vectors(generator.random(hit.sum()), generator.random(hit.sum()))
+                )
+            start_time = perf_counter()
+            integrator.intersect(*incoherent)
+            incoherent_time = perf_counter() - start_time
+
+            nodes = '-'
+            if world.accelerator is not None:
+                statistics = world.accelerator.statistics()
+                nodes = f'{statistics["average_nodes_visited"]:.1f} ({statistics["nodes"]} nós, profundidade {statistics["depth"]})'
+            if accelerator is not None and integrator.accelerator is None:
+                # O integrador wavefront não usa esta estrutura (testa todos os objetos, como sem estrutura)
+                primary, incoherent_column = f'{"-":>10}', f'{"-":>11}'
+            else:
+                primary, incoherent_column = f'{primary_time * 1000:>7.0f} ms', f'{incoherent_time * 1000:>8.0f} ms'
+            print(f'{scene_name:>17} | {len(world.objects):>7} | {accelerator or "linear":>9} | {build_time * 1000:>7.1f} ms | {scalar_time * 1e6:>7.0f} us | {primary} | {incoherent_column} | {nodes}')
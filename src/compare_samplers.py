@@ -0,0 +1,64 @@
+'''
+Script para comparar os amostradores (lib/samplers): renderiza um frame da animação com várias quantidades de amostras por pixel e mostra o erro (RMSE) de cada amostrador em relação a uma imagem de referência, renderizada com muitas amostras.
+
+Deve ser executado a partir do repositório base, da seguinte forma: `python3 src/compare_samplers.py`
+'''
+
+# Configuração da comparação
+IMAGE_WIDTH = 100
+MAX_DEPTH = 10
+FRAME = 0
+REFERENCE_SAMPLES = 1024
+SAMPLES = [1, 2, 4, 8, 16, 32, 64]
+SEEDS = [1, 2, 3]  # O erro de cada quantidade de amostras é a média entre as sementes
+
+if __name__ == '__main__':
+    from Animation import Animation
+    from lib.samplers.samplers import samplers, create_sampler
+    from lib.sinks.CallbackSink import CallbackSink
+    import numpy as np
+    import contextlib
+    import os
+
+    images = []
+    animation = Animation(
+        image_width=IMAGE_WIDTH,
+        samples_per_pixel=REFERENCE_SAMPLES,
+        max_depth=MAX_DEPTH,
+        num_cores=1,
+        wavefront=True,
+        seed=0,
+        sinks=[CallbackSink(lambda framebuffer, filename: images.append(framebuffer))]
+    )
+
+    def render(sampler: str, samples_per_pixel: int, seed: int) -> np.ndarray:
+        animation.camera.sampler = create_sampler(sampler)
+        animation.camera.samples_per_pixel = samples_per_pixel
+        animation.camera.seed = seed
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+            animation.generate_frame(FRAME, None)
+        return images.pop()
+
+    print(f'Renderizando a referência ({REFERENCE_SAMPLES} amostras por pixel)...')
+    reference = render('random', REFERENCE_SAMPLES, 0)
+
+    errors = {sampler: [] for sampler in samplers}
+    for samples_per_pixel in SAMPLES:
+        for sampler in samplers:
+            rmse = [np.sqrt(np.mean((render(sampler, samples_per_pixel, seed) - reference) ** 2)) for seed in SEEDS]
+            errors[sampler].append(np.mean(rmse))
+
+    print()
+    print('Amostras | ' + ' | '.join(f'RMSE {sampler:>6}' for sampler in samplers) + ' | ' + ' | '.join(f'{sampler}/random' for sampler in samplers if sampler != 'random'))
+    for k, samples_per_pixel in enumerate(SAMPLES):
+        ratios = [errors[sampler][k] / errors['random'][k] for sampler in samplers if sampler != 'random']
+        print(f'{samples_per_pixel:>8} | ' + ' | '.join(f'{errors[sampler][k]:>11.5f}' for sampler in samplers) + ' | ' + ' | '.join(f'{ratio:>13.2f}' for ratio in ratios))
+
+    # Quantidade de amostras (interpolada em escala log) com que cada amostrador atinge o erro do amostrador random com o máximo de amostras
+    target = errors['random'][-1]
+    print()
+    for sampler in samplers:
+        if sampler == 'random':
+            continue
+        log_samples = np.interp(-np.log(target), -np.log(errors[sampler]), np.log(SAMPLES))
+        print(f'{sampler}: erro do random com {SAMPLES[-1]} amostras atingido com ~{np.exp(log_samples):.0f} amostras por pixel.')
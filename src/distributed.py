@@ -0,0 +1,96 @@
+'''
+Script para renderizar a animação de forma distribuída, entre várias máquinas (ver lib/distributed).
+
+Um coordenador distribui os frames entre os workers, que podem rodar em qualquer máquina com acesso a ele por TCP, e salva as imagens em animation_frames/<configuração>/. Frames de workers que caem ou param de responder são entregues a outros workers, e frames que já existem são ignorados (a renderização pode ser retomada).
+
+Deve ser executado a partir do repositório base, da seguinte forma:
+
+    - Coordenador: `python3 src/distributed.py coordinator low --frames 0 119 --host 0.0.0.0`
+
+    - Worker (em cada máquina): `python3 src/distributed.py worker --host <endereço do coordenador> --cores 4`
+
+Para testar em uma única máquina, o coordenador pode iniciar workers locais: `python3 src/distributed.py coordinator test --frames 0 9 --local-workers 3`
+'''
+
+# Configuração padrão da conexão
+DEFAULT_PORT = 6000
+DEFAULT_AUTHKEY = 'rtiow'
+
+
+def create_animation(settings: dict, sinks: list, num_cores: int, backend: str):
+    '''
+    Cria a animação de um worker, com os parâmetros enviados pelo coordenador e os núcleos da máquina do worker.
+    '''
+    from Animation import Animation
+    return Animation(**settings, num_cores=num_cores, backend=backend, sinks=sinks)
+
+
+def run_worker(host: str, port: int, authkey: bytes, num_cores: int, backend: str, name: str = None):
+    '''
+    Executa um worker até que o coordenador avise que não há mais frames.
+    '''
+    from lib.distributed.RenderWorker import RenderWorker
+    from functools import partial
+
+    worker = RenderWorker(partial(create_animation, num_cores=num_cores, backend=backend), host=host, port=port, authkey=authkey, name=name)
+    worker.run()
+    print(f'Worker {worker.name} encerrado ({worker.frames_rendered} frames renderizados).')
+
+
+if __name__ == '__main__':
+    from resolutions import resolutions
+    from multiprocessing import Process
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description='Renderização distribuída da animação.')
+    subparsers = parser.add_subparsers(dest='role', required=True)
+
+    coordinator_parser = subparsers.add_parser('coordinator', help='Distribui os frames entre os workers e salva as imagens.')
+    coordinator_parser.add_argument('config', choices=list(resolutions.keys()), help='Configuração de resolução (ver resolutions.py).')
+    coordinator_parser.add_argument('--frames', type=int, nargs=2, metavar=('INICIAL', 'FINAL'), default=[0, 119], help='Frames inicial e final (inclusive).')
+    coordinator_parser.add_argument('--host', default='localhost', help="Endereço em que o coordenador aguarda os workers ('0.0.0.0' para aceitar outras máquinas).")
+    coordinator_parser.add_argument('--wavefront', action='store_true', help='Usar o integrador wavefront.')
+    coordinator_parser.add_argument('--accelerator', default=None, help='Estrutura de aceleração dos objetos (bvh ou flat_bvh).')
+    coordinator_parser.add_argument('--sampler', default='random', help='Amostrador (random ou sobol).')
+    coordinator_parser.add_argument('--seed', type=int, default=None, help='Semente dos números aleatórios (os frames não dependem do worker que os renderizou).')
+    coordinator_parser.add_argument('--denoise', action='store_true', help='Usar o denoiser.')
+    coordinator_parser.add_argument('--heartbeat-timeout', type=float, default=60.0, help='Segundos sem sinal de um worker antes que o seu frame seja entregue a outro.')
+    coordinator_parser.add_argument('--local-workers', type=int, default=0, help='Quantidade de workers (de 1 núcleo) iniciados nesta máquina.')
+
+    worker_parser = subparsers.add_parser('worker', help='Renderiza os frames entregues pelo coordenador.')
+    worker_parser.add_argument('--host', default='localhost', help='Endereço do coordenador.')
+    worker_parser.add_argument('--cores', type=int, default=1, help='Quantidade de núcleos usados para renderizar cada frame.')
+    worker_parser.add_argument('--backend', default=None, help='Backend de execução (serial, thread ou process).')
+    worker_parser.add_argument('--name', default=None, help='Nome do worker (padrão: máquina:pid).')
+
+    for subparser in (coordinator_parser, worker_parser):
+        subparser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Porta TCP do coordenador.')
+        subparser.add_argument('--authkey', default=DEFAULT_AUTHKEY, help='Chave de autenticação (a mesma no coordenador e nos workers).')
+
+    args = parser.parse_args()
+    authkey = args.authkey.encode()
+
+    if args.role == 'worker':
+        run_worker(args.host, args.port, authkey, args.cores, args.backend, args.name)
+    else:
+        from lib.distributed.Coordinator import Coordinator
+
+        settings = dict(resolutions[args.config], wavefront=args.wavefront, accelerator=args.accelerator, sampler=args.sampler, seed=args.seed, denoise=args.denoise)
+        coordinator = Coordinator(
+            frames=list(range(args.frames[0], args.frames[1] + 1)),
+            output_folder=os.path.join('animation_frames', args.config),
+            animation_settings=settings,
+            host=args.host,
+            port=args.port,
+            authkey=authkey,
+            heartbeat_timeout=args.heartbeat_timeout
+        )
+
+        # Os workers locais tentam se conectar até que o coordenador comece a aceitar conexões
+        local_workers = [Process(target=run_worker, args=('localhost', args.port, authkey, 1, 'serial', f'local-{k}')) for k in range(args.local_workers if coordinator.total > 0 else 0)]
+        for process in local_workers:
+            process.start()
+        coordinator.run()
+        for process in local_workers:
+            process.join()
@@ -4,6 +4,7 @@ Script para gerar os vídeos a partir dos frames gerados pelo código principal
 
 import cv2
 import os
+import re
 from resolutions import resolutions
 from tqdm import tqdm
 
@@ -19,7 +20,7 @@ for folder_name in possible_resolutions:
         continue
 
     video_name = f'animations/{folder_name}.avi'
-    images = [img for img in os.listdir(image_folder) if img.endswith(".png")]
+    images = [img for img in os.listdir(image_folder) if re.fullmatch(r'frame_\d+\.png', img)]  # Ignora as imagens auxiliares (ex: frame_1_samples.png)
     images.sort(key= lambda file: int(file.split('_')[1].split('.')[0]))  # Ordenando as imagens pelo número do frame (por padrão, a ordenação por string não dá certo)
     if len(images) == 0:
         continue
@@ -45,7 +46,7 @@ for folder_name in tqdm(possible_resolutions):
     if not os.path.exists(image_folder):
         continue
 
-    images = [img for img in os.listdir(image_folder) if img.endswith(".png")]
+    images = [img for img in os.listdir(image_folder) if re.fullmatch(r'frame_\d+\.png', img)]  # Ignora as imagens auxiliares (ex: frame_1_samples.png)
     images.sort(key= lambda file: int(file.split('_')[1].split('.')[0]))  # Ordenando as imagens pelo número do frame (por padrão, a ordenação por string não dá certo)
     if len(images) == 0:
         continue
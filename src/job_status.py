@@ -0,0 +1,74 @@
+'''
+Script para mostrar o progresso das animações, a partir do banco de tarefas (lib/JobDatabase.py, usado pelo main.py para dividir os frames entre máquinas).
+
+Para cada configuração de resolução, mostra quantos frames foram concluídos, quantos estão sendo renderizados (e por quem), quais ainda faltam e uma estimativa do tempo restante. Antes, cadastra no banco os frames da animação que ainda não estão nele (imagens completas já existentes são cadastradas como concluídas) e verifica as imagens dos frames concluídos: imagens que sumiram ou não correspondem ao checksum (por exemplo, truncadas) voltam para a fila.
+
+Com a opção --read-only, o banco não é aberto nem criado: apenas as imagens da pasta de cada configuração são verificadas (como fazia o antigo verify_ramaining_frames.py), mostrando o progresso e os frames que faltam (inclusive os com imagem incompleta).
+
+Deve ser executado a partir do repositório base, da seguinte forma: `python3 src/job_status.py` (ou `python3 src/job_status.py --read-only`)
+'''
+
+
+def frame_ranges(frames: 'list[int]') -> str:
+    '''
+    Formata uma lista de frames como intervalos (por exemplo, [0, 1, 2, 5] -> '0-2, 5').
+    '''
+    ranges = []
+    for frame in sorted(frames):
+        if len(ranges) > 0 and ranges[-1][1] == frame - 1:
+            ranges[-1][1] = frame
+        else:
+            ranges.append([frame, frame])
+    return ', '.join(f'{start}-{end}' if start != end else f'{start}' for start, end in ranges)
+
+def format_duration(seconds: float) -> str:
+    '''
+    Formata uma duração em segundos como horas:minutos:segundos.
+    '''
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours}:{minutes:02d}:{seconds:02d}'
+
+
+if __name__ == '__main__':
+    from Animation import Animation
+    from lib.JobDatabase import JobDatabase, DEFAULT_DATABASE, PENDING, RENDERING, is_complete_image
+    from resolutions import resolutions
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description='Progresso das animações.')
+    parser.add_argument('--read-only', action='store_true', help='Apenas verifica as imagens de cada configuração, sem abrir, criar ou alterar o banco de tarefas.')
+    args = parser.parse_args()
+
+    frames_per_animation = Animation.FRAME_COUNT
+
+    if args.read_only:
+        for config in resolutions:
+            missing = [frame for frame in range(frames_per_animation) if not is_complete_image(os.path.join('animation_frames', config, f'frame_{frame}.png'))]
+            done = frames_per_animation - len(missing)
+            print(f'Progresso da animação {config}: {done / frames_per_animation * 100:.2f} % ({done} de {frames_per_animation} frames)')
+            if len(missing) > 0:
+                print(f'    - Faltam: {frame_ranges(missing)}')
+    else:
+        os.makedirs(os.path.dirname(DEFAULT_DATABASE), exist_ok=True)
+        with JobDatabase(DEFAULT_DATABASE) as jobs:
+            for config in resolutions:
+                jobs.add_jobs(config, list(range(frames_per_animation)))
+                invalid = jobs.verify(config)
+                if len(invalid) > 0:
+                    print(f'As imagens dos seguintes frames da animação {config} sumiram ou estão corrompidas e voltaram para a fila: {frame_ranges(invalid)}')
+
+            status = jobs.status()
+            for config in resolutions:
+                progress = status[config]
+                print(f'Progresso da animação {config}: {progress["done"] / progress["total"] * 100:.2f} % ({progress["done"]} de {progress["total"]} frames)')
+                if progress['rendering'] > 0:
+                    print(f'    - Sendo renderizados: {frame_ranges(jobs.frames(config, RENDERING))} (por {", ".join(progress["owners"])})')
+                if progress['pending'] > 0:
+                    print(f'    - Faltam: {frame_ranges(jobs.frames(config, PENDING))}')
+                if progress['mean_render_time'] is not None:
+                    print(f'    - Tempo médio por frame: {progress["mean_render_time"]:.2f} segundos')
+                if progress['done'] < progress['total']:
+                    eta = format_duration(progress['eta']) if progress['eta'] is not None else 'desconhecido (nenhum frame renderizado pelo banco)'
+                    print(f'    - Tempo restante estimado: {eta}')
@@ -0,0 +1,83 @@
+import numpy as np
+
+
+class AABB:
+
+    def __init__(self, minimum: np.ndarray, maximum: np.ndarray):
+        '''
+        Construtor de uma caixa alinhada aos eixos (axis-aligned bounding box), usada para envolver objetos nas estruturas de aceleração (ver lib.accelerators).
+
+        ---
+
+        Parâmetros:
+
+            - minimum: np.ndarray - Vetor (3,) com o canto mínimo da caixa.
+
+            - maximum: np.ndarray - Vetor (3,) com o canto máximo da caixa.
+        '''
+        self.minimum = np.asarray(minimum, dtype=np.float64)
+        self.maximum = np.asarray(maximum, dtype=np.float64)
+        # Cantos como floats do Python: o teste de intersecção com um raio é mais rápido sem operações do NumPy
+        self.__bounds = tuple(self.minimum.tolist()) + tuple(self.maximum.tolist())
+
+    @staticmethod
+    def surrounding(boxes: 'list[AABB]') -> 'AABB':
+        '''
+        Retorna a menor caixa que envolve todas as caixas informadas.
+        '''
+        return AABB(
+            np.min([box.minimum for box in boxes], axis=0),
+            np.max([box.maximum for box in boxes], axis=0)
+        )
+
+    def centroid(self) -> np.ndarray:
+        '''
+        Retorna o centro da caixa.
+        '''
+        return (self.minimum + self.maximum) / 2
+
+    def surface_area(self) -> float:
+        '''
+        Retorna a área da superfície da caixa.
+        '''
+        dx, dy, dz = self.maximum - self.minimum
+        return 2 * (dx * dy + dy * dz + dz * dx)
+
+    def hit(self, origin: 'tuple[float, float, float]', inverse_direction: 'tuple[float, float, float]', t_min: float, t_max: float) -> bool:
+        '''
+        Verifica se um raio atravessa a caixa dentro de um intervalo de t (slab test).
+
+        O raio é informado já decomposto, como floats do Python, para que a mesma decomposição seja reaproveitada em todas as caixas testadas (ver BVH.hit).
+
+        ---
+
+        Parâmetros:
+
+            - origin: tuple[float, float, float] - Origem do raio.
+
+            - inverse_direction: tuple[float, float, float] - Inverso de cada coordenada da direção do raio (infinito quando a coordenada é 0).
+
+            - t_min: float - Valor mínimo de t.
+
+            - t_max: float - Valor máximo de t.
+
+        ---
+
+        Retorno:
+
+            - bool - True se o raio atravessa a caixa entre t_min e t_max.
+        '''
+        bounds = self.__bounds
+        for axis in range(3):
+            t0 = (bounds[axis] - origin[axis]) * inverse_direction[axis]
+            t1 = (bounds[axis + 3] - origin[axis]) * inverse_direction[axis]
+            if t0 > t1:
+                t0, t1 = t1, t0
+            # Comparações com NaN (0 * infinito, raio paralelo exatamente na borda) são falsas e não alteram o intervalo
+            if t0 > t_min:
+                t_min = t0
+            if t1 < t_max:
+                t_max = t1
+            if t_max < t_min:
+                return False
+        return True
@@ -0,0 +1,139 @@
+import numpy as np
+
+from lib.constants import luminance_weights, feature_normal, feature_albedo, feature_depth
+
+
+# Quantidade de linhas de cada faixa da imagem filtrada de uma vez (ver ATrousDenoiser.denoise)
+BAND_ROWS = 32
+
+# Menor expoente dos pesos: exp(-80) ainda é um float32 normal
+MIN_EXPONENT = -80.0
+
+
+class ATrousDenoiser:
+
+    def __init__(self, iterations: int = 5, sigma_normal: float = 0.2, sigma_depth: float = 0.02, sigma_albedo: float = 0.05, sigma_luminance: float = 4.0):
+        '''
+        Construtor de um denoiser guiado por características (features), baseado no filtro "edge-avoiding à-trous wavelet" (Dammertz et al., 2010).
+
+        A cada iteração, cada pixel vira a média ponderada de 3x3 vizinhos, espaçados de 2^iteração pixels (o "à-trous": o mesmo núcleo com buracos cada vez maiores), então 5 iterações cobrem uma região de 63x63 pixels com apenas 45 vizinhos por pixel. O peso de cada vizinho diminui quando a normal, a distância ou o albedo (do primeiro vértice não especular, ver Camera.ray_color) são diferentes dos do pixel, o que preserva as bordas dos objetos, e quando a luminância é muito diferente, o que preserva as sombras. As diferenças de distância e de luminância são relativas (medidas entre os logaritmos).
+
+        O filtro é aplicado na iluminação (cor dividida pelo albedo), e o albedo é multiplicado de volta no final, para que as cores dos objetos não se misturem.
+
+        ---
+
+        Parâmetros:
+
+            - iterations: int - Quantidade de iterações do filtro.
+
+            - sigma_normal: float - Tolerância à diferença entre as normais (1 - produto escalar).
+
+            - sigma_depth: float - Tolerância à diferença relativa entre as distâncias.
+
+            - sigma_albedo: float - Tolerância à diferença (quadrática) entre os albedos.
+
+            - sigma_luminance: float - Tolerância à diferença relativa entre as luminâncias (da iluminação) na primeira iteração. É dividida por 2 a cada iteração, já que o ruído diminui a cada iteração.
+        '''
+        self.iterations = iterations
+        self.sigma_normal = sigma_normal
+        self.sigma_depth = sigma_depth
+        self.sigma_albedo = sigma_albedo
+        self.sigma_luminance = sigma_luminance
+
+    def denoise(self, colors: np.ndarray, features: np.ndarray) -> np.ndarray:
+        '''
+        Remove o ruído de uma imagem.
+
+        ---
+
+        Parâmetros:
+
+            - colors: np.ndarray - Matriz (altura, largura, 3) com a cor linear média de cada pixel.
+
+            - features: np.ndarray - Matriz (altura, largura, feature_channels) com a média das características de cada pixel (ver lib.constants).
+
+        ---
+
+        Retorno:
+
+            - np.ndarray - Matriz (altura, largura, 3) com as cores lineares sem ruído.
+        '''
+        height, width = colors.shape[:2]
+        # Canais em planos separados (canal, altura, largura), para que cada canal seja contíguo na memória
+        colors = np.moveaxis(colors, 2, 0).astype(np.float32)
+        features = np.moveaxis(features, 2, 0).astype(np.float32)
+        albedo = np.where(features[feature_albedo] > 1e-3, features[feature_albedo], np.float32(1.0))
+
+        # Iluminação: cor sem o albedo (canais com albedo muito pequeno são filtrados diretamente)
+        irradiance = colors / albedo
+
+        # Guias escaladas, de forma que a diferença entre o pixel e o vizinho já seja o termo do expoente do peso. Os termos são simétricos (o peso de p para q é o mesmo de q para p),
+        # então cada peso é calculado uma vez para cada par de vizinhos opostos
+        #   - normais: |n_p - n_q|² / 2 = 1 - n_p · n_q (normais unitárias)
+        #   - albedo: |a_p - a_q|²
+        #   - distância: |log z_p - log z_q|, a diferença relativa entre as distâncias
+        squared_guides = np.concatenate([features[feature_normal] * np.float32(np.sqrt(0.5 / self.sigma_normal)), albedo * np.float32(np.sqrt(1.0 / self.sigma_albedo))])
+        depth_guide = np.log(features[feature_depth] + np.float32(1e-3)) * np.float32(1.0 / self.sigma_depth)
+
+        # As guias não mudam entre as iterações: a borda é replicada uma única vez, com o maior espaçamento
+        max_step = 2 ** (self.iterations - 1)
+        padding = ((0, 0), (max_step + 1, max_step + 1), (max_step, max_step))
+        static_guides = np.pad(np.concatenate([squared_guides, depth_guide[None]]), padding, mode='edge')
+
+        kernel = np.array([0.25, 0.5, 0.25], dtype=np.float32)
+        for iteration in range(self.iterations):
+            step = 2 ** iteration
+
+            # Diferença relativa entre as luminâncias, com tolerância dividida por 2 a cada iteração
+            luminances = np.tensordot(luminance_weights.astype(np.float32), irradiance, axes=1)
+            luminances = np.log(np.maximum(luminances, 0) + np.float32(1e-2)) * np.float32(2 ** iteration / self.sigma_luminance)
+
+            # Imagem com borda de step pixels (e uma linha a mais em cima e embaixo), achatada: o vizinho (dy, dx) de cada pixel está a dy * padded_width + dx posições dele, e as
+            # operações vetorizadas leem arrays contíguos. Os pixels da borda recebem valores sem sentido (os vizinhos "dão a volta" na linha), mas são descartados
+            padded_width = width + 2 * step
+            crop = max_step - step
+            guides = np.ascontiguousarray(static_guides[:, crop:static_guides.shape[1] - crop, crop:static_guides.shape[2] - crop]).reshape(len(static_guides), -1)
+            padded = np.pad(np.concatenate([irradiance, luminances[None]]), ((0, 0), (step + 1, step + 1), (step, step)), mode='edge').reshape(4, -1)
+            padded_irradiance = padded[:3]
+            guides = [*guides, padded[3]]
+            filtered = np.empty_like(irradiance)
+
+            # A imagem é filtrada em faixas de linhas: os arrays de cada faixa cabem no cache, e cada operação vetorizada não precisa ler e escrever a imagem inteira na memória
+            for top in range(0, height, BAND_ROWS):
+                bottom = min(top + BAND_ROWS, height)
+                start, stop = (top + step + 1) * padded_width, (bottom + step + 1) * padded_width
+                size = stop - start
+                total = padded_irradiance[:, start:stop] * (kernel[1] * kernel[1])
+                weights = np.full(size, kernel[1] * kernel[1], dtype=np.float32)
+
+                # Metade dos vizinhos (dy, dx): o vizinho oposto (-dy, -dx) usa o mesmo peso, lido na posição do vizinho
+                for dy, dx in ((0, 1), (1, -1), (1, 0), (1, 1)):
+                    offset = (dy * padded_width + dx) * step
+                    # Pesos dos pares (p, p + offset), para p de start - offset até stop
+                    exponent = np.zeros(size + offset, dtype=np.float32)
+                    difference = np.empty_like(exponent)
+                    for channel, guide in enumerate(guides):
+                        np.subtract(guide[start - offset:stop], guide[start:stop + offset], out=difference)
+                        if channel < len(squared_guides):
+                            difference *= difference
+                        else:
+                            np.abs(difference, out=difference)
+                        exponent += difference
+
+                    # Peso = núcleo * exp(-expoente). O expoente é limitado para que exp não gere números subnormais, que deixam as operações seguintes muito lentas
+                    np.subtract(np.float32(np.log(kernel[1 + dy] * kernel[1 + dx])), exponent, out=exponent)
+                    np.maximum(exponent, np.float32(MIN_EXPONENT), out=exponent)
+                    pair_weights = np.exp(exponent, out=exponent)
+
+                    # Vizinho p + offset (peso do par p) e vizinho p - offset (peso do par p - offset)
+                    total += padded_irradiance[:, start + offset:stop + offset] * pair_weights[offset:]
+                    weights += pair_weights[offset:]
+                    total += padded_irradiance[:, start - offset:stop - offset] * pair_weights[:size]
+                    weights += pair_weights[:size]
+
+                total /= weights
+                filtered[:, top:bottom] = total.reshape(3, bottom - top, padded_width)[:, :, step:step + width]
+
+            irradiance = filtered
+
+        return np.moveaxis(irradiance * albedo, 0, 2).astype(np.float64)
@@ -0,0 +1,108 @@
+import numpy as np
+
+from lib.constants import feature_channels
+
+import os
+
+
+class AccumulationBuffer:
+
+    def __init__(self, height: int, width: int):
+        '''
+        Construtor de um buffer de acumulação HDR. Guarda a soma das cores lineares (sem limite de intensidade e sem correção gamma) e a quantidade de amostras de cada pixel, permitindo que uma imagem seja renderizada em várias passadas de amostras.
+
+        Também acumula a soma das características (features) de cada pixel (normal, albedo e distância do primeiro vértice não especular, ver lib.constants), usadas pelo denoiser.
+
+        O buffer pode ser salvo em disco (checkpoint) e carregado depois, para continuar a renderização de onde parou.
+
+        ---
+
+        Parâmetros:
+
+            - height: int - Altura da imagem em pixels.
+
+            - width: int - Largura da imagem em pixels.
+        '''
+        self.pixels = np.zeros((height, width, 3), dtype=np.float64)
+        self.counts = np.zeros((height, width), dtype=np.int64)
+        self.features = np.zeros((height, width, feature_channels), dtype=np.float64)
+        self.samples = 0  # Quantidade de amostras por pixel já solicitadas (o máximo, com amostragem adaptativa)
+        self.passes = 0
+
+    @property
+    def shape(self) -> 'tuple[int, int]':
+        '''
+        Retorna a resolução (altura, largura) do buffer.
+        '''
+        return self.counts.shape
+
+    def add(self, pixels: np.ndarray, counts: np.ndarray, samples: int, features: np.ndarray = None):
+        '''
+        Acumula uma passada de amostras no buffer.
+
+        ---
+
+        Parâmetros:
+
+            - pixels: np.ndarray - Matriz (altura, largura, 3) com a soma das cores lineares das amostras da passada.
+
+            - counts: np.ndarray - Matriz (altura, largura) com a quantidade de amostras de cada pixel na passada.
+
+            - samples: int - Quantidade (máxima, com amostragem adaptativa) de amostras por pixel da passada.
+
+            - features: np.ndarray - Matriz (altura, largura, feature_channels) com a soma das características das amostras da passada (opcional).
+        '''
+        self.pixels += pixels
+        if features is not None:
+            self.features += features
+        self.counts += counts.astype(np.int64)
+        self.samples += samples
+        self.passes += 1
+
+    def save(self, path: str, **metadata: 'int | str'):
+        '''
+        Salva o buffer em disco (formato npz do NumPy). O arquivo é escrito primeiro em um arquivo temporário e depois renomeado, para que um processo interrompido no meio da escrita não corrompa o último checkpoint.
+
+        ---
+
+        Parâmetros:
+
+            - path: str - Caminho do arquivo a ser salvo.
+
+            - metadata: int | str - Informações adicionais guardadas junto do buffer (ex: configuração da câmera), para verificar se o checkpoint ainda é válido ao carregá-lo.
+        '''
+        temporary_path = f'{path}.tmp'
+        with open(temporary_path, 'wb') as file:
+            np.savez(file, pixels=self.pixels, counts=self.counts, features=self.features, samples=self.samples, passes=self.passes, **metadata)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+
+    @staticmethod
+    def load(path: str) -> 'tuple[AccumulationBuffer, dict[str, int | str]]':
+        '''
+        Carrega um buffer salvo com AccumulationBuffer.save.
+
+        ---
+
+        Parâmetros:
+
+            - path: str - Caminho do arquivo.
+
+        ---
+
+        Retorno:
+
+            - tuple[AccumulationBuffer, dict[str, int | str]] - Tupla contendo o buffer e as informações adicionais salvas junto dele.
+        '''
+        with np.load(path) as data:
+            height, width = data['counts'].shape
+            buffer = AccumulationBuffer(height, width)
+            buffer.pixels[:] = data['pixels']
+            buffer.counts[:] = data['counts']
+            if 'features' in data.files:
+                buffer.features[:] = data['features']
+            buffer.samples = int(data['samples'])
+            buffer.passes = int(data['passes'])
+            metadata = {key: data[key].item() for key in data.files if key not in ('pixels', 'counts', 'features', 'samples', 'passes')}
+        return buffer, metadata
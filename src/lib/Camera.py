@@ -6,13 +6,31 @@ from lib.vec.Vec3 import Vec3, Point3, Color
 from lib.HittableList import HittableList
 from lib.Ray import Ray
 from lib.Interval import Interval
-from lib.constants import infinity
-from lib.utils import random_double, degrees_to_radians
+from lib.constants import infinity, luminance_weights, feature_channels, feature_normal, feature_albedo, feature_depth, aov_normal, aov_albedo, aov_depth, aov_object_id, aov_material_id, aov_ids
+from lib.utils import random_double, degrees_to_radians, standard_error, hash_key, start_random_stream
+from lib.samplers.samplers import create_sampler
+from lib.ATrousDenoiser import ATrousDenoiser
+from lib.TemporalAccumulator import TemporalAccumulator
+from lib.WavefrontIntegrator import WavefrontIntegrator
+from lib.AccumulationBuffer import AccumulationBuffer
+from lib.executors.Executor import Executor
+from lib.accelerators.Accelerator import Accelerator
+from lib.executors.backends import create_executor
+from lib.sinks.Sink import Sink
+from lib.sinks.FileSink import FileSink
+from lib.sinks.NotebookSink import NotebookSink
+from lib.materials.Material import Material
+from lib.materials.Metal import Metal
+from lib.materials.Dielectric import Dielectric
 
-from IPython.display import display
 from tqdm import tqdm
 
+from typing import Callable
+
 from math import sqrt
+from time import perf_counter, time
+import os
+import hashlib
 
 
 
@@ -65,13 +83,234 @@ def transform_color(pixel_color: Color, samples_per_pixel: int) -> Color:
 
     return Color([intensity.clamp(r), intensity.clamp(g), intensity.clamp(b)])
 
+def transform_colors(pixels: np.ndarray, samples_per_pixel: int) -> np.ndarray:
+    '''
+    Versão vetorizada de transform_color. Transforma uma matriz de cores lineares em cores gamma, aplicando a média das amostras por pixel.
+
+    ---
+
+    Parâmetros:
+
+        - pixels: np.ndarray - Matriz (altura, largura, 3) com a soma das cores lineares de cada pixel.
+
+        - samples_per_pixel: int | np.ndarray - Quantidade de amostras por pixel. Pode ser uma matriz (altura, largura, 1) quando cada pixel tem uma quantidade diferente de amostras (amostragem adaptativa).
+
+    ---
+
+    Retorno:
+
+        - np.ndarray - Matriz (altura, largura, 3) com as cores gamma, entre 0 e 0.999.
+    '''
+    return np.clip(np.sqrt(pixels / samples_per_pixel), 0.000, 0.999)
+
+def samples_filename(filename: str) -> str:
+    '''
+    Retorna o nome do arquivo da imagem com a quantidade de amostras de cada pixel (amostragem adaptativa) de uma imagem renderizada. Por exemplo, frame_1.png -> frame_1_samples.png.
+
+    ---
+
+    Parâmetros:
+
+        - filename: str - Nome do arquivo da imagem renderizada.
+
+    ---
+
+    Retorno:
+
+        - str - Nome do arquivo da imagem de amostras.
+    '''
+    root, extension = os.path.splitext(filename)
+    return f'{root}_samples{extension}'
+
+def save_sample_counts(counts: np.ndarray, samples_per_pixel: int, filename: str):
+    '''
+    Salva a quantidade de amostras de cada pixel como uma imagem em tons de cinza: preto para nenhuma amostra e branco para samples_per_pixel amostras (o orçamento máximo).
+
+    ---
+
+    Parâmetros:
+
+        - counts: np.ndarray - Matriz (altura, largura) com a quantidade de amostras de cada pixel.
+
+        - samples_per_pixel: int - Quantidade máxima de amostras por pixel.
+
+        - filename: str - Nome do arquivo de imagem a ser salvo.
+    '''
+    ImageWriter(counts / samples_per_pixel).save(filename)
+
+def checkpoint_filename(filename: str) -> str:
+    '''
+    Retorna o nome do arquivo de checkpoint (buffer de acumulação) da renderização progressiva de uma imagem. Por exemplo, frame_1.png -> frame_1_checkpoint.npz.
+
+    ---
+
+    Parâmetros:
+
+        - filename: str - Nome do arquivo da imagem renderizada.
+
+    ---
+
+    Retorno:
+
+        - str - Nome do arquivo de checkpoint.
+    '''
+    return f'{os.path.splitext(filename)[0]}_checkpoint.npz'
+
+def preview_filename(filename: str) -> str:
+    '''
+    Retorna o nome do arquivo da prévia (resultado da última passada concluída) da renderização progressiva de uma imagem. Por exemplo, frame_1.png -> frame_1_preview.png.
+
+    ---
+
+    Parâmetros:
+
+        - filename: str - Nome do arquivo da imagem renderizada.
+
+    ---
+
+    Retorno:
+
+        - str - Nome do arquivo da prévia.
+    '''
+    root, extension = os.path.splitext(filename)
+    return f'{root}_preview{extension}'
+
+def aovs_filename(filename: str) -> str:
+    '''
+    Retorna o nome do arquivo com as AOVs (ver Camera.aovs) de uma imagem renderizada. Por exemplo, frame_1.png -> frame_1_aovs.npz.
+
+    ---
+
+    Parâmetros:
+
+        - filename: str - Nome do arquivo da imagem renderizada.
+
+    ---
+
+    Retorno:
+
+        - str - Nome do arquivo das AOVs.
+    '''
+    return f'{os.path.splitext(filename)[0]}_aovs.npz'
+
+def save_aovs(aovs: 'dict[str, np.ndarray]', filename: str):
+    '''
+    Salva as AOVs de uma imagem em um arquivo .npz comprimido. A normal e o albedo são salvos em float16 (precisão suficiente para valores entre -1 e 1), a distância em float32 e os identificadores em int32. Podem ser lidas com np.load(filename).
+
+    ---
+
+    Parâmetros:
+
+        - aovs: dict[str, np.ndarray] - AOVs da imagem (ver Camera.aovs).
+
+        - filename: str - Nome do arquivo a ser salvo.
+    '''
+    np.savez_compressed(
+        filename,
+        normal=aovs['normal'].astype(np.float16),
+        albedo=aovs['albedo'].astype(np.float16),
+        depth=aovs['depth'].astype(np.float32),
+        object_id=aovs['object_id'],
+        material_id=aovs['material_id']
+    )
+
+def material_features(material: Material) -> 'tuple[np.ndarray, bool]':
+    '''
+    Retorna o albedo de um material e se ele é especular perfeito (Metal sem fuzz ou Dielectric), usados no buffer de características (features) da câmera.
+
+    ---
+
+    Parâmetros:
+
+        - material: Material - Material atingido.
+
+    ---
+
+    Retorno:
+
+        - tuple[np.ndarray, bool] - Tupla contendo o albedo (3,) e se o material é especular perfeito.
+    '''
+    if isinstance(material, Dielectric):
+        return np.ones(3), True
+    if isinstance(material, Metal):
+        return material.albedo.vec, material.fuzz == 0
+    return material.albedo.vec, False
+
+def render_passes(camera, render_pass: 'Callable[[int, int], tuple[np.ndarray, np.ndarray, np.ndarray]]', filename: str) -> AccumulationBuffer:
+    '''
+    Renderiza uma imagem em passadas de amostras, acumulando-as em um buffer de acumulação HDR.
+
+    Sem renderização progressiva (camera.samples_per_pass = None), é feita uma única passada com todas as amostras. Com renderização progressiva, cada passada tem camera.samples_per_pass amostras por pixel e, ao final de cada uma, o buffer é salvo em disco (checkpoint_filename) e uma prévia é salva (preview_filename). Se já existir um checkpoint compatível com a câmera (mesma resolução, samples_per_pixel, max_depth, pose, semente, amostrador e parâmetros da roleta russa e da amostragem adaptativa, ver Camera.checkpoint_key), a renderização continua a partir dele.
+
+    ---
+
+    Parâmetros:
+
+        - camera: Camera - Câmera que renderizará a imagem (já inicializada).
+
+        - render_pass: Callable[[int, int], tuple[np.ndarray, np.ndarray, np.ndarray]] - Função que renderiza uma passada com a quantidade de amostras por pixel informada (sendo o segundo argumento a quantidade de amostras por pixel das passadas anteriores) e retorna a soma das cores lineares (altura, largura, 3), a quantidade de amostras (altura, largura) e a soma das características (altura, largura, feature_channels) de cada pixel.
+
+        - filename: str - Nome do arquivo da imagem renderizada (obrigatório na renderização progressiva).
+
+    ---
+
+    Retorno:
+
+        - AccumulationBuffer - Buffer com todas as samples_per_pixel amostras acumuladas.
+    '''
+    if camera.samples_per_pass is not None and filename is None:
+        raise ValueError('A renderização progressiva precisa do nome do arquivo da imagem, para salvar os checkpoints.')
+
+    metadata = {'samples_per_pixel': camera.samples_per_pixel, 'max_depth': camera.max_depth, 'settings': camera.checkpoint_key()}
+    checkpoint = checkpoint_filename(filename) if filename is not None else None
+
+    accumulation = None
+    if camera.samples_per_pass is not None and os.path.exists(checkpoint):
+        accumulation, checkpoint_metadata = AccumulationBuffer.load(checkpoint)
+        if accumulation.shape != (camera.image_height, camera.image_width) or checkpoint_metadata != metadata:
+            print(f'O checkpoint {checkpoint} não corresponde à configuração atual da câmera e será descartado.')
+            accumulation = None
+        else:
+            print(f'Continuando a partir do checkpoint {checkpoint} ({accumulation.samples} de {camera.samples_per_pixel} amostras por pixel).')
+    if accumulation is None:
+        accumulation = AccumulationBuffer(camera.image_height, camera.image_width)
+
+    samples_per_pass = camera.samples_per_pass or camera.samples_per_pixel
+    while accumulation.samples < camera.samples_per_pixel:
+        samples = min(samples_per_pass, camera.samples_per_pixel - accumulation.samples)
+        pixels, counts, features = render_pass(samples, accumulation.samples)
+        accumulation.add(pixels, counts, samples, features)
+
+        if camera.samples_per_pass is not None:
+            accumulation.save(checkpoint, **metadata)
+            ImageWriter(Image.from_float_matrix(transform_colors(accumulation.pixels, accumulation.counts[..., None]))).save(preview_filename(filename))
+            print(f'Passada {accumulation.passes} concluída: {accumulation.samples} de {camera.samples_per_pixel} amostras por pixel.')
+
+    return accumulation
+
+def remove_checkpoint(filename: str):
+    '''
+    Remove o checkpoint e a prévia da renderização progressiva de uma imagem, caso existam. Deve ser chamada depois que a imagem final foi salva.
+
+    ---
+
+    Parâmetros:
+
+        - filename: str - Nome do arquivo da imagem renderizada.
+    '''
+    for path in (checkpoint_filename(filename), preview_filename(filename)):
+        if os.path.exists(path):
+            os.remove(path)
+
 
 class Camera:
 
-    def __init__(self, image_width: int = 400, samples_per_pixel: int = 100, max_depth: int = 10, vfov: float = 40.0, lookfrom: Point3 = Point3([0, 0, -1]), lookat: Point3 = Point3([0, 0, 0]), vup: Vec3 = Vec3([0, 1, 0])):
+    def __init__(self, image_width: int = 400, samples_per_pixel: int = 100, max_depth: int = 10, vfov: float = 40.0, lookfrom: Point3 = Point3([0, 0, -1]), lookat: Point3 = Point3([0, 0, 0]), vup: Vec3 = Vec3([0, 1, 0]), wavefront: bool = False, rr_min_depth: int = 5, rr_threshold: float = 0.5, adaptive: bool = False, min_samples_per_pixel: int = 16, adaptive_tolerance: float = 0.01, samples_per_pass: int = None, tile_size: int = 32, backend: str = 'serial', num_workers: int = 1, seed: int = None, sinks: 'list[Sink]' = None, sampler: str = 'random', denoiser: ATrousDenoiser = None, save_aovs: bool = False, temporal: TemporalAccumulator = None):
         '''
         Construtor de uma câmera.
 
+        A imagem é dividida em pequenos blocos (tiles) quadrados, que são renderizados por um executor (ver lib.executors): no próprio processo (serial), em um pool de threads ou em um pool de processos. Nos executores paralelos, os blocos são distribuídos dinamicamente: assim que um worker termina um bloco, ele pega o próximo da fila, de forma que regiões mais custosas da imagem (como reflexões) não deixam os outros workers ociosos.
+
         ---
 
         Parâmetros:
@@ -89,7 +328,44 @@ class Camera:
             - lookat: Point3 - Ponto para onde a câmera está olhando.
 
             - vup: Vec3 - Vetor que indica a direção "para cima" da câmera.
+
+            - wavefront: bool - Se verdadeiro, utiliza o integrador wavefront (vetorizado com NumPy) ao invés do ray_color.
+
+            - rr_min_depth: int - Quantidade mínima de reflexões/refrações de um raio antes que a roleta russa possa terminá-lo.
+
+            - rr_threshold: float - Limiar da roleta russa. Quando a maior componente da cor acumulada (throughput) do raio fica abaixo desse valor, o raio é terminado com probabilidade proporcional ao quanto ficou abaixo. Use 0 para desativar a roleta russa.
+
+            - adaptive: bool - Se verdadeiro, utiliza amostragem adaptativa: cada pixel recebe pelo menos min_samples_per_pixel amostras e continua sendo amostrado enquanto o erro padrão da média da sua luminância for maior que adaptive_tolerance, até o limite de samples_per_pixel amostras. Também salva uma imagem com a quantidade de amostras de cada pixel (ver samples_filename).
+
+            - min_samples_per_pixel: int - Quantidade mínima de amostras por pixel na amostragem adaptativa (pelo menos 2, para que a variância possa ser estimada).
+
+            - adaptive_tolerance: float - Erro padrão máximo (na luminância linear) aceito para que um pixel pare de ser amostrado na amostragem adaptativa.
+
+            - samples_per_pass: int - Se informado, ativa a renderização progressiva: a imagem é renderizada em passadas com essa quantidade de amostras por pixel, e o buffer de acumulação é salvo em disco após cada passada, junto de uma prévia da imagem (ver render_passes). Uma renderização interrompida continua da última passada salva.
+
+            - tile_size: int - Tamanho (em pixels) do lado de cada bloco da imagem. Blocos menores distribuem melhor o trabalho, mas aumentam o custo de comunicação entre os workers (o integrador wavefront se beneficia de blocos maiores).
+
+            - backend: str - Backend de execução utilizado quando nenhum executor é informado em render: 'serial', 'thread' ou 'process' (ver lib.executors.backends).
+
+            - num_workers: int - Quantidade de threads ou processos do backend de execução.
+
+            - seed: int - Semente global dos números aleatórios. Se informada, os números aleatórios de cada amostra são calculados pelo amostrador (sampler) a partir da semente, do frame (frame), do pixel, do índice da amostra e da dimensão (jitter do pixel, direção de cada reflexão, roleta russa, ...), sem estado. Assim, a imagem é sempre a mesma, independente do backend, da quantidade de workers, do tamanho dos blocos e da ordem em que os pixels são renderizados.
+
+            - sinks: list[Sink] - Destinos da imagem renderizada (ver lib.sinks): salvar em arquivo (FileSink), mostrar no notebook (NotebookSink), repassar para uma função (CallbackSink) ou descartar (NullSink). Se não for informado, a imagem é salva em arquivo e mostrada no notebook.
+
+            - sampler: str - Amostrador que gera o jitter de cada pixel e os números de cada reflexão (ver lib.samplers.samplers): 'random' (números aleatórios independentes) ou 'sobol' (quasi-Monte Carlo, com menos ruído para a mesma quantidade de amostras). Pode ser trocado entre renderizações (atribuindo create_sampler(nome) a sampler).
+
+            - denoiser: ATrousDenoiser - Se informado, remove o ruído da imagem final, guiado pelas características (normal, albedo e distância) de cada pixel (ver features). Permite usar bem menos amostras por pixel.
+
+            - save_aovs: bool - Se verdadeiro, salva as AOVs de cada imagem (normal, albedo, distância e identificadores do objeto e do material do primeiro acerto, ver aovs) em um arquivo .npz ao lado da imagem (ver aovs_filename).
+
+            - temporal: TemporalAccumulator - Se informado, as amostras de cada frame são misturadas com as dos frames anteriores, reprojetadas para a posição atual da câmera. Permite usar bem menos amostras por frame em animações (os frames devem ser renderizados em ordem, ver frame).
         '''
+        if adaptive and min_samples_per_pixel < 2:
+            raise ValueError('A amostragem adaptativa precisa de pelo menos 2 amostras por pixel.')
+        if adaptive and samples_per_pass is not None:
+            raise ValueError('A amostragem adaptativa não pode ser usada com a renderização progressiva.')
+
         self.image_width = image_width
         self.samples_per_pixel = samples_per_pixel
         self.max_depth = max_depth
@@ -97,11 +373,62 @@ class Camera:
         self.lookfrom = lookfrom
         self.lookat = lookat
         self.vup = vup
+        self.wavefront = wavefront
+        self.rr_min_depth = rr_min_depth
+        self.rr_threshold = rr_threshold
+        self.adaptive = adaptive
+        self.min_samples_per_pixel = min_samples_per_pixel
+        self.adaptive_tolerance = adaptive_tolerance
+        self.samples_per_pass = samples_per_pass
+        self.tile_size = tile_size
+        self.backend = backend
+        self.num_workers = num_workers
+        self.seed = seed
+        self.frame = 0  # Número do frame atual da animação (faz parte da chave dos números aleatórios)
+        self.sampler = create_sampler(sampler)
+        self.__sampler_seed = int(np.random.SeedSequence().entropy)  # Semente dos amostradores não independentes (quasi-Monte Carlo) quando a câmera não tem semente
+        self.sinks = sinks if sinks is not None else [FileSink(), NotebookSink()]
+        self.denoiser = denoiser
+        self.save_aovs = save_aovs
+        self.temporal = temporal
+        self.sample_counts: np.ndarray = None
+        self.features: np.ndarray = None
+        self.aovs: 'dict[str, np.ndarray]' = None
+        self.pixel_centers: np.ndarray = None
+        self.region: np.ndarray = None  # Pixels renderizados na renderização atual (ver render e tiles)
+        self.__pose = None  # Pose para a qual os parâmetros de initialize foram calculados
+        self.__previous_accumulation: AccumulationBuffer = None  # Amostras da última renderização, copiadas para fora da região (ver render)
+        self.__previous_settings: tuple = None
+
+    def __getstate__(self) -> dict:
+        '''
+        Estado da câmera enviado aos processos de renderização (pickle). Os destinos da imagem (que podem conter funções), o resultado da última renderização e a grade de pixels não são enviados: os processos devem chamar initialize.
+        '''
+        state = self.__dict__.copy()
+        state['sinks'] = []
+        state['sample_counts'] = None
+        state['features'] = None
+        state['aovs'] = None
+        state['region'] = None
+        state['_Camera__previous_accumulation'] = None
+        # O histórico temporal só é usado ao final da renderização, no processo principal
+        state['temporal'] = None
+        # A grade de pixels é grande e é recalculada rapidamente pelos processos (initialize)
+        state['pixel_centers'] = None
+        state['_Camera__pose'] = None
+        return state
 
     def initialize(self):
         '''
-        Inicializa a câmera. Calcula os parâmetros necessários para renderizar a imagem.
+        Inicializa a câmera. Calcula os parâmetros necessários para renderizar a imagem, incluindo a grade com o centro de cada pixel (pixel_centers).
+
+        Os parâmetros só são recalculados quando a pose da câmera (lookfrom, lookat e vup), vfov ou image_width mudam.
         '''
+        pose = (tuple(self.lookfrom.vec), tuple(self.lookat.vec), tuple(self.vup.vec), self.vfov, self.image_width)
+        if pose == self.__pose:
+            return
+        self.__pose = pose
+
         self.aspect_ratio = 16.0 / 9.0
 
         self.image_height = int(self.image_width / self.aspect_ratio)
@@ -133,58 +460,403 @@ class Camera:
         self.pixel00_loc = self.viewport_upper_left + 0.5 * (self.pixel_delta_u + self.pixel_delta_v)
         # Precisa adicionar 0,5 da distancia de separação dos pixels. O canto esquerdo do viewport não é o mesmo que o ponto 0,0 da imagem. O viewport precisa ter uma borda de 0,5 espaçamento de pixel para cada lado.
 
-    def ray_color(self, ray: Ray, depth: int, world: HittableList) -> Color:
+        # Centro de cada pixel (altura, largura, 3), para gerar os raios primários sem recalcular pixel00_loc + i * pixel_delta_u + j * pixel_delta_v
+        self.pixel_centers = (
+            self.pixel00_loc.vec
+            + np.arange(self.image_width)[None, :, None] * self.pixel_delta_u.vec
+            + np.arange(self.image_height)[:, None, None] * self.pixel_delta_v.vec
+        )
+        self.pixel_deltas = np.stack([self.pixel_delta_u.vec, self.pixel_delta_v.vec])  # (2, 3), para aplicar o deslocamento dos raios com um único produto de matrizes
+
+    def ray_color(self, ray: Ray, depth: int, world: HittableList, features: np.ndarray = None) -> Color:
         '''
         Retorna a cor de um raio.
+
+        O caminho do raio é seguido de forma iterativa, acumulando a atenuação de cada reflexão/refração (throughput). Após rr_min_depth reflexões, caminhos com throughput abaixo de rr_threshold são terminados aleatoriamente (roleta russa), e os que sobrevivem têm o throughput compensado, mantendo o resultado sem viés.
+
+        Se features for informado, é preenchido com as características do primeiro vértice não especular do caminho (ver lib.constants): a normal, o albedo (multiplicado pela atenuação das reflexões especulares anteriores) e a distância percorrida até ele. Assim, os reflexos do cubo espelhado têm as características dos objetos refletidos. Se o raio não atingir nada, a normal aponta para a câmera, o albedo é a cor do céu e a distância é 0.
+
+        Também são preenchidas as AOVs do primeiro acerto (ver lib.constants): a normal, o albedo do material, a distância e os identificadores (somados de 1) do objeto e do material. Se o raio não atingir nada, as AOVs ficam com 0.
         '''
-        if depth <= 0:
-            return Color([0, 0, 0])
+        throughput = Color([1.0, 1.0, 1.0])
+        distance = 0.0
+        if features is not None:
+            aovs = features  # features deixa de ser preenchido após o primeiro vértice não especular, mas as AOVs são do primeiro acerto
+        for bounce in range(depth):
+            hit, rec = world.hit(ray, Interval(0.001, infinity))
+            if not hit:
+                unit_direction = ray.direction.unit_vector()
+                t = 0.5 * (unit_direction.y + 1.0)
+                sky = throughput * ((1.0 - t) * Color([1.0, 1.0, 1.0]) + t * Color([0.5, 0.7, 1.0]))
+                if features is not None:
+                    features[feature_normal] = -unit_direction.vec
+                    features[feature_albedo] = sky.vec
+                    features[feature_depth] = 0.0
+                return sky
+
+            if features is not None:
+                distance += rec.t * ray.direction.length()
+                albedo, specular = material_features(rec.material)
+                if bounce == 0:
+                    aovs[aov_normal] = rec.normal.vec
+                    aovs[aov_albedo] = albedo
+                    aovs[aov_depth] = distance
+                    aovs[aov_object_id] = rec.object_id + 1
+                    aovs[aov_material_id] = rec.material.material_id + 1
+                if not specular:
+                    features[feature_normal] = rec.normal.vec
+                    features[feature_albedo] = throughput.vec * albedo
+                    features[feature_depth] = distance
+                    features = None
 
-        hit, rec = world.hit(ray, Interval(0.001, infinity))
-        if hit:
             is_scatered, scattered, attenuation = rec.material.scatter(ray, rec)
-            if is_scatered:
-                return attenuation * self.ray_color(scattered, depth - 1, world)
-            return Color([0, 0, 0])
-        
-        unit_direction = ray.direction.unit_vector()
-        t = 0.5 * (unit_direction.y + 1.0)
-        return (1.0 - t) * Color([1.0, 1.0, 1.0]) + t * Color([0.5, 0.7, 1.0])
+            if not is_scatered:
+                return Color([0, 0, 0])
+            throughput = throughput * attenuation
+            ray = scattered
+
+            # Roleta russa
+            if bounce + 1 >= self.rr_min_depth:
+                max_throughput = max(throughput.x, throughput.y, throughput.z)
+                if max_throughput < self.rr_threshold:
+                    survive_probability = max_throughput / self.rr_threshold
+                    if random_double() >= survive_probability:
+                        return Color([0, 0, 0])
+                    throughput = throughput / survive_probability
+
+        return Color([0, 0, 0])
     
-    def render(self, world: HittableList, filename: str) -> Image:
+    def render(self, world: HittableList, filename: str = None, executor: Executor = None, region: np.ndarray = None) -> np.ndarray:
         '''
-        Renderiza a cena (informada no mundo). Além de salvar em disco no formato PNG, também mostra a imagem (no notebook).
+        Renderiza a cena (informada no mundo). A imagem renderizada é enviada para cada um dos destinos da câmera (sinks), por exemplo, para ser salva em disco ou mostrada no notebook. Com amostragem adaptativa, também salva a imagem com a quantidade de amostras de cada pixel (ver samples_filename).
+
+        A imagem é renderizada em passadas (ver render_passes), o que permite a renderização progressiva (samples_per_pass). Cada passada é renderizada bloco a bloco pelo executor. Ao final, é mostrado o tempo de inicialização do frame (até o primeiro bloco começar a ser renderizado) e a utilização (tempo de CPU / tempo total) de cada worker.
+
+        A quantidade de amostras de cada pixel fica disponível em sample_counts após a renderização, a média das características de cada pixel (normal, albedo e distância do primeiro vértice não especular, ver lib.constants), em features, e as AOVs do primeiro acerto, em aovs: um dicionário com a média da normal (altura, largura, 3), do albedo (altura, largura, 3) e da distância (altura, largura) e com os identificadores do objeto e do material (altura, largura) atingidos pela primeira amostra de cada pixel (-1 quando ela não atinge nada). Com save_aovs, as AOVs também são salvas ao lado da imagem (ver aovs_filename). Se a câmera tiver um acumulador temporal, as amostras do frame são misturadas com o histórico dos frames anteriores, e, se tiver um denoiser, ele é aplicado à imagem final (as prévias da renderização progressiva não passam por nenhum dos dois).
+
+        Se uma região for informada, apenas os blocos com algum pixel da região são renderizados, e os demais pixels (amostras, características e AOVs) são copiados da renderização anterior. Serve para animações com a câmera parada em que apenas alguns objetos se movem (ver sphere_region). A região só é usada se a renderização anterior tiver a mesma pose e as mesmas configurações de amostragem; senão, a imagem inteira é renderizada. A cena fora da região deve ser a mesma da renderização anterior (inclusive as sombras e os reflexos dos objetos que mudaram).
 
         ---
 
         Parâmetros:
 
-            - world: HittableList - Lista de objetos que compõem a cena.
+            - world: HittableList - Lista de objetos que compõem a cena. Se um executor for informado, deve conter apenas os objetos que não estão guardados nele (objetos dinâmicos).
 
-            - filename: str - Nome do arquivo de imagem a ser salvo.
+            - filename: str - Nome do arquivo de imagem a ser salvo. É obrigatório com o FileSink, a amostragem adaptativa ou a renderização progressiva (os arquivos auxiliares usam o mesmo nome como base).
+
+            - executor: Executor - Executor (persistente) a ser utilizado. Se não for informado, um executor temporário (com todo o mundo) do backend da câmera será criado apenas para esta renderização.
+
+            - region: np.ndarray - Matriz (altura, largura) de booleanos com os pixels que mudaram desde a renderização anterior.
 
         ---
 
         Retorno:
 
-            - Image - Imagem renderizada.
+            - np.ndarray - Matriz (altura, largura, 3) com as cores gamma da imagem renderizada, entre 0 e 0.999.
         '''
         self.initialize()
+        if region is not None and self.temporal is not None:
+            raise ValueError('A região de re-renderização não pode ser usada com a reprojeção temporal (os pixels copiados já fazem parte do histórico).')
+
+        settings = self.__render_settings()
+        self.region = None
+        if region is not None:
+            if region.shape != (self.image_height, self.image_width):
+                raise ValueError(f'A região deve ter a resolução da imagem ({self.image_height}, {self.image_width}), mas tem {region.shape}.')
+            if settings == self.__previous_settings:
+                self.region = region
+            else:
+                print('A renderização anterior não tem a mesma pose ou as mesmas configurações: a imagem inteira será renderizada.')
+
+        start_time = perf_counter()
+        start_timestamp = time()
+        tiles_stats = []
+
+        def render_pass(executor: Executor, dynamic_world: HittableList, samples: int, sample_offset: int) -> 'tuple[np.ndarray, np.ndarray, np.ndarray]':
+            pixels, counts, features, pass_stats = executor.render(self, dynamic_world, samples, sample_offset)
+            tiles_stats.extend(pass_stats)
+            return pixels, counts, features
+
+        if executor is None:
+            with self.create_executor(world) as temporary_executor:
+                accumulation = render_passes(self, lambda samples, sample_offset: render_pass(temporary_executor, HittableList(), samples, sample_offset), filename)
+            executor = temporary_executor
+        else:
+            accumulation = render_passes(self, lambda samples, sample_offset: render_pass(executor, world, samples, sample_offset), filename)
+
+        if self.region is not None:
+            # Pixels dos blocos não renderizados: cópia da renderização anterior
+            copied = np.ones((self.image_height, self.image_width), dtype=bool)
+            for starting_line, end_line, starting_column, end_column in self.tiles():
+                copied[starting_line:end_line, starting_column:end_column] = False
+            previous = self.__previous_accumulation
+            accumulation.pixels[copied] = previous.pixels[copied]
+            accumulation.counts[copied] = previous.counts[copied]
+            accumulation.features[copied] = previous.features[copied]
+            print(f'Pixels re-renderizados: {(~copied).mean() * 100:.1f} % (os demais foram copiados da renderização anterior).')
+            self.region = None
+        self.__previous_accumulation = accumulation
+        self.__previous_settings = settings
+
+        self.sample_counts = accumulation.counts
+        self.features = accumulation.features / np.maximum(accumulation.counts, 1)[..., None]
+        self.aovs = {
+            'normal': self.features[..., aov_normal],
+            'albedo': self.features[..., aov_albedo],
+            'depth': self.features[..., aov_depth],
+            'object_id': np.rint(accumulation.features[..., aov_object_id]).astype(np.int32) - 1,
+            'material_id': np.rint(accumulation.features[..., aov_material_id]).astype(np.int32) - 1
+        }
+        colors = accumulation.pixels / np.maximum(accumulation.counts, 1)[..., None]
+        if self.temporal is not None:
+            colors = self.temporal.accumulate(self, colors, accumulation.counts, self.aovs)
+        if self.denoiser is not None:
+            colors = self.denoiser.denoise(colors, self.features)
+        framebuffer = transform_colors(colors, 1)
+        wall_time = perf_counter() - start_time
+
+        # A estatística só existe se algum bloco foi renderizado (um checkpoint já completo não renderiza nada)
+        if len(tiles_stats) > 0:
+            cpu_time: 'dict[int, float]' = {}
+            for worker, _, tile_time in tiles_stats:
+                cpu_time[worker] = cpu_time.get(worker, 0) + tile_time
+            startup_time = min(tile_start for _, tile_start, _ in tiles_stats) - start_timestamp
+
+            print(f'Tempo de inicialização do frame: {startup_time * 1000:.1f} ms')
+            print(f'Utilização dos workers ({type(executor).__name__}, {len(tiles_stats)} blocos de {self.tile_size}x{self.tile_size} pixels, {wall_time:.2f} segundos):')
+            for worker, worker_time in sorted(cpu_time.items()):
+                print(f'    - Worker {worker}: {worker_time:.2f} segundos de CPU ({worker_time / wall_time * 100:.1f} %)')
+            print(f'    - Média: {sum(cpu_time.values()) / (executor.num_workers * wall_time) * 100:.1f} %')
+            accelerator_statistics = executor.accelerator_statistics()
+            if accelerator_statistics is not None:
+                print(f'Estrutura de aceleração ({accelerator_statistics["structure"]}): {Accelerator.describe(accelerator_statistics)}')
+
+        if self.adaptive:
+            print(f'Média de amostras por pixel: {self.sample_counts.mean():.1f} (de {self.min_samples_per_pixel} a {self.samples_per_pixel})')
+        if self.adaptive and filename is not None:
+            save_sample_counts(self.sample_counts, self.samples_per_pixel, samples_filename(filename))
+        if self.save_aovs and filename is not None:
+            save_aovs(self.aovs, aovs_filename(filename))
+
+        for sink in self.sinks:
+            sink.write(framebuffer, filename)
+        if filename is not None:
+            remove_checkpoint(filename)
+
+        return framebuffer
+
+    def create_executor(self, static_world: HittableList = None) -> Executor:
+        '''
+        Cria um executor do backend de execução da câmera (backend e num_workers).
 
-        image = Image(self.image_width, self.image_height)
-        for j in tqdm(range(self.image_height)):
-            for i in range(self.image_width):
-                pixel_color = Color([0, 0, 0])
-                for _ in range(self.samples_per_pixel):
-                    ray = self.get_ray(i, j)
-                    pixel_color += self.ray_color(ray, self.max_depth, world)
-                image[j, i] = transform_color(pixel_color, self.samples_per_pixel)
-
-        img_writer = ImageWriter(image)
-        img_writer.save(filename)
-        display(img_writer.image)
-        
-        return image
+        ---
+
+        Parâmetros:
+
+            - static_world: HittableList - Objetos da cena que não mudam entre os frames.
+
+        ---
+
+        Retorno:
+
+            - Executor - Executor criado. Deve ser finalizado com close (ou usado com with).
+        '''
+        return create_executor(self.backend, self.num_workers, static_world)
+
+    def tiles(self) -> 'list[tuple[int, int, int, int]]':
+        '''
+        Divide a imagem em blocos (tiles) de tile_size x tile_size pixels. Os blocos da borda podem ser menores. Durante uma renderização com região (ver render), apenas os blocos com algum pixel da região são retornados.
+
+        ---
+
+        Retorno:
+
+            - list[tuple[int, int, int, int]] - Lista de blocos, cada um representado por (linha inicial, linha final, coluna inicial, coluna final). As linhas e colunas finais não são incluídas.
+        '''
+        tiles = []
+        for starting_line in range(0, self.image_height, self.tile_size):
+            end_line = min(starting_line + self.tile_size, self.image_height)
+            for starting_column in range(0, self.image_width, self.tile_size):
+                end_column = min(starting_column + self.tile_size, self.image_width)
+                if self.region is None or self.region[starting_line:end_line, starting_column:end_column].any():
+                    tiles.append((starting_line, end_line, starting_column, end_column))
+        return tiles
+
+    def sphere_region(self, centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+        '''
+        Pixels da imagem cobertos por esferas (por exemplo, as esferas envolventes dos objetos que se moveram, nas posições anterior e atual), para a região de re-renderização (ver render). A câmera já deve estar inicializada.
+
+        Um pixel é coberto se o raio do seu centro passa a menos de raio da esfera do centro dela. A região é dilatada em 1 pixel, já que as amostras de cada pixel são espalhadas pela sua área.
+
+        ---
+
+        Parâmetros:
+
+            - centers: np.ndarray - Matriz (esferas, 3) com os centros das esferas.
+
+            - radii: np.ndarray - Vetor (esferas) com os raios das esferas.
+
+        ---
+
+        Retorno:
+
+            - np.ndarray - Matriz (altura, largura) de booleanos.
+        '''
+        directions = self.pixel_centers - self.camera_center.vec
+        directions /= np.linalg.norm(directions, axis=2, keepdims=True)
+
+        region = np.zeros((self.image_height, self.image_width), dtype=bool)
+        for center, radius in zip(np.asarray(centers, dtype=np.float64).reshape(-1, 3), np.asarray(radii, dtype=np.float64).reshape(-1)):
+            to_center = center - self.camera_center.vec
+            along = directions @ to_center
+            # Distância (ao quadrado) entre o centro da esfera e o raio de cada pixel (o ponto mais próximo do raio fica atrás da câmera quando along < 0)
+            squared_distances = to_center @ to_center - np.maximum(along, 0) ** 2
+            region |= squared_distances <= radius * radius
+
+        dilated = region.copy()
+        dilated[1:] |= region[:-1]
+        dilated[:-1] |= region[1:]
+        dilated[:, 1:] |= dilated[:, :-1].copy()
+        dilated[:, :-1] |= dilated[:, 1:].copy()
+        return dilated
+
+    def __render_settings(self) -> tuple:
+        '''
+        Configurações das quais a imagem depende (além da cena): a região de re-renderização só copia pixels de uma renderização com as mesmas configurações.
+        '''
+        return (self.__pose, self.samples_per_pixel, self.max_depth, self.rr_min_depth, self.rr_threshold, self.adaptive, self.min_samples_per_pixel, self.adaptive_tolerance, type(self.sampler))
+
+    def checkpoint_key(self) -> str:
+        '''
+        Chave de compatibilidade dos checkpoints da renderização progressiva: um hash das configurações das quais a imagem depende (pose, resolução, roleta russa, amostragem adaptativa e amostrador) e da semente. Um checkpoint salvo com outra chave é descartado, em vez de misturar amostras de imagens diferentes. A câmera já deve estar inicializada.
+
+        ---
+
+        Retorno:
+
+            - str - Hash (hexadecimal) das configurações.
+        '''
+        pose = tuple(tuple(float(value) for value in item) if isinstance(item, tuple) else item for item in self.__pose)
+        settings = (pose,) + self.__render_settings()[1:-1] + (type(self.sampler).__name__, self.seed)
+        return hashlib.sha256(repr(settings).encode()).hexdigest()
+
+    def render_tile(self, world: HittableList, tile: 'tuple[int, int, int, int]', samples: int = None, sample_offset: int = 0, integrator: WavefrontIntegrator = None) -> 'tuple[np.ndarray, np.ndarray, np.ndarray]':
+        '''
+        Renderiza uma passada de amostras de um bloco (tile) da imagem. A câmera já deve estar inicializada.
+
+        Se a câmera tiver uma semente (seed), os números aleatórios de cada amostra são calculados pelo amostrador a partir da chave do pixel e do índice da amostra (ver random_key), então o resultado de cada pixel não depende de qual worker o renderizou nem da ordem dos blocos.
+
+        ---
+
+        Parâmetros:
+
+            - world: HittableList - Lista de objetos que compõem a cena.
+
+            - tile: tuple[int, int, int, int] - Bloco a ser renderizado: (linha inicial, linha final, coluna inicial, coluna final). As linhas e colunas finais não são incluídas.
+
+            - samples: int - Quantidade (máxima, com amostragem adaptativa) de amostras por pixel. Se não for especificada, será samples_per_pixel.
+
+            - sample_offset: int - Quantidade de amostras por pixel de passadas anteriores.
+
+            - integrator: WavefrontIntegrator - Integrador wavefront (da mesma cena) a ser utilizado. Se não for informado, utiliza o ray_color.
+
+        ---
+
+        Retorno:
+
+            - tuple[np.ndarray, np.ndarray, np.ndarray] - Tupla contendo a soma das cores lineares (linhas, colunas, 3), a quantidade de amostras (linhas, colunas) e a soma das características (linhas, colunas, feature_channels) de cada pixel do bloco.
+        '''
+        starting_line, end_line, starting_column, end_column = tile
+
+        if integrator is not None:
+            return integrator.render_lines(self, starting_line, end_line, starting_column=starting_column, end_column=end_column, samples=samples, sample_offset=sample_offset)
+
+        pixels = np.zeros((end_line - starting_line, end_column - starting_column, 3), dtype=np.float64)
+        counts = np.zeros((end_line - starting_line, end_column - starting_column), dtype=np.int64)
+        features = np.zeros((end_line - starting_line, end_column - starting_column, feature_channels), dtype=np.float64)
+        for j in range(starting_line, end_line):
+            for i in range(starting_column, end_column):
+                pixel_color, counts[j - starting_line, i - starting_column], features[j - starting_line, i - starting_column] = self.sample_pixel(i, j, world, samples, sample_offset)
+                pixels[j - starting_line, i - starting_column] = pixel_color.vec
+        return pixels, counts, features
+
+    def random_key(self) -> int:
+        '''
+        Chave dos números aleatórios do frame atual, derivada da semente (seed) e do frame (frame). A chave de cada pixel é hash_key(random_key(), pixel), onde pixel = j * image_width + i, e cada número aleatório de uma amostra do pixel é uma dimensão do ponto amostral calculado pelo amostrador (ver lib.samplers.Sampler).
+
+        ---
+
+        Retorno:
+
+            - int - Chave do frame, ou None se a câmera não tiver semente e o amostrador for independente (os números aleatórios vêm do gerador de cada thread).
+        '''
+        if self.seed is None:
+            if self.sampler.independent:
+                return None
+            return hash_key(0, self.__sampler_seed, self.frame)
+        return hash_key(0, self.seed, self.frame)
+
+    def sample_pixel(self, i: int, j: int, world: HittableList, samples: int = None, sample_offset: int = 0) -> 'tuple[Color, int, np.ndarray]':
+        '''
+        Calcula as amostras de um pixel. Sem amostragem adaptativa, são sempre samples amostras. Com amostragem adaptativa, a média e a variância da luminância das amostras são acompanhadas e a amostragem para assim que o erro padrão fica abaixo de adaptive_tolerance (após min_samples_per_pixel amostras).
+
+        ---
+
+        Parâmetros:
+
+            - i: int - Posição horizontal do pixel.
+
+            - j: int - Posição vertical do pixel.
+
+            - world: HittableList - Lista de objetos que compõem a cena.
+
+            - samples: int - Quantidade (máxima, com amostragem adaptativa) de amostras. Se não for especificada, será samples_per_pixel.
+
+            - sample_offset: int - Quantidade de amostras do pixel já calculadas em passadas anteriores (índice da primeira amostra, para os números aleatórios baseados em contador).
+
+        ---
+
+        Retorno:
+
+            - tuple[Color, int, np.ndarray] - Tupla contendo a soma das cores (lineares) das amostras, a quantidade de amostras e a soma das características (feature_channels,) das amostras (ver ray_color).
+        '''
+        if samples is None:
+            samples = self.samples_per_pixel
+
+        key = self.random_key()
+        if key is not None:
+            pixel_key = hash_key(key, j * self.image_width + i)
+
+        pixel_color = Color([0, 0, 0])
+        pixel_features = np.zeros(feature_channels)
+        sample_features = np.zeros(feature_channels)
+        luminance = 0.0
+        squared_luminance = 0.0
+
+        try:
+            for sample in range(1, samples + 1):
+                if key is not None:
+                    start_random_stream(self.sampler, pixel_key, sample_offset + sample - 1)
+
+                ray = self.get_ray(i, j)
+                sample_features.fill(0)
+                color = self.ray_color(ray, self.max_depth, world, sample_features)
+                if sample_offset + sample > 1:
+                    sample_features[aov_ids] = 0  # Os identificadores são apenas da primeira amostra do pixel
+                pixel_color += color
+                pixel_features += sample_features
+
+                if self.adaptive:
+                    sample_luminance = float(color.vec @ luminance_weights)
+                    luminance += sample_luminance
+                    squared_luminance += sample_luminance * sample_luminance
+                    if sample >= self.min_samples_per_pixel and standard_error(sample, luminance, squared_luminance) <= self.adaptive_tolerance:
+                        return pixel_color, sample, pixel_features
+        finally:
+            if key is not None:
+                start_random_stream(None)
+
+        return pixel_color, samples, pixel_features
 
     def get_ray(self, i: int, j: int) -> Ray:
         '''
@@ -204,10 +876,36 @@ class Camera:
 
             - Ray - Raio que passa pelo pixel (i, j).
         '''
-        pixel_center = self.pixel00_loc + (i * self.pixel_delta_u) + (j * self.pixel_delta_v)
-        pixel_sample = pixel_center + self.pixel_sample_square()
+        pixel_sample = self.pixel_centers[j, i] + (random_double() - 0.5) * self.pixel_delta_u.vec + (random_double() - 0.5) * self.pixel_delta_v.vec
         
-        return Ray(self.camera_center, pixel_sample - self.camera_center)
+        return Ray(self.camera_center, Vec3(pixel_sample - self.camera_center.vec))
+
+    def get_rays(self, i: np.ndarray, j: np.ndarray, jitter: np.ndarray) -> 'tuple[np.ndarray, np.ndarray]':
+        '''
+        Versão vetorizada de get_ray. Retorna um lote de raios primários, cada um passando pelo pixel (i[k], j[k]) com o deslocamento jitter[k] dentro do pixel.
+
+        ---
+
+        Parâmetros:
+
+            - i: np.ndarray - Array (N) com as posições horizontais dos pixels.
+
+            - j: np.ndarray - Array (N) com as posições verticais dos pixels.
+
+            - jitter: np.ndarray - Array (N, 2) com o deslocamento (horizontal e vertical) de cada raio dentro do pixel, entre -0.5 e 0.5.
+
+        ---
+
+        Retorno:
+
+            - tuple[np.ndarray, np.ndarray] - Tupla contendo as origens (N, 3) e as direções (N, 3) dos raios.
+        '''
+        directions = self.pixel_centers.reshape(-1, 3)[j * self.image_width + i]
+        directions -= self.camera_center.vec
+        directions += jitter @ self.pixel_deltas
+        origins = np.empty_like(directions)
+        origins[:] = self.camera_center.vec
+        return origins, directions
 
     def pixel_sample_square(self) -> Vec3:
         '''
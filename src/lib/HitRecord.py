@@ -6,7 +6,7 @@ from lib.materials.Material import Material
 
 class HitRecord:
 
-    def __init__(self, p: Point3, normal: Vec3, t: float, ray: Ray, material: Material):
+    def __init__(self, p: Point3, normal: Vec3, t: float, ray: Ray, material: Material, object_id: int = 0):
         '''
         Construtor de um registro de acerto (hit).
 
@@ -23,8 +23,11 @@ class HitRecord:
             - ray: Ray - Raio que utilizado
 
             - material: Material - Material do objeto que foi acertado.
+
+            - object_id: int - Identificador do objeto que foi acertado (ver Hittable.object_id).
         '''
         self.__material = material
+        self.__object_id = object_id
         self.__p = p
         self.__t = t
         self.set_normal(normal, ray)
@@ -75,4 +78,11 @@ class HitRecord:
         '''
         Material do objeto que foi acertado.
         '''
-        return self.__material
\ No newline at end of file
+        return self.__material
+
+    @property
+    def object_id(self):
+        '''
+        Identificador do objeto que foi acertado.
+        '''
+        return self.__object_id
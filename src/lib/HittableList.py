@@ -6,18 +6,28 @@ from lib.Ray import Ray
 from lib.HitRecord import HitRecord
 from lib.Interval import Interval
 from lib.objects.Model import Model
+from lib.accelerators.Accelerator import Accelerator
+from lib.accelerators.accelerators import create_accelerator, update_accelerator
 
 
 class HittableList:
     
-    def __init__(self):
+    def __init__(self, accelerator: str = None):
         '''
         Construtor de uma lista de objetos que podem ser atingidos por um raio.
         Um objeto desta classe representa o mundo ou uma cena.
+
+        ---
+
+        Parâmetros:
+
+            - accelerator: str - Nome da estrutura de aceleração (ver lib.accelerators.accelerators) construída sobre os objetos por build_accelerator. Se não for informado, hit testa todos os objetos, um por um.
         '''
         self.objects: list[Hittable] = []
+        self.accelerator_name = accelerator
+        self.accelerator: Accelerator = None
     
-    def add(self, obj: Union[Hittable, Model]):
+    def add(self, obj: Union[Hittable, Model], flatten: bool = True):
         '''
         Adiciona um objeto à lista de objetos que podem ser atingidos por um raio.
 
@@ -26,18 +36,62 @@ class HittableList:
         Parâmetros:
 
             - obj: Hittable - Objeto a ser adicionado.
+
+            - flatten: bool - Se o objeto for um Model, adiciona cada uma das suas faces (Triangle) como um objeto. Caso contrário, o modelo é adicionado como um único objeto, que testa todas as faces de uma só vez (ver Model.hit).
         '''
-        if isinstance(obj, Model):
+        if isinstance(obj, Model) and flatten:
             for face in obj.faces:
                 self.objects.append(face)
         else:
             self.objects.append(obj)
+        self.accelerator = None  # A estrutura não contém o novo objeto
     
+    def __getstate__(self) -> dict:
+        '''
+        Estado enviado aos processos (pickle). A estrutura de aceleração não é enviada: cada processo a constrói novamente (ver ProcessExecutor).
+        '''
+        state = self.__dict__.copy()
+        state['accelerator'] = None
+        return state
+
     def clear(self):
         '''
         Limpa (esvazia) a lista de objetos que podem ser atingidos por um raio.
         '''
         self.objects.clear()
+        self.accelerator = None
+
+    def build_accelerator(self) -> Accelerator:
+        '''
+        Constrói a estrutura de aceleração (accelerator_name) sobre os objetos atuais da lista, usada por hit a partir de então. Deve ser chamada novamente se objetos forem adicionados (add descarta a estrutura) ou se moverem.
+
+        ---
+
+        Retorno:
+
+            - Accelerator - Estrutura construída (None se a lista não tiver estrutura de aceleração).
+        '''
+        self.accelerator = create_accelerator(self.accelerator_name, self.objects) if self.accelerator_name is not None else None
+        return self.accelerator
+
+    def update_accelerator(self, previous: Accelerator = None) -> Accelerator:
+        '''
+        Constrói a estrutura de aceleração sobre os objetos atuais da lista reaproveitando, se possível, a estrutura de uma cena anterior com os mesmos objetos em outras posições (ver lib.accelerators.accelerators.update_accelerator): a estrutura anterior é reajustada, ao invés de reconstruída, e passa a ser a estrutura desta lista.
+
+        ---
+
+        Parâmetros:
+
+            - previous: Accelerator - Estrutura da cena anterior (por exemplo, a do frame anterior da animação).
+
+        ---
+
+        Retorno:
+
+            - Accelerator - Estrutura reajustada ou construída (None se a lista não tiver estrutura de aceleração).
+        '''
+        self.accelerator = update_accelerator(self.accelerator_name, self.objects, previous) if self.accelerator_name is not None else None
+        return self.accelerator
     
     def hit(self, ray: Ray, interval: Interval) -> "tuple[bool, HitRecord]":
         '''
@@ -57,6 +111,9 @@ class HittableList:
 
             - tuple[bool, HitRecord] - Tupla contendo um booleano que indica se o raio atingiu algum objeto e um registro de acerto (hit record) com informações sobre o acerto. Caso o raio não atinja nenhum objeto, o registro de acerto é None.
         '''
+        if self.accelerator is not None:
+            return self.accelerator.hit(ray, interval)
+
         hit_anything = False
         closest_so_far = interval.max
         for obj in self.objects:
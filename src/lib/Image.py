@@ -9,6 +9,8 @@ class Image:
         '''
         Construtor da classe Image. Cria uma matriz de pixels com as dimensões passadas como parâmetro.
 
+        Internamente, os pixels são guardados em uma matriz numpy de floats (altura, largura, 3). Pixels ainda não definidos possuem o valor NaN.
+
         ---
 
         Parâmetros:
@@ -19,7 +21,29 @@ class Image:
         '''
         self.__width = width
         self.__height = height
-        self.img_matrix = np.empty((height, width), dtype=Color)
+        self.img_matrix = np.full((height, width, 3), np.nan, dtype=np.float64)
+    
+    @staticmethod
+    def from_float_matrix(matrix: np.ndarray) -> 'Image':
+        '''
+        Cria uma imagem a partir de uma matriz numpy de floats.
+
+        ---
+
+        Parâmetros:
+
+            - matrix: np.ndarray - Matriz (altura, largura, 3) com valores entre 0 e 1.
+
+        ---
+
+        Retorno:
+
+            - Image - Imagem com os pixels definidos pela matriz.
+        '''
+        height, width, _ = matrix.shape
+        image = Image(width, height)
+        image.img_matrix[:] = matrix
+        return image
     
     @property
     def width(self) -> int:
@@ -58,11 +82,7 @@ class Image:
 
             - bool - True se todos os pixels foram definidos. False caso contrário.
         '''
-        for i in range(self.img_matrix.shape[0]):
-            for j in range(self.img_matrix.shape[1]):
-                if self.img_matrix[i, j] is None:
-                    return False
-        return True
+        return not np.isnan(self.img_matrix).any()
     
     def to_uint8_matrix(self) -> np.ndarray:
         '''
@@ -74,13 +94,7 @@ class Image:
 
             - np.ndarray - Matriz numpy representando a imagem. A matriz possui valores entre 0 e 255 e é do tipo uint8.
         '''
-        img_matrix = np.empty((self.height, self.width, 3), dtype=np.uint8)
-        for i in range(self.height):
-            for j in range(self.width):
-                img_matrix[i, j, 0] = int(255.999 * self.img_matrix[i, j].r)
-                img_matrix[i, j, 1] = int(255.999 * self.img_matrix[i, j].g)
-                img_matrix[i, j, 2] = int(255.999 * self.img_matrix[i, j].b)
-        return img_matrix
+        return (255.999 * self.img_matrix).astype(np.uint8)
     
     def __setitem__(self, key, value: Color):
         '''
@@ -100,7 +114,7 @@ class Image:
 
             - value: Color - Cor do pixel.
         '''
-        self.img_matrix[key] = value
+        self.img_matrix[key] = value.vec
     
     def __getitem__(self, key):
         '''
@@ -125,4 +139,4 @@ class Image:
 
             - Color - Cor do pixel.
         '''
-        return self.img_matrix[key]
+        return Color(self.img_matrix[key].copy())
@@ -0,0 +1,317 @@
+import PIL.Image
+
+from time import time
+import sqlite3
+import hashlib
+import os
+
+
+# Caminho padrão do banco de tarefas (executando a partir do repositório base)
+DEFAULT_DATABASE = 'animation_frames/jobs.sqlite'
+
+# Estados de um frame no banco de tarefas
+PENDING = 'pending'
+RENDERING = 'rendering'
+DONE = 'done'
+
+
+def file_checksum(path: str) -> str:
+    '''
+    Retorna o SHA-256 (hexadecimal) do conteúdo de um arquivo.
+    '''
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def is_complete_image(path: str) -> bool:
+    '''
+    Verifica se um arquivo de imagem existe e pode ser lido por inteiro (uma imagem truncada, por exemplo, por um processo interrompido no meio da escrita, não pode).
+    '''
+    try:
+        with PIL.Image.open(path) as image:
+            image.load()
+        return True
+    except (OSError, SyntaxError):
+        return False
+
+
+class JobDatabase:
+
+    def __init__(self, path: str, frames_folder: str = 'animation_frames', lease_duration: float = 300.0):
+        '''
+        Construtor de um banco de tarefas de renderização (SQLite): guarda o estado de cada frame de cada configuração de resolução, para que várias máquinas (ou processos) dividam uma animação sem renderizar o mesmo frame duas vezes.
+
+        Cada frame é uma tarefa com estado (pending, rendering ou done), dono e validade da concessão (lease), tempo de renderização e checksum da imagem. Um processo reserva um frame pendente de forma atômica (claim) e recebe uma concessão de lease_duration segundos, que deve ser renovada enquanto o frame é renderizado (ver LeaseKeeper). Se o processo morrer, a concessão expira e o frame pode ser reservado por outro processo.
+
+        Ao concluir um frame, o checksum (SHA-256) da imagem é guardado. A verificação (verify) compara o arquivo com o checksum e devolve para a fila os frames cuja imagem sumiu ou foi alterada (por exemplo, truncada ao ser copiada entre máquinas).
+
+        O banco deve ficar em um disco local ou em um compartilhamento de rede com travas de arquivo confiáveis (o SQLite não funciona bem em alguns sistemas de arquivos de rede, como NFS sem travas).
+
+        ---
+
+        Parâmetros:
+
+            - path: str - Caminho do arquivo do banco (criado se não existir).
+
+            - frames_folder: str - Pasta com as subpastas de cada configuração (frames_folder/<configuração>/frame_N.png).
+
+            - lease_duration: float - Validade (em segundos) de cada concessão.
+        '''
+        self.path = path
+        self.frames_folder = frames_folder
+        self.lease_duration = lease_duration
+
+        # As transações são controladas manualmente (BEGIN IMMEDIATE trava o banco para escrita durante a reserva)
+        self.__connection = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+        self.__connection.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                config TEXT NOT NULL,
+                frame INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                lease_owner TEXT,
+                lease_expiry REAL,
+                render_time REAL,
+                checksum TEXT,
+                PRIMARY KEY (config, frame)
+            )
+        ''')
+
+    def __enter__(self) -> 'JobDatabase':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        '''
+        Fecha a conexão com o banco.
+        '''
+        self.__connection.close()
+
+    def frame_filename(self, config: str, frame: int) -> str:
+        '''
+        Retorna o caminho da imagem de um frame de uma configuração.
+        '''
+        return os.path.join(self.frames_folder, config, f'frame_{frame}.png')
+
+    def add_jobs(self, config: str, frames: 'list[int]'):
+        '''
+        Adiciona os frames de uma configuração ao banco (frames já cadastrados não mudam). Frames cuja imagem já existe e está completa (de renderizações anteriores ao banco) são cadastrados como concluídos.
+
+        ---
+
+        Parâmetros:
+
+            - config: str - Nome da configuração de resolução.
+
+            - frames: list[int] - Números dos frames.
+        '''
+        known = {frame for frame, in self.__connection.execute('SELECT frame FROM jobs WHERE config = ?', (config,))}
+        rows = []
+        for frame in frames:
+            if frame in known:
+                continue
+            filename = self.frame_filename(config, frame)
+            if is_complete_image(filename):
+                rows.append((config, frame, DONE, file_checksum(filename)))
+            else:
+                rows.append((config, frame, PENDING, None))
+
+        self.__connection.execute('BEGIN IMMEDIATE')
+        self.__connection.executemany('INSERT OR IGNORE INTO jobs (config, frame, status, checksum) VALUES (?, ?, ?, ?)', rows)
+        self.__connection.execute('COMMIT')
+
+    def claim(self, config: str, owner: str, frame_range: 'tuple[int, int]' = None) -> int:
+        '''
+        Reserva (de forma atômica) o próximo frame de uma configuração que está pendente ou cuja concessão expirou.
+
+        ---
+
+        Parâmetros:
+
+            - config: str - Nome da configuração de resolução.
+
+            - owner: str - Identificador do processo que reserva o frame (por exemplo, máquina:pid).
+
+            - frame_range: tuple[int, int] - Primeiro e último frame (inclusive) que podem ser reservados. Se não for informado, qualquer frame da configuração pode ser reservado.
+
+        ---
+
+        Retorno:
+
+            - int - Número do frame reservado, ou None se não houver frames disponíveis.
+        '''
+        first_frame, last_frame = frame_range if frame_range is not None else (None, None)
+        now = time()
+        self.__connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = self.__connection.execute(
+                'SELECT frame FROM jobs WHERE config = ? AND (status = ? OR (status = ? AND lease_expiry < ?)) AND (? IS NULL OR frame BETWEEN ? AND ?) ORDER BY frame LIMIT 1',
+                (config, PENDING, RENDERING, now, first_frame, first_frame, last_frame)
+            ).fetchone()
+            if row is None:
+                return None
+            self.__connection.execute(
+                'UPDATE jobs SET status = ?, lease_owner = ?, lease_expiry = ? WHERE config = ? AND frame = ?',
+                (RENDERING, owner, now + self.lease_duration, config, row[0])
+            )
+            return row[0]
+        finally:
+            self.__connection.execute('COMMIT')
+
+    def renew(self, config: str, frame: int, owner: str) -> bool:
+        '''
+        Renova a concessão de um frame reservado.
+
+        ---
+
+        Retorno:
+
+            - bool - False se o frame não está mais reservado pelo dono informado (a concessão expirou e outro processo o reservou).
+        '''
+        cursor = self.__connection.execute(
+            'UPDATE jobs SET lease_expiry = ? WHERE config = ? AND frame = ? AND status = ? AND lease_owner = ?',
+            (time() + self.lease_duration, config, frame, RENDERING, owner)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, config: str, frame: int, owner: str, render_time: float) -> bool:
+        '''
+        Marca um frame como concluído, guardando o tempo de renderização e o checksum da imagem (que já deve ter sido salva). A imagem é verificada antes: uma imagem incompleta devolve o frame para a fila.
+
+        Como em renew e release, o frame só é concluído se ainda estiver reservado pelo dono informado: um processo cuja concessão expirou (e o frame foi reservado por outro processo) não pode sobrescrever o novo dono, nem guardar o checksum de um arquivo que o outro processo ainda está escrevendo.
+
+        ---
+
+        Parâmetros:
+
+            - config: str - Nome da configuração de resolução.
+
+            - frame: int - Número do frame.
+
+            - owner: str - Identificador do processo que renderizou o frame.
+
+            - render_time: float - Tempo de renderização (em segundos).
+
+        ---
+
+        Retorno:
+
+            - bool - True se o frame foi concluído. False se a imagem está incompleta ou se o frame não está mais reservado pelo dono informado.
+        '''
+        filename = self.frame_filename(config, frame)
+        if not is_complete_image(filename):
+            self.release(config, frame, owner)
+            return False
+
+        cursor = self.__connection.execute(
+            'UPDATE jobs SET status = ?, lease_expiry = NULL, render_time = ?, checksum = ? WHERE config = ? AND frame = ? AND status = ? AND lease_owner = ?',
+            (DONE, render_time, file_checksum(filename), config, frame, RENDERING, owner)
+        )
+        return cursor.rowcount == 1
+
+    def release(self, config: str, frame: int, owner: str):
+        '''
+        Devolve para a fila um frame reservado que não foi concluído (por exemplo, quando a renderização é interrompida).
+        '''
+        self.__connection.execute(
+            'UPDATE jobs SET status = ?, lease_owner = NULL, lease_expiry = NULL WHERE config = ? AND frame = ? AND status = ? AND lease_owner = ?',
+            (PENDING, config, frame, RENDERING, owner)
+        )
+
+    def verify(self, config: str) -> 'list[int]':
+        '''
+        Verifica as imagens dos frames concluídos de uma configuração: frames cuja imagem não existe ou não corresponde ao checksum guardado voltam para a fila.
+
+        ---
+
+        Parâmetros:
+
+            - config: str - Nome da configuração de resolução.
+
+        ---
+
+        Retorno:
+
+            - list[int] - Frames que voltaram para a fila.
+        '''
+        invalid = []
+        for frame, checksum in self.__connection.execute('SELECT frame, checksum FROM jobs WHERE config = ? AND status = ?', (config, DONE)).fetchall():
+            filename = self.frame_filename(config, frame)
+            if not os.path.exists(filename) or file_checksum(filename) != checksum:
+                invalid.append(frame)
+
+        self.__connection.execute('BEGIN IMMEDIATE')
+        self.__connection.executemany(
+            'UPDATE jobs SET status = ?, lease_owner = NULL, lease_expiry = NULL, render_time = NULL, checksum = NULL WHERE config = ? AND frame = ? AND status = ?',
+            [(PENDING, config, frame, DONE) for frame in invalid]
+        )
+        self.__connection.execute('COMMIT')
+        return invalid
+
+    def frames(self, config: str, status: str) -> 'list[int]':
+        '''
+        Frames de uma configuração em um estado. Frames com a concessão expirada são considerados pendentes (podem ser reservados).
+
+        ---
+
+        Parâmetros:
+
+            - config: str - Nome da configuração de resolução.
+
+            - status: str - Estado dos frames: PENDING, RENDERING ou DONE.
+
+        ---
+
+        Retorno:
+
+            - list[int] - Números dos frames, em ordem.
+        '''
+        now = time()
+        conditions = {
+            PENDING: ('(status = ? OR (status = ? AND lease_expiry < ?))', (PENDING, RENDERING, now)),
+            RENDERING: ('status = ? AND lease_expiry >= ?', (RENDERING, now)),
+            DONE: ('status = ?', (DONE,))
+        }
+        condition, parameters = conditions[status]
+        return [frame for frame, in self.__connection.execute(f'SELECT frame FROM jobs WHERE config = ? AND {condition} ORDER BY frame', (config, *parameters))]
+
+    def status(self) -> 'dict[str, dict]':
+        '''
+        Progresso de cada configuração do banco.
+
+        ---
+
+        Retorno:
+
+            - dict[str, dict] - Para cada configuração, um dicionário com a quantidade total de frames ('total'), de concluídos ('done'), sendo renderizados com concessão válida ('rendering'), pendentes ou com concessão expirada ('pending'), os donos das concessões válidas ('owners'), o tempo médio de renderização dos frames concluídos ('mean_render_time', None se nenhum tem tempo) e a estimativa do tempo restante em segundos ('eta', dividindo os frames restantes entre os donos ativos, ou pelo menos 1; None sem tempo médio).
+        '''
+        now = time()
+        status = {}
+        for config, in self.__connection.execute('SELECT DISTINCT config FROM jobs ORDER BY config').fetchall():
+            total, done, rendering, mean_render_time = self.__connection.execute(
+                'SELECT COUNT(*), SUM(status = ?), SUM(status = ? AND lease_expiry >= ?), AVG(render_time) FROM jobs WHERE config = ?',
+                (DONE, RENDERING, now, config)
+            ).fetchone()
+            owners = sorted(owner for owner, in self.__connection.execute(
+                'SELECT DISTINCT lease_owner FROM jobs WHERE config = ? AND status = ? AND lease_expiry >= ?',
+                (config, RENDERING, now)
+            ))
+            remaining = total - done
+            eta = None
+            if mean_render_time is not None:
+                # Os frames sendo renderizados já estão, em média, na metade
+                eta = (remaining - rendering / 2) * mean_render_time / max(len(owners), 1)
+            status[config] = {
+                'total': total,
+                'done': done,
+                'rendering': rendering,
+                'pending': remaining - rendering,
+                'owners': owners,
+                'mean_render_time': mean_render_time,
+                'eta': eta
+            }
+        return status
+
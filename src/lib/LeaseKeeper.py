@@ -0,0 +1,46 @@
+from lib.JobDatabase import JobDatabase
+
+import threading
+
+
+class LeaseKeeper:
+
+    def __init__(self, database: JobDatabase, config: str, frame: int, owner: str):
+        '''
+        Construtor de um gerenciador de contexto que renova a concessão de um frame reservado (ver JobDatabase.claim) enquanto ele é renderizado: a concessão é renovada a cada terço da sua validade, em uma thread com uma conexão própria com o banco.
+
+        ---
+
+        Parâmetros:
+
+            - database: JobDatabase - Banco de tarefas em que o frame foi reservado.
+
+            - config: str - Nome da configuração de resolução.
+
+            - frame: int - Número do frame.
+
+            - owner: str - Identificador do processo que reservou o frame.
+        '''
+        self.database = database
+        self.config = config
+        self.frame = frame
+        self.owner = owner
+        self.lost = False  # Verdadeiro se a concessão expirou e o frame foi reservado por outro processo
+        self.__stop = threading.Event()
+        self.__thread: threading.Thread = None
+
+    def __enter__(self) -> 'LeaseKeeper':
+        self.__thread = threading.Thread(target=self.__renew, daemon=True)
+        self.__thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__stop.set()
+        self.__thread.join()
+
+    def __renew(self):
+        with JobDatabase(self.database.path, self.database.frames_folder, self.database.lease_duration) as database:
+            while not self.__stop.wait(self.database.lease_duration / 3):
+                if not database.renew(self.config, self.frame, self.owner):
+                    self.lost = True
+                    return
@@ -0,0 +1,198 @@
+import numpy as np
+
+import math
+
+
+def uniform_unit_vectors(u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    '''
+    Transforma pares de números aleatórios entre 0 e 1 em vetores unitários uniformemente distribuídos na superfície da esfera unitária (sem rejeição).
+
+    ---
+
+    Parâmetros:
+
+        - u: np.ndarray - Array (N,) de números entre 0 e 1 (altura do vetor).
+
+        - v: np.ndarray - Array (N,) de números entre 0 e 1 (ângulo em torno do eixo z).
+
+    ---
+
+    Retorno:
+
+        - np.ndarray - Array (N, 3) de vetores unitários.
+    '''
+    z = 1.0 - 2.0 * u
+    r = np.sqrt(np.maximum(1.0 - z * z, 0.0))
+    phi = 2.0 * np.pi * v
+    return np.stack([r * np.cos(phi), r * np.sin(phi), z], axis=1)
+
+def uniform_unit_vector(u: float, v: float) -> np.ndarray:
+    '''
+    Versão escalar de uniform_unit_vectors: transforma dois números aleatórios entre 0 e 1 em um vetor unitário.
+
+    ---
+
+    Parâmetros:
+
+        - u: float - Número entre 0 e 1 (altura do vetor).
+
+        - v: float - Número entre 0 e 1 (ângulo em torno do eixo z).
+
+    ---
+
+    Retorno:
+
+        - np.ndarray - Array (3,) com o vetor unitário.
+    '''
+    z = 1.0 - 2.0 * u
+    r = math.sqrt(max(1.0 - z * z, 0.0))
+    phi = 2.0 * math.pi * v
+    return np.array([r * math.cos(phi), r * math.sin(phi), z])
+
+
+class RandomPool:
+
+    def __init__(self, seed: int = None, block_size: int = 4096):
+        '''
+        Construtor de uma fonte de números aleatórios que sorteia blocos grandes de uma vez com um numpy.random.Generator (PCG64) e os entrega um a um.
+
+        Sortear um número por vez (como o módulo random do Python) ou sortear vetores com rejeição (como era feito em Vec3.random_in_unit_sphere) custa uma chamada de função e um objeto por sorteio. Aqui, os números, os vetores unitários e os vetores dentro da esfera unitária são gerados em blocos vetorizados, e cada sorteio escalar apenas lê a próxima posição do bloco.
+
+        Também possui versões em lote (doubles, unit_vectors, in_unit_sphere_vectors), que retornam arrays do NumPy.
+
+        ---
+
+        Parâmetros:
+
+            - seed: int - Semente do gerador. Se não for informada, o gerador é iniciado com entropia do sistema operacional.
+
+            - block_size: int - Quantidade de números (ou vetores) sorteados de cada vez.
+        '''
+        self.block_size = block_size
+        self.seed(seed)
+
+    def seed(self, seed: int = None):
+        '''
+        Reinicia o gerador com a semente informada, descartando os blocos já sorteados.
+
+        ---
+
+        Parâmetros:
+
+            - seed: int - Semente do gerador.
+        '''
+        self.generator = np.random.Generator(np.random.PCG64(seed))
+        # Os blocos escalares são listas do Python: ler um float de uma lista é bem mais barato que indexar um array do NumPy
+        self.__doubles: 'list[float]' = []
+        self.__double_index = 0
+        self.__unit_vectors: np.ndarray = np.empty((0, 3))
+        self.__unit_vector_index = 0
+        self.__in_unit_sphere: np.ndarray = np.empty((0, 3))
+        self.__in_unit_sphere_index = 0
+
+    def double(self) -> float:
+        '''
+        Retorna o próximo número aleatório entre 0 e 1 do bloco (sorteando um novo bloco quando necessário).
+
+        ---
+
+        Retorno:
+
+            - float - Número aleatório entre 0 e 1.
+        '''
+        index = self.__double_index
+        if index == len(self.__doubles):
+            self.__doubles = self.generator.random(self.block_size).tolist()
+            index = 0
+        self.__double_index = index + 1
+        return self.__doubles[index]
+
+    def unit_vector(self) -> np.ndarray:
+        '''
+        Retorna o próximo vetor unitário aleatório (uniforme na superfície da esfera unitária) do bloco.
+
+        ---
+
+        Retorno:
+
+            - np.ndarray - Array (3,) com o vetor. Não deve ser modificado (é uma visão do bloco).
+        '''
+        index = self.__unit_vector_index
+        if index == len(self.__unit_vectors):
+            self.__unit_vectors = self.unit_vectors(self.block_size)
+            index = 0
+        self.__unit_vector_index = index + 1
+        return self.__unit_vectors[index]
+
+    def in_unit_sphere(self) -> np.ndarray:
+        '''
+        Retorna o próximo vetor aleatório dentro da esfera unitária (uniforme no volume) do bloco.
+
+        ---
+
+        Retorno:
+
+            - np.ndarray - Array (3,) com o vetor. Não deve ser modificado (é uma visão do bloco).
+        '''
+        index = self.__in_unit_sphere_index
+        if index == len(self.__in_unit_sphere):
+            self.__in_unit_sphere = self.in_unit_sphere_vectors(self.block_size)
+            index = 0
+        self.__in_unit_sphere_index = index + 1
+        return self.__in_unit_sphere[index]
+
+    def doubles(self, n: int) -> np.ndarray:
+        '''
+        Sorteia n números aleatórios entre 0 e 1 de uma vez.
+
+        ---
+
+        Parâmetros:
+
+            - n: int - Quantidade de números.
+
+        ---
+
+        Retorno:
+
+            - np.ndarray - Array (n,) de números aleatórios.
+        '''
+        return self.generator.random(n)
+
+    def unit_vectors(self, n: int) -> np.ndarray:
+        '''
+        Sorteia n vetores unitários aleatórios (uniformes na superfície da esfera unitária) de uma vez.
+
+        ---
+
+        Parâmetros:
+
+            - n: int - Quantidade de vetores.
+
+        ---
+
+        Retorno:
+
+            - np.ndarray - Array (n, 3) de vetores unitários.
+        '''
+        u, v = self.generator.random((2, n))
+        return uniform_unit_vectors(u, v)
+
+    def in_unit_sphere_vectors(self, n: int) -> np.ndarray:
+        '''
+        Sorteia n vetores aleatórios dentro da esfera unitária (uniformes no volume) de uma vez, sem rejeição: um vetor unitário multiplicado pela raiz cúbica de um número entre 0 e 1.
+
+        ---
+
+        Parâmetros:
+
+            - n: int - Quantidade de vetores.
+
+        ---
+
+        Retorno:
+
+            - np.ndarray - Array (n, 3) de vetores.
+        '''
+        u, v, w = self.generator.random((3, n))
+        return uniform_unit_vectors(u, v) * np.cbrt(w)[:, None]
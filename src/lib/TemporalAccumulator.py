@@ -0,0 +1,216 @@
+import numpy as np
+
+from lib.constants import feature_normal, feature_depth
+
+
+class TemporalAccumulator:
+
+    def __init__(self, max_history_samples: int = 64, depth_tolerance: float = 0.05, clamp_gamma: float = 1.0, dynamic_object_ids: 'list[int]' = None):
+        '''
+        Construtor de um acumulador temporal: reaproveita as amostras dos frames anteriores de uma animação (reprojeção temporal).
+
+        A cada frame, o ponto do primeiro acerto de cada pixel (calculado a partir da distância das AOVs, ver Camera.aovs) é projetado na câmera do frame anterior, e a cor acumulada do frame anterior (histórico) é lida nessa posição, com interpolação bilinear. Cada um dos 4 pixels da interpolação só é usado se tiver o mesmo objeto e uma distância compatível com a do ponto (senão, o ponto estava escondido ou é de outro objeto no frame anterior). Pixels que não atingem nada (céu) são reprojetados apenas pela direção do raio, e só usam pixels do frame anterior que também eram apenas céu.
+
+        O histórico é misturado com as amostras novas na proporção da quantidade de amostras de cada um, então um pixel estático acumula as amostras de vários frames (até max_history_samples). Objetos que se movem (dynamic_object_ids) não têm histórico, nem pixels em que o primeiro acerto é especular (reflexões e refrações mudam com o ponto de vista, então a cor não acompanha o ponto do primeiro acerto). Para que mudanças de iluminação (como as sombras das esferas que se movem) não deixem rastros, a cor do histórico é limitada à média ± clamp_gamma desvios padrão das cores novas da vizinhança 3x3 do pixel.
+
+        Os frames devem ser renderizados em ordem: se o frame não for o seguinte ao anterior (ou a resolução mudar), o histórico é descartado.
+
+        ---
+
+        Parâmetros:
+
+            - max_history_samples: int - Quantidade máxima de amostras (por pixel) do histórico. Quanto maior, menos ruído nas regiões estáticas, mas mais lenta é a resposta a mudanças.
+
+            - depth_tolerance: float - Diferença relativa máxima entre a distância esperada do ponto e a distância do pixel do frame anterior.
+
+            - clamp_gamma: float - Quantidade de desvios padrão da vizinhança aceita para a cor do histórico.
+
+            - dynamic_object_ids: list[int] - Identificadores dos objetos que se movem entre os frames (ver Hittable.object_id).
+        '''
+        self.max_history_samples = max_history_samples
+        self.depth_tolerance = depth_tolerance
+        self.clamp_gamma = clamp_gamma
+        self.dynamic_object_ids = list(dynamic_object_ids) if dynamic_object_ids is not None else []
+        self.reset()
+
+    def reset(self):
+        '''
+        Descarta o histórico (o próximo frame é renderizado apenas com as suas amostras).
+        '''
+        self.frame: int = None
+        self.colors: np.ndarray = None
+        self.history_samples: np.ndarray = None
+        self.depths: np.ndarray = None
+        self.object_ids: np.ndarray = None
+        self.camera_center: np.ndarray = None
+        self.pixel00_loc: np.ndarray = None
+        self.pixel_deltas: np.ndarray = None
+
+    def accumulate(self, camera, colors: np.ndarray, counts: np.ndarray, aovs: 'dict[str, np.ndarray]') -> np.ndarray:
+        '''
+        Mistura as cores de um frame com o histórico reprojetado dos frames anteriores, e guarda o resultado como histórico do próximo frame.
+
+        ---
+
+        Parâmetros:
+
+            - camera: Camera - Câmera que renderizou o frame (já inicializada, com o número do frame em camera.frame).
+
+            - colors: np.ndarray - Matriz (altura, largura, 3) com a cor linear média das amostras novas de cada pixel.
+
+            - counts: np.ndarray - Matriz (altura, largura) com a quantidade de amostras novas de cada pixel.
+
+            - aovs: dict[str, np.ndarray] - AOVs do frame (ver Camera.aovs). São usadas a normal, a distância e o identificador do objeto.
+
+        ---
+
+        Retorno:
+
+            - np.ndarray - Matriz (altura, largura, 3) com a cor linear de cada pixel, com o histórico.
+        '''
+        height, width = counts.shape
+        depths = aovs['depth']
+        object_ids = aovs['object_id']
+
+        if self.frame is not None and self.frame + 1 == camera.frame and self.colors.shape[:2] == (height, width):
+            history, history_samples = self.reproject(camera, depths, object_ids)
+            history = np.clip(history, *self.neighborhood_bounds(colors))
+            history_samples[np.isin(object_ids, self.dynamic_object_ids) | self.specular_pixels(camera.features, aovs)] = 0
+
+            total_samples = counts + history_samples
+            colors = (colors * counts[..., None] + history * history_samples[..., None]) / np.maximum(total_samples, 1)[..., None]
+        else:
+            total_samples = counts.astype(np.float64)
+
+        self.frame = camera.frame
+        self.colors = colors
+        self.history_samples = np.minimum(total_samples, self.max_history_samples)
+        self.depths = depths
+        self.object_ids = object_ids
+        self.camera_center = camera.camera_center.vec.copy()
+        self.pixel00_loc = camera.pixel00_loc.vec.copy()
+        self.pixel_deltas = camera.pixel_deltas.copy()
+        return colors
+
+    def reproject(self, camera, depths: np.ndarray, object_ids: np.ndarray) -> 'tuple[np.ndarray, np.ndarray]':
+        '''
+        Lê o histórico do frame anterior na posição em que o primeiro acerto de cada pixel do frame atual aparecia.
+
+        ---
+
+        Parâmetros:
+
+            - camera: Camera - Câmera do frame atual (já inicializada).
+
+            - depths: np.ndarray - Matriz (altura, largura) com a distância do primeiro acerto de cada pixel.
+
+            - object_ids: np.ndarray - Matriz (altura, largura) com o identificador do objeto do primeiro acerto de cada pixel (-1 para o céu).
+
+        ---
+
+        Retorno:
+
+            - tuple[np.ndarray, np.ndarray] - Tupla contendo a cor do histórico (altura, largura, 3) e a quantidade de amostras do histórico (altura, largura) de cada pixel (0 onde não há histórico válido).
+        '''
+        height, width = depths.shape
+        directions = camera.pixel_centers - camera.camera_center.vec
+        directions /= np.linalg.norm(directions, axis=2, keepdims=True)
+        # Pixels em que nenhuma amostra atingiu algum objeto (a distância média é 0 apenas nesses pixels)
+        sky = (object_ids < 0) & (depths == 0)
+
+        # Vetor do centro da câmera anterior até o ponto (no céu, apenas a direção)
+        points = camera.camera_center.vec + directions * depths[..., None]
+        offsets = np.where(sky[..., None], directions, points - self.camera_center)
+        expected_depths = np.linalg.norm(offsets, axis=2)
+
+        # Interseção com o plano dos pixels da câmera anterior e posição (contínua) do pixel: o centro do pixel (i, j) fica em (i, j)
+        delta_u, delta_v = self.pixel_deltas
+        plane_normal = np.cross(delta_u, delta_v)
+        to_plane = self.pixel00_loc - self.camera_center
+        along = offsets @ plane_normal
+        in_front = along * (to_plane @ plane_normal) > 0
+        scale = np.divide(to_plane @ plane_normal, along, out=np.zeros_like(along), where=in_front)
+        on_plane = offsets * scale[..., None] - to_plane
+        x = on_plane @ delta_u / (delta_u @ delta_u)
+        y = on_plane @ delta_v / (delta_v @ delta_v)
+
+        # Interpolação bilinear, apenas com os pixels do frame anterior compatíveis com o ponto
+        x0 = np.floor(x).astype(np.int64)
+        y0 = np.floor(y).astype(np.int64)
+        fx = x - x0
+        fy = y - y0
+        history = np.zeros((height, width, 3))
+        history_samples = np.zeros((height, width))
+        weights = np.zeros((height, width))
+        for dy in (0, 1):
+            for dx in (0, 1):
+                xi = x0 + dx
+                yi = y0 + dy
+                weight = (fx if dx else 1.0 - fx) * (fy if dy else 1.0 - fy)
+                valid = in_front & (xi >= 0) & (xi < width) & (yi >= 0) & (yi < height)
+                xi = np.where(valid, xi, 0)
+                yi = np.where(valid, yi, 0)
+                valid &= self.object_ids[yi, xi] == object_ids
+                valid &= np.where(sky, self.depths[yi, xi] == 0, np.abs(self.depths[yi, xi] - expected_depths) <= self.depth_tolerance * expected_depths)
+                weight = weight * valid
+                history += self.colors[yi, xi] * weight[..., None]
+                history_samples += self.history_samples[yi, xi] * weight
+                weights += weight
+
+        # Pixels com pouco peso válido (a maior parte da interpolação caiu em outros objetos) ficam sem histórico
+        has_history = weights > 0.25
+        safe_weights = np.where(has_history, weights, 1.0)
+        history /= safe_weights[..., None]
+        history_samples = np.where(has_history, history_samples / safe_weights, 0.0)
+        return history, history_samples
+
+    def specular_pixels(self, features: np.ndarray, aovs: 'dict[str, np.ndarray]') -> np.ndarray:
+        '''
+        Pixels em que o primeiro acerto é especular (em alguma amostra): o primeiro vértice não especular do caminho (características do denoiser, ver Camera.features) não é o primeiro acerto (AOVs).
+
+        ---
+
+        Parâmetros:
+
+            - features: np.ndarray - Matriz (altura, largura, feature_channels) com a média das características de cada pixel.
+
+            - aovs: dict[str, np.ndarray] - AOVs do frame (ver Camera.aovs).
+
+        ---
+
+        Retorno:
+
+            - np.ndarray - Matriz (altura, largura) de booleanos.
+        '''
+        normal_difference = np.abs(features[..., feature_normal] - aovs['normal']).max(axis=2)
+        depth_difference = np.abs(features[..., feature_depth] - aovs['depth'])
+        return (normal_difference > 1e-3) | (depth_difference > self.depth_tolerance * aovs['depth'])
+
+    def neighborhood_bounds(self, colors: np.ndarray) -> 'tuple[np.ndarray, np.ndarray]':
+        '''
+        Limites da cor do histórico de cada pixel: média ± clamp_gamma desvios padrão das cores novas da vizinhança 3x3 do pixel.
+
+        ---
+
+        Parâmetros:
+
+            - colors: np.ndarray - Matriz (altura, largura, 3) com a cor linear média das amostras novas de cada pixel.
+
+        ---
+
+        Retorno:
+
+            - tuple[np.ndarray, np.ndarray] - Tupla contendo os limites inferior e superior (altura, largura, 3).
+        '''
+        height, width = colors.shape[:2]
+        padded = np.pad(colors, ((1, 1), (1, 1), (0, 0)), mode='edge')
+        total = np.zeros_like(colors)
+        squared_total = np.zeros_like(colors)
+        for dy in range(3):
+            for dx in range(3):
+                neighbor = padded[dy:dy + height, dx:dx + width]
+                total += neighbor
+                squared_total += neighbor * neighbor
+        mean = total / 9
+        deviation = np.sqrt(np.maximum(squared_total / 9 - mean * mean, 0.0))
+        return mean - self.clamp_gamma * deviation, mean + self.clamp_gamma * deviation
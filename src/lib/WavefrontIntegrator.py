@@ -0,0 +1,625 @@
+'''
+Integrador "wavefront" vetorizado com NumPy.
+
+Ao invés de seguir um raio por vez como em Camera.ray_color, todos os raios de um conjunto de linhas da imagem são gerados como arrays (N, 3) e são intersectados, sombreados e re-enfileirados em bloco, reflexão por reflexão. Os caminhos (raios) que terminam são retirados do conjunto ativo.
+
+O resultado é estatisticamente equivalente ao Camera.ray_color para os objetos Sphere e Triangle (e, consequentemente, Model) e para os materiais Lambertian, Metal e Dielectric.
+'''
+
+import numpy as np
+
+from lib.HittableList import HittableList
+from lib.objects.Sphere import Sphere
+from lib.objects.Triangle import Triangle
+from lib.materials.Lambertian import Lambertian
+from lib.materials.Metal import Metal
+from lib.materials.Dielectric import Dielectric
+from lib.constants import luminance_weights, feature_channels, feature_normal, feature_albedo, feature_depth, aov_normal, aov_albedo, aov_depth, aov_object_id, aov_material_id, aov_ids
+from lib.utils import standard_error, hash_keys
+from lib.RandomPool import RandomPool, uniform_unit_vectors
+from lib.intersections import sphere_hits, triangle_hits
+from lib.accelerators.FlatBVH import FlatBVH, flatten_models
+
+
+# Códigos dos tipos de materiais suportados
+LAMBERTIAN = 0
+METAL = 1
+DIELECTRIC = 2
+
+# Dimensões do ponto amostral de cada amostra (ver lib.samplers.Sampler). Cada par de dimensões (0 e 1, 2 e 3, ...) é amostrado em conjunto pelos amostradores quasi-Monte Carlo.
+# As duas primeiras são o jitter do raio primário e, depois, cada reflexão usa BOUNCE_DIMENSIONS dimensões
+PRIMARY_DIMENSIONS = 2
+BOUNCE_DIMENSIONS = 8
+LAMBERTIAN_DIRECTION = 0  # 2 dimensões
+METAL_FUZZ = 2  # 3 dimensões
+DIELECTRIC_REFLECTION = 5
+RUSSIAN_ROULETTE = 6
+
+
+def dot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    '''
+    Produto escalar linha a linha entre dois arrays de vetores.
+
+    ---
+
+    Parâmetros:
+
+        - a: np.ndarray - Array (N, 3) de vetores.
+
+        - b: np.ndarray - Array (N, 3) (ou (3,)) de vetores.
+
+    ---
+
+    Retorno:
+
+        - np.ndarray - Array (N,) com o produto escalar de cada linha.
+    '''
+    return np.einsum('ij,ij->i', a, np.broadcast_to(b, a.shape))
+
+def unit_vectors(v: np.ndarray) -> np.ndarray:
+    '''
+    Normaliza (torna unitário) cada linha de um array de vetores.
+
+    ---
+
+    Parâmetros:
+
+        - v: np.ndarray - Array (N, 3) de vetores.
+
+    ---
+
+    Retorno:
+
+        - np.ndarray - Array (N, 3) de vetores unitários.
+    '''
+    return v / np.sqrt(dot(v, v))[:, None]
+
+def reflect(v: np.ndarray, n: np.ndarray) -> np.ndarray:
+    '''
+    Versão vetorizada de Vec3.reflect.
+    '''
+    return v - 2 * dot(v, n)[:, None] * n
+
+def refract(uv: np.ndarray, n: np.ndarray, etai_over_etat: np.ndarray) -> np.ndarray:
+    '''
+    Versão vetorizada de Vec3.refract.
+    '''
+    cos_theta = np.minimum(dot(-uv, n), 1.0)
+    r_out_perp = etai_over_etat[:, None] * (uv + cos_theta[:, None] * n)
+    r_out_parallel = -np.sqrt(np.abs(1.0 - dot(r_out_perp, r_out_perp)))[:, None] * n
+    return r_out_perp + r_out_parallel
+
+
+class WavefrontIntegrator:
+
+    def __init__(self, world: HittableList, batch_size: int = 2 ** 18):
+        '''
+        Construtor do integrador wavefront. Converte os objetos da cena (mundo) para arrays NumPy.
+
+        ---
+
+        Parâmetros:
+
+            - world: HittableList - Lista de objetos que compõem a cena. Apenas Sphere, Triangle e Model (cujas faces são testadas como triângulos) são suportados. Se a lista tiver uma FlatBVH construída (ver HittableList.build_accelerator), ela é usada para encontrar as intersecções.
+
+            - batch_size: int - Quantidade aproximada de raios processados em bloco de uma só vez. Quanto maior, mais memória é utilizada.
+        '''
+        self.batch_size = batch_size
+        self.random_pool = RandomPool()
+
+        spheres: 'list[Sphere]' = []
+        triangles: 'list[Triangle]' = []
+        for obj in flatten_models(world.objects):
+            if isinstance(obj, Sphere):
+                spheres.append(obj)
+            elif isinstance(obj, Triangle):
+                triangles.append(obj)
+            else:
+                raise TypeError(f'Objeto não suportado pelo integrador wavefront: {type(obj)}')
+
+        materials = []
+        material_ids = {}
+
+        def material_id(material) -> int:
+            if id(material) not in material_ids:
+                material_ids[id(material)] = len(materials)
+                materials.append(material)
+            return material_ids[id(material)]
+
+        # Esferas
+        self.sphere_centers = np.array([sphere.center.vec for sphere in spheres], dtype=np.float64).reshape(-1, 3)
+        self.sphere_radii = np.array([sphere.radius for sphere in spheres], dtype=np.float64)
+        self.sphere_materials = np.array([material_id(sphere.material) for sphere in spheres], dtype=np.int64)
+
+        # Triângulos
+        self.triangle_vertexes = np.array(
+            [[vertex.vec for vertex in triangle.vertexes] for triangle in triangles], dtype=np.float64
+        ).reshape(-1, 3, 3)
+        self.triangle_normals = np.array([triangle.normal.vec for triangle in triangles], dtype=np.float64).reshape(-1, 3)
+        self.triangle_materials = np.array([material_id(triangle.material) for triangle in triangles], dtype=np.int64)
+        self.triangle_smooth = np.array([triangle.normals is not None for triangle in triangles], dtype=bool)
+        self.triangle_vertex_normals = np.array(
+            [[normal.vec for normal in triangle.normals] if triangle.normals is not None else np.zeros((3, 3)) for triangle in triangles],
+            dtype=np.float64
+        ).reshape(-1, 3, 3)
+
+        # Estrutura de aceleração: o índice de cada primitiva da estrutura (na ordem das folhas) é convertido para o índice do integrador (esferas primeiro, depois triângulos)
+        self.accelerator: FlatBVH = world.accelerator if isinstance(world.accelerator, FlatBVH) else None
+        if self.accelerator is not None:
+            indexes = {id(obj): k for k, obj in enumerate(spheres + triangles)}
+            self.accelerator_primitives = np.array([indexes[id(obj)] for obj in self.accelerator.primitives], dtype=np.int64)
+
+        # Identificadores dos objetos de cada primitiva (esferas e depois triângulos, como os índices de primitive), para as AOVs
+        self.primitive_object_ids = np.array([obj.object_id for obj in spheres + triangles], dtype=np.int64)
+
+        # Constantes de cada triângulo (dependem apenas dos vértices)
+        v1 = self.triangle_vertexes[:, 0]
+        v2 = self.triangle_vertexes[:, 1]
+        v3 = self.triangle_vertexes[:, 2]
+        self.triangle_d = -np.einsum('ij,ij->i', self.triangle_normals, v1)
+        # n · (aresta x (P - v)) == (n x aresta) · (P - v), então os produtos vetoriais podem ser calculados uma única vez
+        self.triangle_edge_normals = np.stack([
+            np.cross(self.triangle_normals, v2 - v1),
+            np.cross(self.triangle_normals, v3 - v2),
+            np.cross(self.triangle_normals, v1 - v3)
+        ], axis=1).reshape(-1, 3, 3)
+        e0 = v2 - v1
+        e1 = v3 - v1
+        self.triangle_e0 = e0
+        self.triangle_e1 = e1
+        self.triangle_d00 = np.einsum('ij,ij->i', e0, e0)
+        self.triangle_d01 = np.einsum('ij,ij->i', e0, e1)
+        self.triangle_d11 = np.einsum('ij,ij->i', e1, e1)
+        self.triangle_denom = self.triangle_d00 * self.triangle_d11 - self.triangle_d01 ** 2
+
+        # Materiais
+        self.material_types = np.empty(len(materials), dtype=np.int64)
+        self.material_albedo = np.ones((len(materials), 3), dtype=np.float64)
+        self.material_fuzz = np.zeros(len(materials), dtype=np.float64)
+        self.material_ir = np.ones(len(materials), dtype=np.float64)
+        self.material_ids = np.array([material.material_id for material in materials], dtype=np.int64)
+        for i, material in enumerate(materials):
+            if isinstance(material, Lambertian):
+                self.material_types[i] = LAMBERTIAN
+                self.material_albedo[i] = material.albedo.vec
+            elif isinstance(material, Metal):
+                self.material_types[i] = METAL
+                self.material_albedo[i] = material.albedo.vec
+                self.material_fuzz[i] = material.fuzz
+            elif isinstance(material, Dielectric):
+                self.material_types[i] = DIELECTRIC
+                self.material_ir[i] = material.ir
+            else:
+                raise TypeError(f'Material não suportado pelo integrador wavefront: {type(material)}')
+        # Materiais especulares perfeitos (o buffer de características é preenchido no primeiro vértice que não é um deles, ver Camera.ray_color)
+        self.material_specular = (self.material_types == DIELECTRIC) | ((self.material_types == METAL) & (self.material_fuzz == 0))
+
+    @property
+    def num_spheres(self) -> int:
+        '''
+        Quantidade de esferas da cena.
+        '''
+        return len(self.sphere_radii)
+
+    @property
+    def num_triangles(self) -> int:
+        '''
+        Quantidade de triângulos da cena.
+        '''
+        return len(self.triangle_materials)
+
+    def seed(self, seed: int):
+        '''
+        Reinicia o gerador de números aleatórios do integrador com a semente informada.
+
+        ---
+
+        Parâmetros:
+
+            - seed: int - Semente.
+        '''
+        self.random_pool.seed(seed)
+
+    def intersect(self, origins: np.ndarray, directions: np.ndarray, t_min: float = 0.001) -> 'tuple[np.ndarray, np.ndarray]':
+        '''
+        Encontra a intersecção mais próxima de cada raio com os objetos da cena. Se a cena tiver uma estrutura de aceleração em arrays (FlatBVH), os raios atravessam a estrutura em bloco; senão, cada primitiva é testada com todos os raios.
+
+        ---
+
+        Parâmetros:
+
+            - origins: np.ndarray - Array (N, 3) com as origens dos raios.
+
+            - directions: np.ndarray - Array (N, 3) com as direções dos raios.
+
+            - t_min: float - Valor mínimo de t para considerar uma intersecção.
+
+        ---
+
+        Retorno:
+
+            - tuple[np.ndarray, np.ndarray] - Tupla contendo o índice da primitiva atingida (esferas primeiro, depois triângulos; -1 caso o raio não atinja nada) e o valor t da intersecção.
+        '''
+        n = len(origins)
+        closest = np.full(n, np.inf)
+        primitive = np.full(n, -1, dtype=np.int64)
+
+        if self.accelerator is not None:
+            accelerator_primitive, closest = self.accelerator.intersect(origins, directions, t_min)
+            primitive = np.where(accelerator_primitive >= 0, self.accelerator_primitives[accelerator_primitive], -1)
+            return primitive, closest
+
+        if self.num_spheres > 0:
+            a = dot(directions, directions)
+        for k in range(self.num_spheres):
+            hit, t = sphere_hits(origins, directions, self.sphere_centers[k], self.sphere_radii[k], t_min, closest, a)
+            closest = np.where(hit, t, closest)
+            primitive[hit] = k
+
+        for k in range(self.num_triangles):
+            hit, t = triangle_hits(origins, directions, self.triangle_vertexes[k], self.triangle_normals[k], self.triangle_d[k], self.triangle_edge_normals[k], t_min, closest)
+            closest = np.where(hit, t, closest)
+            primitive[hit] = self.num_spheres + k
+
+        return primitive, closest
+
+    def surface(self, origins: np.ndarray, directions: np.ndarray, primitive: np.ndarray, t: np.ndarray) -> 'tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]':
+        '''
+        Calcula as informações do ponto de acerto (equivalente ao HitRecord) para raios que atingiram algum objeto.
+
+        ---
+
+        Parâmetros:
+
+            - origins: np.ndarray - Array (N, 3) com as origens dos raios.
+
+            - directions: np.ndarray - Array (N, 3) com as direções dos raios.
+
+            - primitive: np.ndarray - Array (N,) com o índice das primitivas atingidas (não pode conter -1).
+
+            - t: np.ndarray - Array (N,) com o valor t de cada intersecção.
+
+        ---
+
+        Retorno:
+
+            - tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray] - Tupla contendo os pontos de acerto, as normais (já invertidas de acordo com a face), os booleanos de front face e os índices dos materiais.
+        '''
+        points = origins + t[:, None] * directions
+        normals = np.empty_like(points)
+        materials = np.empty(len(points), dtype=np.int64)
+
+        is_sphere = primitive < self.num_spheres
+        if is_sphere.any():
+            k = primitive[is_sphere]
+            normals[is_sphere] = (points[is_sphere] - self.sphere_centers[k]) / self.sphere_radii[k][:, None]
+            materials[is_sphere] = self.sphere_materials[k]
+
+        is_triangle = ~is_sphere
+        if is_triangle.any():
+            k = primitive[is_triangle] - self.num_spheres
+            triangle_normals = self.triangle_normals[k].copy()
+            smooth = self.triangle_smooth[k]
+            if smooth.any():
+                ks = k[smooth]
+                v2 = points[is_triangle][smooth] - self.triangle_vertexes[ks, 0]
+                d20 = dot(v2, self.triangle_e0[ks])
+                d21 = dot(v2, self.triangle_e1[ks])
+                v = (self.triangle_d11[ks] * d20 - self.triangle_d01[ks] * d21) / self.triangle_denom[ks]
+                w = (self.triangle_d00[ks] * d21 - self.triangle_d01[ks] * d20) / self.triangle_denom[ks]
+                u = 1.0 - v - w
+                vertex_normals = self.triangle_vertex_normals[ks]
+                interpolated = u[:, None] * vertex_normals[:, 0] + v[:, None] * vertex_normals[:, 1] + w[:, None] * vertex_normals[:, 2]
+                triangle_normals[smooth] = unit_vectors(interpolated)
+            normals[is_triangle] = triangle_normals
+            materials[is_triangle] = self.triangle_materials[k]
+
+        front_face = dot(directions, normals) < 0
+        normals = np.where(front_face[:, None], normals, -normals)
+        return points, normals, front_face, materials
+
+    def scatter(self, directions: np.ndarray, normals: np.ndarray, front_face: np.ndarray, materials: np.ndarray, random) -> 'tuple[np.ndarray, np.ndarray, np.ndarray]':
+        '''
+        Versão vetorizada de Material.scatter para todos os materiais suportados.
+
+        ---
+
+        Parâmetros:
+
+            - directions: np.ndarray - Array (N, 3) com as direções dos raios que atingiram os objetos.
+
+            - normals: np.ndarray - Array (N, 3) com as normais dos pontos de acerto.
+
+            - front_face: np.ndarray - Array (N,) de booleanos de front face.
+
+            - materials: np.ndarray - Array (N,) com os índices dos materiais atingidos.
+
+            - random: Callable[[int], np.ndarray] - Função que retorna um array (N,) de números aleatórios entre 0 e 1 (um para cada raio) da dimensão informada da reflexão atual (ex: LAMBERTIAN_DIRECTION).
+
+        ---
+
+        Retorno:
+
+            - tuple[np.ndarray, np.ndarray, np.ndarray] - Tupla contendo se cada raio foi espalhado, as direções dos raios espalhados e as atenuações (cores).
+        '''
+        n = len(directions)
+        types = self.material_types[materials]
+        attenuation = self.material_albedo[materials]
+        scattered = np.ones(n, dtype=bool)
+        new_directions = np.empty_like(directions)
+
+        lambertian = types == LAMBERTIAN
+        if lambertian.any():
+            normal = normals[lambertian]
+            direction = normal + uniform_unit_vectors(random(LAMBERTIAN_DIRECTION)[lambertian], random(LAMBERTIAN_DIRECTION + 1)[lambertian])
+            near_zero = np.all(np.abs(direction) < 1e-8, axis=1)
+            direction[near_zero] = normal[near_zero]
+            new_directions[lambertian] = direction
+
+        metal = types == METAL
+        if metal.any():
+            normal = normals[metal]
+            reflected = reflect(unit_vectors(directions[metal]), normal)
+            in_unit_sphere = uniform_unit_vectors(random(METAL_FUZZ)[metal], random(METAL_FUZZ + 1)[metal]) * np.cbrt(random(METAL_FUZZ + 2)[metal])[:, None]
+            direction = reflected + self.material_fuzz[materials[metal]][:, None] * in_unit_sphere
+            new_directions[metal] = direction
+            scattered[metal] = dot(direction, normal) > 0
+
+        dielectric = types == DIELECTRIC
+        if dielectric.any():
+            normal = normals[dielectric]
+            ir = self.material_ir[materials[dielectric]]
+            refraction_ratio = np.where(front_face[dielectric], 1.0 / ir, ir)
+            unit_direction = unit_vectors(directions[dielectric])
+            cos_theta = np.minimum(dot(-unit_direction, normal), 1.0)
+            sin_theta = np.sqrt(np.maximum(1.0 - cos_theta ** 2, 0.0))
+            r0 = ((1 - refraction_ratio) / (1 + refraction_ratio)) ** 2
+            reflectance = r0 + (1 - r0) * (1 - cos_theta) ** 5
+            must_reflect = (refraction_ratio * sin_theta > 1.0) | (reflectance > random(DIELECTRIC_REFLECTION)[dielectric])
+            new_directions[dielectric] = np.where(
+                must_reflect[:, None],
+                reflect(unit_direction, normal),
+                refract(unit_direction, normal, refraction_ratio)
+            )
+
+        return scattered, new_directions, attenuation
+
+    @staticmethod
+    def background(directions: np.ndarray) -> np.ndarray:
+        '''
+        Cor do céu (fundo) para os raios que não atingiram nenhum objeto. Equivalente ao final de Camera.ray_color.
+        '''
+        t = 0.5 * (unit_vectors(directions)[:, 1] + 1.0)
+        return (1.0 - t)[:, None] * np.array([1.0, 1.0, 1.0]) + t[:, None] * np.array([0.5, 0.7, 1.0])
+
+    def trace(self, origins: np.ndarray, directions: np.ndarray, max_depth: int, rr_min_depth: int = 5, rr_threshold: float = 0.5, random_source=None, features: np.ndarray = None) -> np.ndarray:
+        '''
+        Calcula a cor de vários raios ao mesmo tempo. Equivalente a chamar Camera.ray_color para cada raio.
+
+        A cada reflexão, todos os raios ativos são intersectados e sombreados em bloco. Raios que não atingem nada, que são absorvidos ou que são terminados pela roleta russa saem do conjunto ativo.
+
+        ---
+
+        Parâmetros:
+
+            - origins: np.ndarray - Array (N, 3) com as origens dos raios.
+
+            - directions: np.ndarray - Array (N, 3) com as direções dos raios.
+
+            - max_depth: int - Quantidade máxima de reflexões/refrações de um raio.
+
+            - rr_min_depth: int - Quantidade mínima de reflexões/refrações de um raio antes que a roleta russa possa terminá-lo.
+
+            - rr_threshold: float - Limiar da roleta russa (veja Camera.ray_color). Use 0 para desativar a roleta russa.
+
+            - random_source: Callable[[np.ndarray, int], np.ndarray] - Função que recebe os índices de alguns raios e uma dimensão e retorna os números (entre 0 e 1) dessa dimensão do ponto amostral de cada um desses raios (ver sample_pixels). Se não for informada, os números aleatórios vêm do gerador do integrador (random_pool).
+
+            - features: np.ndarray - Array (N, feature_channels) a ser preenchido com as características do primeiro vértice não especular do caminho de cada raio e com as AOVs do primeiro acerto (como em Camera.ray_color). Opcional.
+
+        ---
+
+        Retorno:
+
+            - np.ndarray - Array (N, 3) com a cor (linear) de cada raio.
+        '''
+        colors = np.zeros((len(origins), 3), dtype=np.float64)
+        throughput = np.ones((len(origins), 3), dtype=np.float64)
+        paths = np.arange(len(origins))
+        if features is not None:
+            capturing = np.ones(len(origins), dtype=bool)  # Caminhos cujas características ainda não foram preenchidas
+            distance = np.zeros(len(origins), dtype=np.float64)
+
+        def random(dimension: int) -> np.ndarray:
+            # Um número aleatório para cada caminho ativo, da dimensão informada da reflexão atual
+            if random_source is None:
+                return self.random_pool.doubles(len(paths))
+            return random_source(paths, PRIMARY_DIMENSIONS + bounce * BOUNCE_DIMENSIONS + dimension)
+
+        for bounce in range(max_depth):
+            if len(paths) == 0:
+                break
+
+            primitive, t = self.intersect(origins, directions)
+
+            miss = primitive < 0
+            if miss.any():
+                colors[paths[miss]] = throughput[miss] * self.background(directions[miss])
+                if features is not None:
+                    missed = paths[miss]
+                    capture = capturing[missed]
+                    captured = missed[capture]
+                    features[captured, feature_normal] = -unit_vectors(directions[miss][capture])
+                    features[captured, feature_albedo] = colors[captured]
+                    features[captured, feature_depth] = 0.0
+                    capturing[captured] = False
+
+            hit = ~miss
+            paths = paths[hit]
+            origins = origins[hit]
+            directions = directions[hit]
+            throughput = throughput[hit]
+
+            points, normals, front_face, materials = self.surface(origins, directions, primitive[hit], t[hit])
+
+            if features is not None:
+                distance[paths] += t[hit] * np.sqrt(dot(directions, directions))
+                if bounce == 0:
+                    features[paths, aov_normal] = normals
+                    features[paths, aov_albedo] = self.material_albedo[materials]
+                    features[paths, aov_depth] = distance[paths]
+                    features[paths, aov_object_id] = self.primitive_object_ids[primitive[hit]] + 1
+                    features[paths, aov_material_id] = self.material_ids[materials] + 1
+                capture = capturing[paths] & ~self.material_specular[materials]
+                captured = paths[capture]
+                features[captured, feature_normal] = normals[capture]
+                features[captured, feature_albedo] = throughput[capture] * self.material_albedo[materials[capture]]
+                features[captured, feature_depth] = distance[captured]
+                capturing[captured] = False
+            scattered, new_directions, attenuation = self.scatter(directions, normals, front_face, materials, random)
+
+            # Raios absorvidos não contribuem com cor (preto), então só são removidos do conjunto ativo
+            paths = paths[scattered]
+            origins = points[scattered]
+            directions = new_directions[scattered]
+            throughput = throughput[scattered] * attenuation[scattered]
+
+            # Roleta russa
+            if bounce + 1 >= rr_min_depth:
+                max_throughput = throughput.max(axis=1)
+                survive_probability = np.minimum(max_throughput / rr_threshold, 1.0) if rr_threshold > 0 else np.ones(len(paths))
+                survive = random(RUSSIAN_ROULETTE) < survive_probability
+                paths = paths[survive]
+                origins = origins[survive]
+                directions = directions[survive]
+                throughput = throughput[survive] / survive_probability[survive][:, None]
+
+        return colors
+
+    def sample_pixels(self, camera, i: np.ndarray, j: np.ndarray, sample_numbers: np.ndarray = None, features: np.ndarray = None) -> np.ndarray:
+        '''
+        Calcula uma amostra (um raio com posição aleatória dentro do pixel) para cada pixel (i[k], j[k]). A câmera já deve estar inicializada (Camera.initialize).
+
+        Se a câmera tiver uma semente (ou um amostrador quasi-Monte Carlo), os números de cada amostra são calculados pelo amostrador da câmera a partir do frame, do pixel e do índice da amostra (sample_numbers), então a cor de cada amostra não depende das outras amostras do lote.
+
+        ---
+
+        Parâmetros:
+
+            - camera: Camera - Câmera que renderizará a imagem.
+
+            - i: np.ndarray - Array (N) com as posições horizontais dos pixels.
+
+            - j: np.ndarray - Array (N) com as posições verticais dos pixels.
+
+            - sample_numbers: np.ndarray - Array (N) com o índice de cada amostra dentro do seu pixel. Obrigatório se a câmera tiver uma semente ou um amostrador quasi-Monte Carlo.
+
+            - features: np.ndarray - Array (N, feature_channels) a ser preenchido com as características de cada amostra (ver trace). Opcional.
+
+        ---
+
+        Retorno:
+
+            - np.ndarray - Array (N, 3) com a cor (linear) de cada amostra.
+        '''
+        key = camera.random_key()
+        if key is None:
+            random_source = None
+            jitter = self.random_pool.doubles(2 * len(i)).reshape(len(i), 2)
+        else:
+            pixel_keys = hash_keys(key, j * camera.image_width + i)
+
+            def random_source(paths: np.ndarray, dimension: int) -> np.ndarray:
+                return camera.sampler.samples(pixel_keys[paths], sample_numbers[paths], dimension)
+
+            every_path = np.arange(len(i))
+            jitter = np.stack([random_source(every_path, 0), random_source(every_path, 1)], axis=1)
+        origins, directions = camera.get_rays(i, j, jitter - 0.5)
+        return self.trace(origins, directions, camera.max_depth, camera.rr_min_depth, camera.rr_threshold, random_source, features)
+
+    def render_lines(self, camera, starting_line: int, end_line: int, progress_callback=None, starting_column: int = 0, end_column: int = None, samples: int = None, sample_offset: int = 0) -> 'tuple[np.ndarray, np.ndarray, np.ndarray]':
+        '''
+        Renderiza algumas linhas da imagem (ou apenas um retângulo delas, limitando as colunas). A câmera já deve estar inicializada (Camera.initialize).
+
+        Se a amostragem adaptativa estiver ativada na câmera (camera.adaptive), os pixels são amostrados em passadas: a primeira com camera.min_samples_per_pixel amostras para todos os pixels e as seguintes com a mesma quantidade de amostras apenas para os pixels cujo erro padrão da luminância ainda é maior que camera.adaptive_tolerance, até o limite de amostras (samples).
+
+        ---
+
+        Parâmetros:
+
+            - camera: Camera - Câmera que renderizará a imagem.
+
+            - starting_line: int - Linha inicial da imagem a ser renderizada.
+
+            - end_line: int - Linha final da imagem a ser renderizada (não incluída).
+
+            - progress_callback: Callable[[int], None] - Função chamada com a quantidade de linhas finalizadas, para atualizar uma barra de progresso (opcional).
+
+            - starting_column: int - Coluna inicial a ser renderizada.
+
+            - end_column: int - Coluna final a ser renderizada (não incluída). Se não for especificada, será a largura da imagem.
+
+            - samples: int - Quantidade (máxima, com amostragem adaptativa) de amostras por pixel. Se não for especificada, será camera.samples_per_pixel.
+
+            - sample_offset: int - Quantidade de amostras por pixel de passadas anteriores (índice da primeira amostra de cada pixel, para os números aleatórios baseados em contador).
+
+        ---
+
+        Retorno:
+
+            - tuple[np.ndarray, np.ndarray, np.ndarray] - Tupla contendo um array (end_line - starting_line, end_column - starting_column, 3) com a soma das cores (lineares) de todas as amostras de cada pixel, um array (end_line - starting_line, end_column - starting_column) com a quantidade de amostras de cada pixel e um array (end_line - starting_line, end_column - starting_column, feature_channels) com a soma das características das amostras de cada pixel.
+        '''
+        if end_column is None:
+            end_column = camera.image_width
+        budget = camera.samples_per_pixel if samples is None else samples
+        height = end_line - starting_line
+        width = end_column - starting_column
+        num_pixels = height * width
+
+        pixels = np.zeros((num_pixels, 3), dtype=np.float64)
+        counts = np.zeros(num_pixels, dtype=np.int64)
+        features = np.zeros((num_pixels, feature_channels), dtype=np.float64)
+        luminances = np.zeros(num_pixels, dtype=np.float64)
+        squared_luminances = np.zeros(num_pixels, dtype=np.float64)
+
+        # Pixels que ainda recebem amostras (índices ordenados por linha, dentro do retângulo)
+        active = np.arange(num_pixels)
+        pass_samples = min(camera.min_samples_per_pixel, budget) if camera.adaptive else budget
+
+        while len(active) > 0:
+            # Todos os pixels ativos têm a mesma quantidade de amostras, então o limite restante é o mesmo para todos
+            pass_samples = min(pass_samples, budget - counts[active[0]])
+            pixels_per_batch = max(1, self.batch_size // (width * pass_samples)) * width
+
+            for batch_start in range(0, len(active), pixels_per_batch):
+                batch = active[batch_start:batch_start + pixels_per_batch]
+                sample_index = np.tile(np.arange(len(batch)), pass_samples)
+                pixel_index = batch[sample_index]
+                sample_numbers = sample_offset + counts[pixel_index] + np.repeat(np.arange(pass_samples), len(batch))
+
+                sample_features = np.zeros((len(sample_index), feature_channels), dtype=np.float64)
+                colors = self.sample_pixels(camera, pixel_index % width + starting_column, pixel_index // width + starting_line, sample_numbers, sample_features)
+                sample_features[sample_numbers != 0, aov_ids] = 0  # Os identificadores são apenas da primeira amostra de cada pixel
+
+                for channel in range(3):
+                    pixels[batch, channel] += np.bincount(sample_index, weights=colors[:, channel], minlength=len(batch))
+                for channel in range(feature_channels):
+                    features[batch, channel] += np.bincount(sample_index, weights=sample_features[:, channel], minlength=len(batch))
+                if camera.adaptive:
+                    sample_luminances = colors @ luminance_weights
+                    luminances[batch] += np.bincount(sample_index, weights=sample_luminances, minlength=len(batch))
+                    squared_luminances[batch] += np.bincount(sample_index, weights=sample_luminances ** 2, minlength=len(batch))
+                elif progress_callback is not None:
+                    progress_callback(len(batch) // width)
+
+            counts[active] += pass_samples
+            if not camera.adaptive:
+                break
+
+            error = standard_error(counts[active], luminances[active], squared_luminances[active])
+            active = active[(error > camera.adaptive_tolerance) & (counts[active] < budget)]
+            pass_samples = camera.min_samples_per_pixel
+
+        if camera.adaptive and progress_callback is not None:
+            progress_callback(height)
+
+        return pixels.reshape(height, width, 3), counts.reshape(height, width), features.reshape(height, width, feature_channels)
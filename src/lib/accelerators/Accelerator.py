@@ -0,0 +1,160 @@
+import numpy as np
+
+from lib.objects.Hittable import Hittable
+from lib.Ray import Ray
+from lib.HitRecord import HitRecord
+from lib.Interval import Interval
+
+
+class Accelerator:
+
+    # Nome da estrutura em create_accelerator
+    name: str = None
+
+    def hit(self, ray: Ray, interval: Interval) -> "tuple[bool, HitRecord]":
+        '''
+        Encontra o acerto mais próximo de um raio com os objetos da estrutura. Equivalente ao laço de HittableList.hit, mas testando apenas os objetos que o raio pode atingir.
+
+        ---
+
+        Parâmetros:
+
+            - ray: Ray - Raio a ser verificado.
+
+            - interval: Interval - Intervalo de t em que o raio pode atingir algum objeto.
+
+        ---
+
+        Retorno:
+
+            - tuple[bool, HitRecord] - Tupla contendo um booleano que indica se o raio atingiu algum objeto e o registro de acerto mais próximo (None caso o raio não atinja nenhum objeto).
+        '''
+        raise NotImplementedError
+
+    def can_refit(self, objects: 'list[Hittable]') -> bool:
+        '''
+        Verifica se a estrutura pode ser reajustada (refit) para uma lista de objetos: a lista deve ter os mesmos objetos da construção, na mesma ordem e com os mesmos tipos, apenas em outras posições (por exemplo, as esferas rotacionadas de cada frame da animação).
+
+        ---
+
+        Parâmetros:
+
+            - objects: list[Hittable] - Objetos da cena.
+
+        ---
+
+        Retorno:
+
+            - bool - True se a estrutura pode ser reajustada para os objetos.
+        '''
+        raise NotImplementedError
+
+    def refit(self, objects: 'list[Hittable]'):
+        '''
+        Reajusta a estrutura, sem reconstruí-la, para os objetos nas suas novas posições: as caixas dos nós são recalculadas de baixo para cima, mantendo a árvore (quais objetos ficam em cada folha). É bem mais rápido do que a construção, mas a árvore pode ficar pior (caixas maiores e mais sobrepostas) à medida que os objetos se afastam das posições da construção; o custo SAH (sah_cost) mede essa piora.
+
+        ---
+
+        Parâmetros:
+
+            - objects: list[Hittable] - Objetos da cena (ver can_refit).
+        '''
+        raise NotImplementedError
+
+    def sah_cost(self) -> float:
+        '''
+        Custo SAH da estrutura: quantidade esperada de objetos testados por um raio que atravessa a caixa da raiz (menor é melhor).
+        '''
+        raise NotImplementedError
+
+    def statistics(self) -> dict:
+        '''
+        Estatísticas da estrutura, para acompanhar a sua construção e o seu uso (por exemplo, o tempo de construção e a quantidade média de nós visitados por raio).
+
+        Os contadores de uso são acumulados no processo em que os raios são traçados: com o backend process, ficam nos processos do pool.
+
+        ---
+
+        Retorno:
+
+            - dict - Dicionário com as estatísticas.
+        '''
+        raise NotImplementedError
+
+    def reset_statistics(self):
+        '''
+        Zera os contadores de uso da estrutura (raios e nós visitados).
+        '''
+        raise NotImplementedError
+
+    @staticmethod
+    def describe(statistics: dict) -> str:
+        '''
+        Descrição (em uma linha) das estatísticas de uma estrutura, para serem mostradas ao final de cada renderização.
+        '''
+        average = f'{statistics["average_nodes_visited"]:.1f}' if statistics['average_nodes_visited'] is not None else '-'
+        if statistics['refit_time'] is None:
+            update = f'construída em {statistics["build_time"] * 1000:.1f} ms'
+        else:
+            update = f'reajustada em {statistics["refit_time"] * 1000:.1f} ms ({statistics["refits"]} reajustes desde a construção em {statistics["build_time"] * 1000:.1f} ms, com custo SAH {statistics["build_sah_cost"]:.2f})'
+        if statistics.get('rebuilt_workers', 0) > 0 and statistics['refit_time'] is not None:
+            # Estatísticas juntadas de vários processos (ver merge_statistics), em que apenas alguns reajustaram a estrutura
+            update += f' (reconstruída em {statistics["rebuilt_workers"]} de {statistics["workers"]} processos)'
+        return (
+            f'{statistics["primitives"]} objetos, {update}, '
+            f'{statistics["nodes"]} nós, profundidade {statistics["depth"]}, custo SAH {statistics["sah_cost"]:.2f}, '
+            f'{average} nós visitados por raio ({statistics["rays"]} raios)'
+        )
+
+    @staticmethod
+    def merge_statistics(statistics: 'list[dict]') -> dict:
+        '''
+        Junta as estatísticas de uma mesma estrutura construída em vários processos (ver ProcessExecutor): os raios e os nós visitados são somados, e os tempos de construção e de reajuste são a média entre os processos. A organização da árvore (objetos, nós, profundidade e custos SAH) é a do primeiro processo, já que a construção é determinística.
+
+        Cada processo decide sozinho se reajusta ou reconstrói a sua estrutura no frame (ver update_accelerator), e um processo que não renderizou o frame anterior parte de uma estrutura mais antiga, então as decisões podem ser diferentes: o tempo de reajuste é a média apenas dos processos que reajustaram, e as chaves 'workers' e 'rebuilt_workers' guardam a quantidade de processos e a de processos que (re)construíram a estrutura no frame.
+
+        ---
+
+        Parâmetros:
+
+            - statistics: list[dict] - Estatísticas (ver statistics) de cada processo.
+
+        ---
+
+        Retorno:
+
+            - dict - Estatísticas da estrutura, com as mesmas chaves de statistics, além de 'workers' e 'rebuilt_workers'.
+        '''
+        refitted = [worker for worker in statistics if worker['refit_time'] is not None]
+        merged = dict(refitted[0] if len(refitted) > 0 else statistics[0])
+        rays = sum(worker['rays'] for worker in statistics)
+        nodes_visited = sum(worker['average_nodes_visited'] * worker['rays'] for worker in statistics if worker['rays'] > 0)
+        merged['rays'] = rays
+        merged['average_nodes_visited'] = nodes_visited / rays if rays > 0 else None
+        merged['build_time'] = sum(worker['build_time'] for worker in statistics) / len(statistics)
+        merged['refit_time'] = sum(worker['refit_time'] for worker in refitted) / len(refitted) if len(refitted) > 0 else None
+        merged['workers'] = len(statistics)
+        merged['rebuilt_workers'] = len(statistics) - len(refitted)
+        return merged
+
+    @staticmethod
+    def objects_bounds(objects: 'list[Hittable]') -> 'tuple[np.ndarray, np.ndarray]':
+        '''
+        Caixas envolventes de uma lista de objetos, como arrays.
+
+        ---
+
+        Parâmetros:
+
+            - objects: list[Hittable] - Objetos.
+
+        ---
+
+        Retorno:
+
+            - tuple[np.ndarray, np.ndarray] - Arrays (N, 3) com os cantos mínimos e máximos das caixas.
+        '''
+        boxes = [obj.bounding_box() for obj in objects]
+        minimums = np.array([box.minimum for box in boxes], dtype=np.float64).reshape(-1, 3)
+        maximums = np.array([box.maximum for box in boxes], dtype=np.float64).reshape(-1, 3)
+        return minimums, maximums
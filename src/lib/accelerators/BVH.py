@@ -0,0 +1,334 @@
+import numpy as np
+
+from lib.accelerators.Accelerator import Accelerator
+from lib.accelerators.BVHNode import BVHNode
+from lib.objects.Hittable import Hittable
+from lib.AABB import AABB
+from lib.Ray import Ray
+from lib.HitRecord import HitRecord
+from lib.Interval import Interval
+
+from time import perf_counter
+import math
+
+
+# Custo de atravessar um nó (testar a caixa de um raio) em relação ao custo de testar um objeto (Sphere.hit ou Triangle.hit)
+TRAVERSAL_COST = 0.125
+
+
+def boxes_area(minimums: np.ndarray, maximums: np.ndarray) -> np.ndarray:
+    '''
+    Área da superfície de várias caixas (0 para caixas vazias, com o mínimo maior que o máximo).
+
+    ---
+
+    Parâmetros:
+
+        - minimums: np.ndarray - Array (N, 3) com os cantos mínimos.
+
+        - maximums: np.ndarray - Array (N, 3) com os cantos máximos.
+
+    ---
+
+    Retorno:
+
+        - np.ndarray - Array (N,) com as áreas.
+    '''
+    extent = np.maximum(maximums - minimums, 0)
+    return 2 * (extent[:, 0] * extent[:, 1] + extent[:, 1] * extent[:, 2] + extent[:, 2] * extent[:, 0])
+
+def sah_split(minimums: np.ndarray, maximums: np.ndarray, centroids: np.ndarray, bins: int) -> 'tuple[float, int, np.ndarray]':
+    '''
+    Encontra a melhor divisão de um conjunto de objetos em dois pela heurística da área da superfície (SAH), com os centros dos objetos agrupados em bins faixas de cada eixo.
+
+    O custo de uma divisão é a quantidade esperada de objetos testados por um raio que atravessa a caixa do conjunto: a probabilidade de atravessar cada lado (área do lado / área do conjunto) vezes a quantidade de objetos do lado.
+
+    ---
+
+    Parâmetros:
+
+        - minimums: np.ndarray - Array (N, 3) com os cantos mínimos das caixas dos objetos.
+
+        - maximums: np.ndarray - Array (N, 3) com os cantos máximos das caixas dos objetos.
+
+        - centroids: np.ndarray - Array (N, 3) com os centros das caixas dos objetos.
+
+        - bins: int - Quantidade de faixas de cada eixo.
+
+    ---
+
+    Retorno:
+
+        - tuple[float, int, np.ndarray] - Tupla contendo o custo da melhor divisão (sem o custo de atravessar o nó; infinito se os objetos não puderem ser divididos, por exemplo, com todos os centros no mesmo ponto), o eixo da divisão e um array (N,) de booleanos com os objetos do lado esquerdo.
+    '''
+    parent_area = boxes_area(minimums.min(axis=0)[None], maximums.max(axis=0)[None])[0]
+    centroids_min = centroids.min(axis=0)
+    centroids_max = centroids.max(axis=0)
+
+    best_cost, best_axis, best_left = math.inf, 0, None
+    for axis in range(3):
+        extent = centroids_max[axis] - centroids_min[axis]
+        if extent <= 0:
+            continue
+
+        indexes = np.minimum(((centroids[:, axis] - centroids_min[axis]) * (bins / extent)).astype(np.int64), bins - 1)
+        counts = np.bincount(indexes, minlength=bins)
+
+        # Caixa de cada faixa (faixas vazias ficam com uma caixa vazia, de +infinito a -infinito)
+        order = np.argsort(indexes, kind='stable')
+        nonempty = counts > 0
+        starts = (np.cumsum(counts) - counts)[nonempty]
+        bin_min = np.full((bins, 3), np.inf)
+        bin_max = np.full((bins, 3), -np.inf)
+        bin_min[nonempty] = np.minimum.reduceat(minimums[order], starts, axis=0)
+        bin_max[nonempty] = np.maximum.reduceat(maximums[order], starts, axis=0)
+
+        # Divisão k: faixas 0..k-1 à esquerda e k..bins-1 à direita
+        left_counts = np.cumsum(counts)[:-1]
+        right_counts = len(centroids) - left_counts
+        left_area = boxes_area(np.minimum.accumulate(bin_min)[:-1], np.maximum.accumulate(bin_max)[:-1])
+        right_area = boxes_area(np.minimum.accumulate(bin_min[::-1])[::-1][1:], np.maximum.accumulate(bin_max[::-1])[::-1][1:])
+        costs = (left_area * left_counts + right_area * right_counts) / max(parent_area, np.finfo(np.float64).tiny)
+        costs[(left_counts == 0) | (right_counts == 0)] = np.inf
+
+        k = int(np.argmin(costs))
+        if costs[k] < best_cost:
+            best_cost, best_axis, best_left = float(costs[k]), axis, indexes <= k
+
+    return best_cost, best_axis, best_left
+
+
+class BVH(Accelerator):
+
+    name = 'bvh'
+
+    def __init__(self, objects: 'list[Hittable]', max_leaf_size: int = 4, bins: int = 12):
+        '''
+        Construtor de uma hierarquia de volumes envolventes (bounding volume hierarchy): uma árvore binária de caixas alinhadas aos eixos (AABB) sobre os objetos da cena. Um raio só testa os objetos das folhas cujas caixas ele atravessa, então o custo de cada raio cresce, tipicamente, com o logaritmo da quantidade de objetos, ao invés de linearmente (como em HittableList.hit).
+
+        A árvore é construída de cima para baixo pela heurística da área da superfície (SAH, ver sah_split): cada nó é dividido onde a quantidade esperada de objetos testados é menor, e vira uma folha quando dividi-lo não compensa o custo de atravessar mais um nó (ver TRAVERSAL_COST).
+
+        Os objetos precisam implementar bounding_box (Sphere e Triangle implementam). A estrutura não acompanha mudanças nos objetos: se eles se moverem, ela deve ser reajustada (refit) ou reconstruída.
+
+        ---
+
+        Parâmetros:
+
+            - objects: list[Hittable] - Objetos da cena.
+
+            - max_leaf_size: int - Quantidade de objetos abaixo da qual um nó pode virar folha (se dividi-lo não compensar). Nós com mais objetos sempre são divididos, exceto quando todos têm o mesmo centro.
+
+            - bins: int - Quantidade de faixas de cada eixo avaliadas pela SAH.
+        '''
+        if max_leaf_size < 1:
+            raise ValueError(f'O tamanho máximo das folhas deve ser positivo, mas é {max_leaf_size}.')
+        if bins < 2:
+            raise ValueError(f'A quantidade de faixas da SAH deve ser pelo menos 2, mas é {bins}.')
+
+        self.max_leaf_size = max_leaf_size
+        self.bins = bins
+        self.rays = 0
+        self.nodes_visited = 0
+
+        start_time = perf_counter()
+        self.__minimums, self.__maximums = self.objects_bounds(objects)
+        self.__centroids = (self.__minimums + self.__maximums) / 2
+        self.__order = np.arange(len(objects))
+        self.node_count = 0
+        self.depth = 0
+        self.root = self.__build(0, len(objects), 1) if len(objects) > 0 else None
+        # Objetos na ordem das folhas (cada folha é um intervalo contínuo)
+        self.primitives: 'list[Hittable]' = [objects[k] for k in self.__order]
+        self.build_time = perf_counter() - start_time
+        self.build_sah_cost = self.sah_cost()
+        self.refit_time: float = None  # Tempo do último reajuste (None se a árvore não foi reajustada desde a construção)
+        self.refits = 0
+
+    def __build(self, start: int, end: int, depth: int) -> BVHNode:
+        '''
+        Constrói (recursivamente) o nó dos objetos order[start:end]. Reordena order[start:end] para que cada filho seja um intervalo contínuo.
+        '''
+        self.node_count += 1
+        self.depth = max(self.depth, depth)
+
+        indexes = self.__order[start:end]
+        minimums = self.__minimums[indexes]
+        maximums = self.__maximums[indexes]
+        box = AABB(minimums.min(axis=0), maximums.max(axis=0))
+        count = end - start
+        if count == 1:
+            return BVHNode(box, start=start, count=1)
+
+        cost, axis, left = sah_split(minimums, maximums, self.__centroids[indexes], self.bins)
+        if left is None:
+            # Todos os centros no mesmo ponto: não há divisão melhor do que qualquer outra
+            if count <= self.max_leaf_size:
+                return BVHNode(box, start=start, count=count)
+            left = np.arange(count) < count // 2
+        elif count <= self.max_leaf_size and cost + TRAVERSAL_COST >= count:
+            return BVHNode(box, start=start, count=count)
+
+        self.__order[start:end] = np.concatenate([indexes[left], indexes[~left]])
+        middle = start + int(left.sum())
+        return BVHNode(
+            box,
+            left=self.__build(start, middle, depth + 1),
+            right=self.__build(middle, end, depth + 1),
+            axis=axis
+        )
+
+    def can_refit(self, objects: 'list[Hittable]') -> bool:
+        if len(objects) != len(self.primitives):
+            return False
+        return all(type(objects[k]) is type(primitive) for k, primitive in zip(self.__order, self.primitives))
+
+    def refit(self, objects: 'list[Hittable]'):
+        if not self.can_refit(objects):
+            raise ValueError('A BVH só pode ser reajustada para os mesmos objetos da construção (mesma quantidade, ordem e tipos).')
+
+        start_time = perf_counter()
+        self.__minimums, self.__maximums = self.objects_bounds(objects)
+        self.__centroids = (self.__minimums + self.__maximums) / 2
+        self.primitives = [objects[k] for k in self.__order]
+        if self.root is not None:
+            self.__refit(self.root)
+        self.refit_time = perf_counter() - start_time
+        self.refits += 1
+
+    def __refit(self, node: BVHNode):
+        '''
+        Recalcula (recursivamente, de baixo para cima) a caixa de um nó a partir das caixas dos seus objetos (folha) ou dos seus filhos.
+        '''
+        if node.is_leaf:
+            indexes = self.__order[node.start:node.start + node.count]
+            node.box = AABB(self.__minimums[indexes].min(axis=0), self.__maximums[indexes].max(axis=0))
+        else:
+            self.__refit(node.left)
+            self.__refit(node.right)
+            node.box = AABB(np.minimum(node.left.box.minimum, node.right.box.minimum), np.maximum(node.left.box.maximum, node.right.box.maximum))
+
+    def sah_cost(self) -> float:
+        '''
+        Custo SAH da árvore: quantidade esperada de objetos testados (mais TRAVERSAL_COST por nó atravessado) por um raio que atravessa a caixa da raiz. Mede a qualidade da árvore (menor é melhor).
+        '''
+        if self.root is None:
+            return 0.0
+        root_area = self.root.box.surface_area()
+        if root_area <= 0:
+            return float(len(self.primitives))
+
+        cost = 0.0
+        stack = [self.root]
+        while len(stack) > 0:
+            node = stack.pop()
+            if node.is_leaf:
+                cost += node.box.surface_area() / root_area * node.count
+            else:
+                cost += node.box.surface_area() / root_area * TRAVERSAL_COST
+                stack.append(node.left)
+                stack.append(node.right)
+        return cost
+
+    def hit(self, ray: Ray, interval: Interval) -> "tuple[bool, HitRecord]":
+        '''
+        Encontra o acerto mais próximo de um raio, atravessando a árvore com uma pilha. Em cada nó interno, o filho do lado de onde o raio vem (no eixo da divisão) é visitado primeiro, para que o acerto mais próximo seja encontrado cedo e as caixas mais distantes sejam descartadas.
+        '''
+        origin = tuple(ray.origin.vec.tolist())
+        direction = ray.direction.vec.tolist()
+        inverse_direction = tuple(1.0 / d if d != 0 else math.inf for d in direction)
+        negative = tuple(d < 0 for d in direction)
+        primitives = self.primitives
+
+        t_min = interval.min
+        closest_so_far = interval.max
+        hit_record = None
+        visited = 0
+        stack = [self.root] if self.root is not None else []
+        while len(stack) > 0:
+            node = stack.pop()
+            visited += 1
+            if not node.box.hit(origin, inverse_direction, t_min, closest_so_far):
+                continue
+            if node.count > 0:
+                for obj in primitives[node.start:node.start + node.count]:
+                    hit, rec = obj.hit(ray, Interval(t_min, closest_so_far))
+                    if hit:
+                        closest_so_far = rec.t
+                        hit_record = rec
+            elif negative[node.axis]:
+                stack.append(node.left)
+                stack.append(node.right)
+            else:
+                stack.append(node.right)
+                stack.append(node.left)
+
+        # Com threads, incrementos simultâneos podem se perder: os contadores são aproximados
+        self.rays += 1
+        self.nodes_visited += visited
+
+        if hit_record is None:
+            return False, None
+        return True, hit_record
+
+    def candidates(self, ray: Ray, interval: Interval) -> np.ndarray:
+        '''
+        Encontra os objetos que o raio pode atingir: os das folhas cujas caixas ele atravessa. Diferente de hit, os objetos não são testados, então nenhuma caixa é descartada por estar depois de um acerto; quem chama testa todos os candidatos de uma só vez (por exemplo, Model.hit, com uma operação vetorizada sobre os triângulos).
+
+        ---
+
+        Parâmetros:
+
+            - ray: Ray - Raio a ser verificado.
+
+            - interval: Interval - Intervalo de t em que o raio pode atingir algum objeto.
+
+        ---
+
+        Retorno:
+
+            - np.ndarray - Índices (na lista de objetos da construção) dos objetos candidatos.
+        '''
+        origin = tuple(ray.origin.vec.tolist())
+        inverse_direction = tuple(1.0 / d if d != 0 else math.inf for d in ray.direction.vec.tolist())
+
+        leaves = []
+        visited = 0
+        stack = [self.root] if self.root is not None else []
+        while len(stack) > 0:
+            node = stack.pop()
+            visited += 1
+            if not node.box.hit(origin, inverse_direction, interval.min, interval.max):
+                continue
+            if node.count > 0:
+                leaves.append(self.__order[node.start:node.start + node.count])
+            else:
+                stack.append(node.right)
+                stack.append(node.left)
+
+        self.rays += 1
+        self.nodes_visited += visited
+
+        if len(leaves) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(leaves)
+
+    def statistics(self) -> dict:
+        '''
+        Estatísticas da árvore: quantidade de objetos ('primitives'), tempo de construção em segundos ('build_time'), custo SAH na construção ('build_sah_cost'), tempo do último reajuste em segundos ('refit_time', None se a árvore não foi reajustada), quantidade de reajustes desde a construção ('refits'), quantidade de nós ('nodes'), profundidade ('depth'), custo SAH atual ('sah_cost', ver sah_cost), quantidade de raios traçados ('rays') e média de nós visitados por raio ('average_nodes_visited', None se nenhum raio foi traçado).
+        '''
+        return {
+            'primitives': len(self.primitives),
+            'build_time': self.build_time,
+            'build_sah_cost': self.build_sah_cost,
+            'refit_time': self.refit_time,
+            'refits': self.refits,
+            'nodes': self.node_count,
+            'depth': self.depth,
+            'sah_cost': self.sah_cost(),
+            'rays': self.rays,
+            'average_nodes_visited': self.nodes_visited / self.rays if self.rays > 0 else None
+        }
+
+    def reset_statistics(self):
+        self.rays = 0
+        self.nodes_visited = 0
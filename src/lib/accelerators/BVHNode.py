@@ -0,0 +1,38 @@
+from lib.AABB import AABB
+
+
+class BVHNode:
+
+    def __init__(self, box: AABB, left: 'BVHNode' = None, right: 'BVHNode' = None, axis: int = 0, start: int = 0, count: int = 0):
+        '''
+        Construtor de um nó da hierarquia de volumes envolventes (ver BVH). Um nó interno tem dois filhos; uma folha guarda um intervalo da lista de objetos ordenada da BVH.
+
+        ---
+
+        Parâmetros:
+
+            - box: AABB - Caixa que envolve todos os objetos abaixo do nó.
+
+            - left: BVHNode - Filho esquerdo (None em uma folha).
+
+            - right: BVHNode - Filho direito (None em uma folha).
+
+            - axis: int - Eixo (0, 1 ou 2) da divisão entre os filhos. Os objetos do filho esquerdo têm os centros menores nesse eixo.
+
+            - start: int - Índice do primeiro objeto da folha na lista ordenada da BVH.
+
+            - count: int - Quantidade de objetos da folha (0 em um nó interno).
+        '''
+        self.box = box
+        self.left = left
+        self.right = right
+        self.axis = axis
+        self.start = start
+        self.count = count
+
+    @property
+    def is_leaf(self) -> bool:
+        '''
+        Verdadeiro se o nó é uma folha.
+        '''
+        return self.count > 0
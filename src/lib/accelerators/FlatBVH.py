@@ -0,0 +1,300 @@
+import numpy as np
+
+from lib.accelerators.Accelerator import Accelerator
+from lib.accelerators.BVH import BVH
+from lib.objects.Hittable import Hittable
+from lib.objects.Sphere import Sphere
+from lib.objects.Triangle import Triangle
+from lib.objects.Model import Model
+from lib.Ray import Ray
+from lib.HitRecord import HitRecord
+from lib.Interval import Interval
+from lib.intersections import sphere_hits, triangle_hits
+
+from time import perf_counter
+import math
+
+
+# Tipos das primitivas da estrutura
+SPHERE = 0
+TRIANGLE = 1
+
+
+def flatten_models(objects: 'list[Hittable]') -> 'list[Hittable]':
+    '''
+    Substitui cada Model (adicionado a uma HittableList como um único objeto) pelas suas faces, para as estruturas em arrays, que guardam cada triângulo separadamente.
+
+    ---
+
+    Parâmetros:
+
+        - objects: list[Hittable] - Objetos da cena.
+
+    ---
+
+    Retorno:
+
+        - list[Hittable] - Objetos da cena, com as faces no lugar dos modelos.
+    '''
+    primitives = []
+    for obj in objects:
+        if isinstance(obj, Model):
+            primitives.extend(obj.faces)
+        else:
+            primitives.append(obj)
+    return primitives
+
+
+class FlatBVH(Accelerator):
+
+    name = 'flat_bvh'
+
+    def __init__(self, objects: 'list[Hittable]', max_leaf_size: int = 4, bins: int = 12):
+        '''
+        Construtor de uma BVH linearizada: a árvore da BVH (construída pela SAH) é guardada em arrays contínuos do NumPy, em profundidade (o filho esquerdo de cada nó interno é o nó seguinte), ao invés de objetos do Python ligados entre si.
+
+        Com os arrays, a estrutura pode ser atravessada por um bloco inteiro de raios de uma só vez (intersect, usado pelo integrador wavefront): cada nó é testado contra todos os raios que chegaram nele com operações vetorizadas (slab test), e só os raios que atravessam a caixa seguem para os filhos. Assim, o custo do interpretador é de algumas operações por nó visitado pelo bloco, e não por raio. Um raio sozinho (hit, usado por HittableList.hit) atravessa a mesma árvore, nó por nó.
+
+        Apenas Sphere, Triangle e Model (cujas faces viram primitivas da estrutura, ver flatten_models) são suportados.
+
+        ---
+
+        Parâmetros:
+
+            - objects: list[Hittable] - Objetos da cena.
+
+            - max_leaf_size: int - Quantidade de objetos abaixo da qual um nó pode virar folha (ver BVH).
+
+            - bins: int - Quantidade de faixas de cada eixo avaliadas pela SAH.
+        '''
+        objects = flatten_models(objects)
+        for obj in objects:
+            if not isinstance(obj, (Sphere, Triangle)):
+                raise TypeError(f'Objeto não suportado pela BVH linearizada: {type(obj)}')
+
+        start_time = perf_counter()
+        # A árvore (de objetos do Python) é mantida para os reajustes (refit)
+        self.__bvh = BVH(objects, max_leaf_size, bins)
+        self.depth = self.__bvh.depth
+        self.rays = 0
+        self.nodes_visited = 0
+
+        # Nós em profundidade: caixa, índice do filho direito (o esquerdo é o nó seguinte), eixo da divisão e intervalo de primitivas das folhas
+        nodes = []
+        stack = [self.__bvh.root] if self.__bvh.root is not None else []
+        while len(stack) > 0:
+            node = stack.pop()
+            nodes.append(node)
+            if not node.is_leaf:
+                stack.append(node.right)
+                stack.append(node.left)
+        position = {id(node): k for k, node in enumerate(nodes)}
+        self.__nodes = nodes
+
+        self.node_count = len(nodes)
+        self.right_child = np.array([position[id(node.right)] if not node.is_leaf else -1 for node in nodes], dtype=np.int64)
+        self.split_axis = np.array([node.axis for node in nodes], dtype=np.int64)
+        self.primitive_start = np.array([node.start for node in nodes], dtype=np.int64)
+        self.primitive_count = np.array([node.count for node in nodes], dtype=np.int64)
+        self.__load()
+
+        self.build_time = perf_counter() - start_time
+        self.refit_time: float = None
+        self.refits = 0
+
+    def __load(self):
+        '''
+        Copia para os arrays as caixas dos nós da árvore e a geometria das primitivas (na construção e a cada reajuste).
+        '''
+        nodes = self.__nodes
+        self.primitives: 'list[Hittable]' = self.__bvh.primitives
+        self.bounds_min = np.array([node.box.minimum for node in nodes], dtype=np.float64).reshape(-1, 3)
+        self.bounds_max = np.array([node.box.maximum for node in nodes], dtype=np.float64).reshape(-1, 3)
+        # Nós como tuplas do Python (caixa, filho direito, eixo, início e quantidade de primitivas), para a travessia de um raio por vez (mais rápida sem operações do NumPy)
+        self.__scalar_nodes = list(zip(
+            [node.box for node in nodes],
+            self.right_child.tolist(),
+            self.split_axis.tolist(),
+            self.primitive_start.tolist(),
+            self.primitive_count.tolist()
+        ))
+
+        # Geometria das primitivas, na ordem das folhas (cada array tem uma linha por primitiva; as linhas do outro tipo ficam zeradas)
+        count = len(self.primitives)
+        self.primitive_types = np.array([SPHERE if isinstance(obj, Sphere) else TRIANGLE for obj in self.primitives], dtype=np.int64)
+        self.sphere_centers = np.zeros((count, 3), dtype=np.float64)
+        self.sphere_radii = np.zeros(count, dtype=np.float64)
+        self.triangle_vertexes = np.zeros((count, 3, 3), dtype=np.float64)
+        self.triangle_normals = np.zeros((count, 3), dtype=np.float64)
+        for k, obj in enumerate(self.primitives):
+            if isinstance(obj, Sphere):
+                self.sphere_centers[k] = obj.center.vec
+                self.sphere_radii[k] = obj.radius
+            else:
+                self.triangle_vertexes[k] = [vertex.vec for vertex in obj.vertexes]
+                self.triangle_normals[k] = obj.normal.vec
+        v1 = self.triangle_vertexes[:, 0]
+        v2 = self.triangle_vertexes[:, 1]
+        v3 = self.triangle_vertexes[:, 2]
+        self.triangle_d = -np.einsum('ij,ij->i', self.triangle_normals, v1)
+        self.triangle_edge_normals = np.stack([
+            np.cross(self.triangle_normals, v2 - v1),
+            np.cross(self.triangle_normals, v3 - v2),
+            np.cross(self.triangle_normals, v1 - v3)
+        ], axis=1).reshape(-1, 3, 3)
+
+    def can_refit(self, objects: 'list[Hittable]') -> bool:
+        return self.__bvh.can_refit(flatten_models(objects))
+
+    def refit(self, objects: 'list[Hittable]'):
+        '''
+        Reajusta a árvore (ver BVH.refit) e copia as novas caixas e a nova geometria para os arrays. A organização dos arrays (filhos e intervalos de primitivas) não muda.
+        '''
+        start_time = perf_counter()
+        self.__bvh.refit(flatten_models(objects))
+        self.__load()
+        self.refit_time = perf_counter() - start_time
+        self.refits += 1
+
+    def sah_cost(self) -> float:
+        return self.__bvh.sah_cost()
+
+    def intersect(self, origins: np.ndarray, directions: np.ndarray, t_min: float = 0.001, t_max: float = math.inf) -> 'tuple[np.ndarray, np.ndarray]':
+        '''
+        Encontra a intersecção mais próxima de cada raio de um bloco (packet) com as primitivas da estrutura.
+
+        A travessia usa uma pilha de (nó, raios ativos no nó). Em cada nó, a caixa é testada contra todos os raios ativos de uma vez (slab test); os raios que não a atravessam, ou que já têm um acerto mais próximo do que a entrada na caixa, são descartados. Nas folhas, cada primitiva é testada contra os raios restantes. Nos nós internos, os filhos recebem os raios restantes, e o filho do lado de onde vem a maioria dos raios (no eixo da divisão) é visitado primeiro.
+
+        ---
+
+        Parâmetros:
+
+            - origins: np.ndarray - Array (N, 3) com as origens dos raios.
+
+            - directions: np.ndarray - Array (N, 3) com as direções dos raios.
+
+            - t_min: float - Valor mínimo de t para considerar uma intersecção.
+
+            - t_max: float - Valor máximo de t para considerar uma intersecção.
+
+        ---
+
+        Retorno:
+
+            - tuple[np.ndarray, np.ndarray] - Tupla contendo o índice (em primitives) da primitiva atingida por cada raio (-1 caso o raio não atinja nada) e o valor t da intersecção (t_max caso o raio não atinja nada).
+        '''
+        n = len(origins)
+        closest = np.full(n, t_max, dtype=np.float64)
+        primitive = np.full(n, -1, dtype=np.int64)
+        if self.node_count == 0 or n == 0:
+            return primitive, closest
+
+        with np.errstate(divide='ignore'):
+            inverse_directions = 1.0 / directions
+        negative = directions < 0
+        squared_lengths = np.einsum('ij,ij->i', directions, directions)
+
+        visited = 0
+        stack = [(0, np.arange(n))]
+        while len(stack) > 0:
+            node, rays = stack.pop()
+            visited += len(rays)
+
+            # Slab test. 0 * infinito (raio paralelo exatamente no plano de uma face) é NaN, e fmin/fmax ignoram o NaN
+            ray_origins = origins[rays]
+            with np.errstate(invalid='ignore'):
+                t0 = (self.bounds_min[node] - ray_origins) * inverse_directions[rays]
+                t1 = (self.bounds_max[node] - ray_origins) * inverse_directions[rays]
+            t_enter = np.fmax.reduce(np.fmin(t0, t1), axis=1)
+            t_exit = np.fmin.reduce(np.fmax(t0, t1), axis=1)
+            inside = (t_enter <= t_exit) & (t_exit >= t_min) & (t_enter <= closest[rays])
+            rays = rays[inside]
+            if len(rays) == 0:
+                continue
+
+            count = self.primitive_count[node]
+            if count > 0:
+                ray_origins = origins[rays]
+                ray_directions = directions[rays]
+                start = self.primitive_start[node]
+                for k in range(start, start + count):
+                    if self.primitive_types[k] == SPHERE:
+                        hit, t = sphere_hits(ray_origins, ray_directions, self.sphere_centers[k], self.sphere_radii[k], t_min, closest[rays], squared_lengths[rays])
+                    else:
+                        hit, t = triangle_hits(ray_origins, ray_directions, self.triangle_vertexes[k], self.triangle_normals[k], self.triangle_d[k], self.triangle_edge_normals[k], t_min, closest[rays])
+                    closest[rays[hit]] = t[hit]
+                    primitive[rays[hit]] = k
+            else:
+                left, right = node + 1, self.right_child[node]
+                if 2 * np.count_nonzero(negative[rays, self.split_axis[node]]) > len(rays):
+                    left, right = right, left
+                stack.append((right, rays))
+                stack.append((left, rays))
+
+        # Com threads, incrementos simultâneos podem se perder: os contadores são aproximados
+        self.rays += n
+        self.nodes_visited += visited
+        return primitive, closest
+
+    def hit(self, ray: Ray, interval: Interval) -> "tuple[bool, HitRecord]":
+        '''
+        Encontra o acerto mais próximo de um único raio, atravessando os arrays da árvore nó por nó (como BVH.hit).
+        '''
+        origin = tuple(ray.origin.vec.tolist())
+        direction = ray.direction.vec.tolist()
+        inverse_direction = tuple(1.0 / d if d != 0 else math.inf for d in direction)
+        negative = tuple(d < 0 for d in direction)
+        nodes = self.__scalar_nodes
+        primitives = self.primitives
+
+        t_min = interval.min
+        closest_so_far = interval.max
+        hit_record = None
+        visited = 0
+        stack = [0] if self.node_count > 0 else []
+        while len(stack) > 0:
+            node = stack.pop()
+            visited += 1
+            box, right, axis, start, count = nodes[node]
+            if not box.hit(origin, inverse_direction, t_min, closest_so_far):
+                continue
+            if count > 0:
+                for obj in primitives[start:start + count]:
+                    hit, rec = obj.hit(ray, Interval(t_min, closest_so_far))
+                    if hit:
+                        closest_so_far = rec.t
+                        hit_record = rec
+            elif negative[axis]:
+                stack.append(node + 1)
+                stack.append(right)
+            else:
+                stack.append(right)
+                stack.append(node + 1)
+
+        self.rays += 1
+        self.nodes_visited += visited
+
+        if hit_record is None:
+            return False, None
+        return True, hit_record
+
+    def statistics(self) -> dict:
+        '''
+        Estatísticas da estrutura (as mesmas de BVH.statistics). Na travessia em bloco, cada teste de um raio com a caixa de um nó conta como um nó visitado.
+        '''
+        return {
+            'primitives': len(self.primitives),
+            'build_time': self.build_time,
+            'build_sah_cost': self.__bvh.build_sah_cost,
+            'refit_time': self.refit_time,
+            'refits': self.refits,
+            'nodes': self.node_count,
+            'depth': self.depth,
+            'sah_cost': self.sah_cost(),
+            'rays': self.rays,
+            'average_nodes_visited': self.nodes_visited / self.rays if self.rays > 0 else None
+        }
+
+    def reset_statistics(self):
+        self.rays = 0
+        self.nodes_visited = 0
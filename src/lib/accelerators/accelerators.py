@@ -0,0 +1,71 @@
+'''
+    Criação das estruturas de aceleração a partir do nome.
+'''
+
+from lib.accelerators.Accelerator import Accelerator
+from lib.accelerators.BVH import BVH
+from lib.accelerators.FlatBVH import FlatBVH
+from lib.objects.Hittable import Hittable
+
+
+# Estruturas de aceleração disponíveis
+accelerators = ['bvh', 'flat_bvh']
+
+# Piora relativa do custo SAH (em relação ao custo da construção) a partir da qual uma estrutura reajustada é reconstruída (ver update_accelerator)
+REBUILD_THRESHOLD = 0.25
+
+
+def create_accelerator(name: str, objects: 'list[Hittable]') -> Accelerator:
+    '''
+    Cria (constrói) uma estrutura de aceleração sobre uma lista de objetos a partir do seu nome.
+
+    ---
+
+    Parâmetros:
+
+        - name: str - Nome da estrutura: 'bvh' (hierarquia de volumes envolventes construída pela SAH, ver BVH) ou 'flat_bvh' (a mesma hierarquia em arrays do NumPy, que o integrador wavefront atravessa com blocos de raios, ver FlatBVH).
+
+        - objects: list[Hittable] - Objetos da cena.
+
+    ---
+
+    Retorno:
+
+        - Accelerator - Estrutura construída.
+    '''
+    if name == 'bvh':
+        return BVH(objects)
+    if name == 'flat_bvh':
+        return FlatBVH(objects)
+    raise ValueError(f'Estrutura de aceleração desconhecida: {name}. As estruturas disponíveis são: {", ".join(accelerators)}.')
+
+def update_accelerator(name: str, objects: 'list[Hittable]', previous: Accelerator = None, rebuild_threshold: float = REBUILD_THRESHOLD) -> Accelerator:
+    '''
+    Atualiza uma estrutura de aceleração para os objetos nas suas novas posições (por exemplo, no frame seguinte de uma animação), reaproveitando a estrutura anterior sempre que possível.
+
+    Se a estrutura anterior for do mesmo tipo e tiver os mesmos objetos (ver Accelerator.can_refit), ela é reajustada (refit) ao invés de reconstruída. Se, com o reajuste, o custo SAH piorar mais do que rebuild_threshold em relação ao custo da construção (os objetos se afastaram muito das posições da construção), a estrutura é reconstruída. Os contadores de uso (raios e nós visitados) são zerados.
+
+    ---
+
+    Parâmetros:
+
+        - name: str - Nome da estrutura (ver create_accelerator).
+
+        - objects: list[Hittable] - Objetos da cena.
+
+        - previous: Accelerator - Estrutura anterior (por exemplo, a do frame anterior). Se não for informada, a estrutura é construída.
+
+        - rebuild_threshold: float - Piora relativa máxima do custo SAH de uma estrutura reajustada.
+
+    ---
+
+    Retorno:
+
+        - Accelerator - Estrutura reajustada (a própria estrutura anterior) ou construída.
+    '''
+    if previous is not None and previous.name == name and previous.can_refit(objects):
+        previous.refit(objects)
+        previous.reset_statistics()
+        if previous.sah_cost() <= previous.statistics()['build_sah_cost'] * (1 + rebuild_threshold):
+            return previous
+    return create_accelerator(name, objects)
@@ -5,4 +5,22 @@
 import numpy as np
 
 infinity = np.inf
-pi = np.pi
\ No newline at end of file
+pi = np.pi
+
+# Pesos de cada canal (vermelho, verde e azul) na luminância de uma cor linear (Rec. 709)
+luminance_weights = np.array([0.2126, 0.7152, 0.0722])
+
+# Canais do buffer de características (features) de cada pixel, usado pelo denoiser: normal (3), albedo (3) e distância (1) do primeiro vértice não especular do caminho
+feature_normal = slice(0, 3)
+feature_albedo = slice(3, 6)
+feature_depth = 6
+
+# Canais das AOVs (arbitrary output variables) do primeiro acerto de cada amostra, guardados no mesmo buffer, depois das características: normal (3), albedo do material (3), distância (1)
+# e identificadores do objeto e do material. Os identificadores são guardados somados de 1 (0 quando o raio não atinge nada) e apenas na primeira amostra de cada pixel
+aov_normal = slice(7, 10)
+aov_albedo = slice(10, 13)
+aov_depth = 13
+aov_object_id = 14
+aov_material_id = 15
+aov_ids = slice(14, 16)
+feature_channels = 16
@@ -0,0 +1,213 @@
+import numpy as np
+
+from lib.ImageIO import ImageWriter
+from lib.JobDatabase import is_complete_image
+
+from multiprocessing.connection import Listener, Connection, AuthenticationError
+from collections import deque
+from time import perf_counter
+import threading
+import os
+
+
+class Coordinator:
+
+    def __init__(self, frames: 'list[int]', output_folder: str, animation_settings: dict, host: str = 'localhost', port: int = 6000, authkey: bytes = b'rtiow', heartbeat_timeout: float = 60.0, max_attempts: int = 3):
+        '''
+        Construtor de um coordenador de renderização distribuída: distribui os frames de uma animação entre workers (ver RenderWorker) que se conectam a ele por TCP, de qualquer máquina, e salva as imagens renderizadas por eles em uma única pasta.
+
+        Cada worker pede um frame, renderiza-o e envia a imagem de volta. Enquanto renderiza, o worker envia sinais periódicos (heartbeats); se a conexão cair ou o worker ficar heartbeat_timeout segundos sem dar sinal (processo travado, máquina desligada, rede fora), o frame volta para a fila e é entregue a outro worker. Um frame cuja renderização falhou (exceção no worker) também volta para a fila, até max_attempts tentativas.
+
+        As conexões são autenticadas com authkey (ver multiprocessing.connection), que deve ser a mesma nos workers. As mensagens são objetos do Python (pickle), então o coordenador só deve ser exposto a uma rede confiável.
+
+        ---
+
+        Parâmetros:
+
+            - frames: list[int] - Números dos frames a serem renderizados. Frames que já existem na pasta de saída (com a imagem completa) são ignorados; uma imagem truncada é renderizada de novo.
+
+            - output_folder: str - Pasta em que as imagens (frame_N.png) são salvas.
+
+            - animation_settings: dict - Parâmetros da Animation enviados aos workers (image_width, samples_per_pixel, max_depth, ...). A quantidade de núcleos e os destinos da imagem são definidos por cada worker.
+
+            - host: str - Endereço em que o coordenador aguarda as conexões ('0.0.0.0' para aceitar conexões de outras máquinas).
+
+            - port: int - Porta TCP do coordenador.
+
+            - authkey: bytes - Chave de autenticação das conexões.
+
+            - heartbeat_timeout: float - Tempo máximo (em segundos) sem sinal de um worker antes que o seu frame seja entregue a outro worker.
+
+            - max_attempts: int - Quantidade máxima de tentativas de cada frame que falha no worker.
+        '''
+        if animation_settings.get('temporal') or animation_settings.get('dirty_regions'):
+            raise ValueError('A reprojeção temporal e a re-renderização por região dependem do frame anterior e não podem ser distribuídas entre workers.')
+
+        self.output_folder = output_folder
+        self.animation_settings = dict(animation_settings)
+        self.host = host
+        self.port = port
+        self.authkey = authkey
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_attempts = max_attempts
+
+        os.makedirs(output_folder, exist_ok=True)
+        self.pending = deque(frame for frame in frames if not is_complete_image(self.frame_filename(frame)))
+        self.in_progress: 'dict[int, str]' = {}  # Frame -> worker que o está renderizando
+        self.attempts: 'dict[int, int]' = {}
+        self.done: 'dict[int, tuple[str, float]]' = {}  # Frame -> (worker, tempo de renderização)
+        self.failed: 'list[int]' = []
+        self.total = len(self.pending)
+
+        self.__lock = threading.Lock()
+        self.__finished = threading.Event()
+        self.__connections = 0
+        self.__start_time: float = None
+
+    def frame_filename(self, frame: int) -> str:
+        '''
+        Retorna o caminho da imagem de um frame na pasta de saída.
+        '''
+        return os.path.join(self.output_folder, f'frame_{frame}.png')
+
+    def run(self):
+        '''
+        Aguarda as conexões dos workers e distribui os frames até que todos tenham sido renderizados (ou tenham falhado max_attempts vezes). Os workers conectados são avisados para encerrar.
+        '''
+        self.__start_time = perf_counter()
+        print(f'Coordenador aguardando workers em {self.host}:{self.port} ({self.total} frames a renderizar).')
+        if self.total == 0:
+            self.__finished.set()
+
+        with Listener((self.host, self.port), authkey=self.authkey) as listener:
+            threading.Thread(target=self.__accept, args=(listener,), daemon=True).start()
+            self.__finished.wait()
+
+            # Dá um tempo para que os workers conectados peçam o próximo frame e recebam o aviso de encerramento
+            for _ in range(50):
+                with self.__lock:
+                    if self.__connections == 0:
+                        break
+                self.__finished.wait(0.1)
+
+        print(f'Renderização distribuída concluída em {perf_counter() - self.__start_time:.2f} segundos: {len(self.done)} de {self.total} frames renderizados.')
+        if len(self.failed) > 0:
+            print(f'Os seguintes frames falharam {self.max_attempts} vezes e não foram renderizados: {sorted(self.failed)}')
+
+    def __accept(self, listener: Listener):
+        '''
+        Aceita as conexões dos workers, cada uma atendida por uma thread.
+        '''
+        while True:
+            try:
+                connection = listener.accept()
+            except AuthenticationError:
+                print('Conexão recusada: chave de autenticação inválida.')
+                continue
+            except OSError:
+                return  # O listener foi fechado
+            with self.__lock:
+                self.__connections += 1
+            threading.Thread(target=self.__serve, args=(connection,), daemon=True).start()
+
+    def __serve(self, connection: Connection):
+        '''
+        Atende um worker: entrega frames, recebe as imagens e devolve o frame para a fila se o worker falhar ou parar de dar sinal.
+        '''
+        worker = '?'
+        frame = None
+        try:
+            while True:
+                if not connection.poll(self.heartbeat_timeout):
+                    if frame is not None:
+                        print(f'O worker {worker} ficou {self.heartbeat_timeout:.0f} segundos sem dar sinal: o frame {frame} será entregue a outro worker.')
+                    break
+
+                message = connection.recv()
+                kind = message[0]
+                if kind == 'hello':
+                    worker = message[1]
+                    print(f'Worker {worker} conectado.')
+                elif kind == 'heartbeat':
+                    pass
+                elif kind == 'request':
+                    frame = self.__next_job(worker)
+                    if frame is not None:
+                        connection.send(('job', frame, self.animation_settings, self.heartbeat_timeout / 4))
+                    elif self.__finished.is_set():
+                        connection.send(('stop',))
+                        break
+                    else:
+                        connection.send(('wait', 1.0))
+                elif kind == 'result':
+                    _, result_frame, pixels, render_time = message
+                    if result_frame == frame:
+                        self.__save(result_frame, pixels)
+                        self.__complete(result_frame, worker, render_time)
+                        frame = None
+                elif kind == 'failed':
+                    _, failed_frame, error = message
+                    if failed_frame == frame:
+                        print(f'O worker {worker} falhou ao renderizar o frame {frame}: {error}')
+                        self.__release(frame, failed=True)
+                        frame = None
+        except (EOFError, OSError):
+            if frame is not None:
+                print(f'A conexão com o worker {worker} caiu: o frame {frame} será entregue a outro worker.')
+        finally:
+            if frame is not None:
+                self.__release(frame, failed=False)
+            connection.close()
+            with self.__lock:
+                self.__connections -= 1
+
+    def __next_job(self, worker: str) -> int:
+        '''
+        Retira o próximo frame da fila e o marca como sendo renderizado pelo worker. Retorna None se a fila estiver vazia.
+        '''
+        with self.__lock:
+            if len(self.pending) == 0:
+                return None
+            frame = self.pending.popleft()
+            self.in_progress[frame] = worker
+            return frame
+
+    def __release(self, frame: int, failed: bool):
+        '''
+        Devolve um frame que não foi concluído para a fila. Frames que falharam max_attempts vezes são descartados.
+        '''
+        with self.__lock:
+            self.in_progress.pop(frame, None)
+            if failed:
+                self.attempts[frame] = self.attempts.get(frame, 0) + 1
+            if self.attempts.get(frame, 0) >= self.max_attempts:
+                self.failed.append(frame)
+            else:
+                self.pending.appendleft(frame)
+            self.__check_finished()
+
+    def __complete(self, frame: int, worker: str, render_time: float):
+        '''
+        Marca um frame como concluído.
+        '''
+        with self.__lock:
+            self.in_progress.pop(frame, None)
+            self.done[frame] = (worker, render_time)
+            print(f'[{len(self.done)}/{self.total}] Frame {frame} renderizado pelo worker {worker} em {render_time:.2f} segundos ({perf_counter() - self.__start_time:.2f} segundos no total).')
+            self.__check_finished()
+
+    def __check_finished(self):
+        '''
+        Sinaliza o fim da renderização quando não há frames na fila nem sendo renderizados. Deve ser chamada com o lock.
+        '''
+        if len(self.pending) == 0 and len(self.in_progress) == 0:
+            self.__finished.set()
+
+    def __save(self, frame: int, pixels: np.ndarray):
+        '''
+        Salva a imagem de um frame. A imagem é escrita em um arquivo temporário e renomeada, para que um frame interrompido no meio da escrita nunca pareça completo.
+        '''
+        filename = self.frame_filename(frame)
+        temporary_filename = f'{os.path.splitext(filename)[0]}.tmp.png'
+        ImageWriter(pixels).save(temporary_filename)
+        os.replace(temporary_filename, filename)
@@ -0,0 +1,134 @@
+import numpy as np
+
+from lib.Image import Image
+from lib.sinks.Sink import Sink
+from lib.sinks.CallbackSink import CallbackSink
+
+from multiprocessing.connection import Client, Connection
+from time import perf_counter, sleep
+import threading
+import socket
+import os
+
+from typing import Callable
+
+
+class RenderWorker:
+
+    def __init__(self, animation_factory: 'Callable[[dict, list[Sink]], object]', host: str = 'localhost', port: int = 6000, authkey: bytes = b'rtiow', name: str = None, connect_timeout: float = 30.0):
+        '''
+        Construtor de um worker de renderização distribuída: conecta-se a um Coordinator (na mesma máquina ou em outra), renderiza os frames que ele entrega e envia as imagens de volta, até que o coordenador avise que não há mais frames.
+
+        A animação é criada a partir dos parâmetros enviados pelo coordenador e reaproveitada entre os frames, como gerenciador de contexto (com um executor persistente, ver Animation.__enter__). Enquanto um frame é renderizado, uma thread envia sinais periódicos (heartbeats) ao coordenador, para que ele saiba que o worker continua vivo.
+
+        ---
+
+        Parâmetros:
+
+            - animation_factory: Callable[[dict, list[Sink]], object] - Função que cria a animação (por exemplo, uma Animation com os núcleos desta máquina) a partir dos parâmetros enviados pelo coordenador e dos destinos das imagens. A animação deve ter o método generate_frame(frame, filename) e ser um gerenciador de contexto.
+
+            - host: str - Endereço do coordenador.
+
+            - port: int - Porta TCP do coordenador.
+
+            - authkey: bytes - Chave de autenticação (a mesma do coordenador).
+
+            - name: str - Nome do worker nas mensagens do coordenador. Se não for informado, será máquina:pid.
+
+            - connect_timeout: float - Tempo máximo (em segundos) tentando se conectar ao coordenador (que pode ainda não ter sido iniciado).
+        '''
+        self.host = host
+        self.port = port
+        self.animation_factory = animation_factory
+        self.authkey = authkey
+        self.name = name if name is not None else f'{socket.gethostname()}:{os.getpid()}'
+        self.connect_timeout = connect_timeout
+        self.frames_rendered = 0
+
+    def connect(self) -> Connection:
+        '''
+        Conecta-se ao coordenador, tentando novamente até connect_timeout segundos.
+
+        ---
+
+        Retorno:
+
+            - Connection - Conexão com o coordenador.
+        '''
+        start_time = perf_counter()
+        while True:
+            try:
+                return Client((self.host, self.port), authkey=self.authkey)
+            except ConnectionRefusedError:
+                if perf_counter() - start_time > self.connect_timeout:
+                    raise
+                sleep(0.5)
+
+    def run(self):
+        '''
+        Renderiza os frames entregues pelo coordenador até que ele avise que não há mais frames (ou a conexão caia).
+        '''
+        connection = self.connect()
+        send_lock = threading.Lock()  # A conexão é compartilhada com a thread dos heartbeats
+
+        def send(message: tuple):
+            with send_lock:
+                connection.send(message)
+
+        animation = None
+        settings: dict = None
+        images: 'list[np.ndarray]' = []
+        try:
+            send(('hello', self.name))
+            while True:
+                send(('request',))
+                message = connection.recv()
+                kind = message[0]
+                if kind == 'stop':
+                    break
+                if kind == 'wait':
+                    sleep(message[1])
+                    continue
+
+                _, frame, job_settings, heartbeat_interval = message
+                stop_heartbeats = threading.Event()
+
+                def heartbeats():
+                    try:
+                        while not stop_heartbeats.wait(heartbeat_interval):
+                            send(('heartbeat',))
+                    except OSError:
+                        pass  # A conexão caiu: o laço principal percebe ao enviar a imagem
+
+                heartbeat_thread = threading.Thread(target=heartbeats, daemon=True)
+                heartbeat_thread.start()
+                try:
+                    # A animação (e o seu executor) só é recriada quando os parâmetros mudam
+                    if job_settings != settings:
+                        if animation is not None:
+                            animation.__exit__(None, None, None)
+                            animation, settings = None, None
+                        animation = self.animation_factory(job_settings, [CallbackSink(lambda framebuffer, filename: images.append(framebuffer))])
+                        animation.__enter__()
+                        settings = job_settings
+
+                    start_time = perf_counter()
+                    animation.generate_frame(frame, None)
+                    render_time = perf_counter() - start_time
+                    pixels = Image.from_float_matrix(images.pop()).to_uint8_matrix()
+                except Exception as error:
+                    stop_heartbeats.set()
+                    heartbeat_thread.join()
+                    send(('failed', frame, f'{type(error).__name__}: {error}'))
+                    continue
+
+                stop_heartbeats.set()
+                heartbeat_thread.join()
+                send(('result', frame, pixels, render_time))
+                self.frames_rendered += 1
+        except (EOFError, OSError):
+            print('A conexão com o coordenador foi encerrada.')
+        finally:
+            if animation is not None:
+                animation.__exit__(None, None, None)
+            connection.close()
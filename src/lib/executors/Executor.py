@@ -0,0 +1,119 @@
+import numpy as np
+
+from lib.HittableList import HittableList
+
+
+class Executor:
+
+    def __init__(self, num_workers: int = 1, static_world: HittableList = None):
+        '''
+        Construtor de um executor, responsável por distribuir os blocos (tiles) de uma imagem entre os seus workers (threads, processos ou, futuramente, máquinas remotas) e juntar o resultado.
+
+        Um executor pode ser reaproveitado entre vários frames: a parte estática da cena (objetos que não se movem) é informada apenas na sua criação, e cada frame informa somente os objetos dinâmicos.
+
+        Pode ser usado como um gerenciador de contexto (with), para que os seus recursos sejam liberados ao final.
+
+        Para uma câmera com semente fixa, os números aleatórios de cada amostra dependem apenas do frame, do pixel e do índice da amostra (ver Camera.random_key), então a imagem não depende do executor utilizado.
+
+        ---
+
+        Parâmetros:
+
+            - num_workers: int - Quantidade de workers que renderizam blocos ao mesmo tempo.
+
+            - static_world: HittableList - Objetos da cena que não mudam entre os frames. Se não for informado, a cena é composta apenas pelos objetos dinâmicos.
+        '''
+        self.num_workers = num_workers
+        self.static_world = static_world if static_world is not None else HittableList()
+        # Estrutura de aceleração da última cena completa montada neste processo (ver world)
+        self.accelerator = None
+
+    def __enter__(self) -> 'Executor':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        '''
+        Libera os recursos do executor (threads, processos, memória compartilhada, ...).
+        '''
+        pass
+
+    def world(self, dynamic_world: HittableList) -> HittableList:
+        '''
+        Retorna a cena completa: objetos estáticos e dinâmicos. Se uma das listas tiver uma estrutura de aceleração (accelerator_name), ela é construída sobre a cena completa ou, se a cena tiver os mesmos objetos da chamada anterior (apenas em outras posições, como nos frames da animação), a estrutura anterior é reajustada (ver HittableList.update_accelerator).
+
+        ---
+
+        Parâmetros:
+
+            - dynamic_world: HittableList - Objetos da cena que mudam a cada frame.
+
+        ---
+
+        Retorno:
+
+            - HittableList - Cena completa.
+        '''
+        world = HittableList(dynamic_world.accelerator_name or self.static_world.accelerator_name)
+        world.objects = self.static_world.objects + dynamic_world.objects
+        self.accelerator = world.update_accelerator(self.accelerator)
+        return world
+
+    def accelerator_statistics(self) -> dict:
+        '''
+        Estatísticas da estrutura de aceleração da última cena renderizada (ver Accelerator.statistics), com o nome da classe da estrutura em 'structure'.
+
+        ---
+
+        Retorno:
+
+            - dict - Estatísticas da estrutura, ou None se a cena não tem estrutura de aceleração.
+        '''
+        if self.accelerator is None:
+            return None
+        return dict(self.accelerator.statistics(), structure=type(self.accelerator).__name__)
+
+    def render(self, camera, dynamic_world: HittableList, samples: int = None, sample_offset: int = 0) -> 'tuple[np.ndarray, np.ndarray, np.ndarray, list[tuple[int, float, float]]]':
+        '''
+        Renderiza uma passada de amostras de um frame, bloco a bloco (camera.tiles()).
+
+        ---
+
+        Parâmetros:
+
+            - camera: Camera - Câmera que renderizará a imagem (já inicializada).
+
+            - dynamic_world: HittableList - Objetos da cena que mudam a cada frame.
+
+            - samples: int - Quantidade (máxima, com amostragem adaptativa) de amostras por pixel. Se não for especificada, será camera.samples_per_pixel.
+
+            - sample_offset: int - Quantidade de amostras por pixel de passadas anteriores (índice da primeira amostra de cada pixel nesta passada).
+
+        ---
+
+        Retorno:
+
+            - tuple[np.ndarray, np.ndarray, np.ndarray, list[tuple[int, float, float]]] - Tupla contendo a matriz (altura, largura, 3) com a soma das cores lineares de cada pixel, a matriz (altura, largura) com a quantidade de amostras de cada pixel, a matriz (altura, largura, feature_channels) com a soma das características (features) de cada pixel e, para cada bloco, o identificador do worker que o renderizou, o instante (time.time) em que começou a ser renderizado e o tempo de CPU gasto. As matrizes só são válidas até a próxima chamada de render ou close.
+        '''
+        raise NotImplementedError
+
+
+def tiles_pixels(tiles: 'list[tuple[int, int, int, int]]') -> int:
+    '''
+    Retorna a quantidade de pixels de uma lista de blocos (tiles), para a barra de progresso dos executores.
+
+    ---
+
+    Parâmetros:
+
+        - tiles: list[tuple[int, int, int, int]] - Blocos (linha inicial, linha final, coluna inicial, coluna final).
+
+    ---
+
+    Retorno:
+
+        - int - Quantidade de pixels dos blocos.
+    '''
+    return sum((end_line - starting_line) * (end_column - starting_column) for starting_line, end_line, starting_column, end_column in tiles)
@@ -0,0 +1,278 @@
+import numpy as np
+
+from lib.HittableList import HittableList
+from lib.constants import feature_channels
+from lib.WavefrontIntegrator import WavefrontIntegrator
+from lib.accelerators.Accelerator import Accelerator
+from lib.executors.Executor import Executor, tiles_pixels
+
+from tqdm import tqdm
+
+from multiprocessing import Pool, Value, resource_tracker
+from multiprocessing.sharedctypes import Synchronized
+from multiprocessing.shared_memory import SharedMemory
+from time import perf_counter, process_time, time
+import secrets
+import pickle
+import os
+
+
+class ProcessExecutor(Executor):
+
+    def __init__(self, num_cores: int, static_world: HittableList = None):
+        '''
+        Construtor de um executor com um pool de processos de renderização persistente, que pode ser reaproveitado entre vários frames.
+
+        Os processos são criados uma única vez e recebem a parte estática da cena (objetos que não se movem) apenas na sua inicialização. A cada frame, os processos recebem somente o que mudou: a câmera e os objetos dinâmicos (que se movem). Esse estado do frame é serializado uma única vez e publicado em uma memória compartilhada com o nome do frame, lida por cada processo no seu primeiro bloco do frame; cada bloco leva apenas o identificador do frame, o bloco e as amostras. Os blocos são distribuídos dinamicamente entre os processos, que escrevem o resultado diretamente em um buffer de acumulação em memória compartilhada.
+
+        Cada processo constrói (ou reajusta) a sua própria estrutura de aceleração. As suas estatísticas são enviadas junto com o resultado de cada bloco e juntadas ao final de cada frame (ver accelerator_statistics).
+
+        Se um processo morrer durante a renderização (por exemplo, sem memória), o bloco que ele renderizava nunca termina: nesse caso, o pool é finalizado e render gera um erro, ao invés de esperar para sempre.
+
+        ---
+
+        Parâmetros:
+
+            - num_cores: int - Quantidade de processos a serem criados.
+
+            - static_world: HittableList - Objetos da cena que não mudam entre os frames (ficam guardados em cada processo).
+        '''
+        super().__init__(num_cores, static_world)
+        self.frame_id = 0
+        self.__shared_memory: SharedMemory = None
+        self.__framebuffer_array: np.ndarray = None
+        self.__progress = Value('q', 0)  # Quantidade de pixels já renderizados do frame atual
+        # Prefixo dos nomes das memórias compartilhadas com o estado de cada frame (ver frame_state_name)
+        self.__frame_state_prefix = f'rt{secrets.token_hex(4)}'
+        self.__accelerator_statistics: dict = None  # Estatísticas da estrutura de aceleração do último frame, juntadas entre os processos
+
+        # O rastreador de recursos precisa existir antes dos processos serem criados, para que eles o compartilhem.
+        # Caso contrário, cada processo cria o seu próprio rastreador, que considera a memória compartilhada como "vazada" ao finalizar
+        resource_tracker.ensure_running()
+
+        start_time = perf_counter()
+        self.__pool = Pool(num_cores, initializer=init_worker, initargs=(self.static_world, self.__progress, self.__frame_state_prefix))
+        print(f'Pool de renderização com {num_cores} processos criado em {(perf_counter() - start_time) * 1000:.1f} ms.')
+
+    def close(self):
+        '''
+        Finaliza os processos e libera a memória compartilhada.
+        '''
+        if self.__pool is not None:
+            self.__pool.close()
+            self.__pool.join()
+            self.__pool = None
+        self.__free_shared_memory()
+
+    def __free_shared_memory(self):
+        if self.__shared_memory is not None:
+            self.__framebuffer_array = None  # A memória compartilhada só pode ser fechada se não houver mais referências a ela
+            self.__shared_memory.close()
+            self.__shared_memory.unlink()
+            self.__shared_memory = None
+
+    def __framebuffer(self, height: int, width: int) -> np.ndarray:
+        '''
+        Retorna o buffer de acumulação (altura, largura, FRAMEBUFFER_CHANNELS) compartilhado com os processos, (re)criando-o caso a resolução tenha mudado. Os 3 primeiros canais guardam a soma das cores lineares de cada pixel, o seguinte a quantidade de amostras e os demais a soma das características (features).
+        '''
+        shape = (height, width, FRAMEBUFFER_CHANNELS)
+        if self.__framebuffer_array is None or self.__framebuffer_array.shape != shape:
+            self.__free_shared_memory()
+            self.__shared_memory = SharedMemory(create=True, size=int(np.prod(shape)) * np.dtype(np.float64).itemsize)
+            self.__framebuffer_array = np.ndarray(shape, dtype=np.float64, buffer=self.__shared_memory.buf)
+        return self.__framebuffer_array
+
+    def render(self, camera, dynamic_world: HittableList, samples: int = None, sample_offset: int = 0) -> 'tuple[np.ndarray, np.ndarray, np.ndarray, list[tuple[int, float, float]]]':
+        '''
+        Renderiza uma passada de amostras de um frame. A cena é composta pelos objetos estáticos (já guardados nos processos) e pelos objetos dinâmicos informados.
+
+        ---
+
+        Parâmetros:
+
+            - camera: Camera - Câmera que renderizará a imagem (já inicializada). Os blocos (tiles) da imagem são definidos por camera.tiles().
+
+            - dynamic_world: HittableList - Objetos da cena que mudam a cada frame.
+
+            - samples: int - Quantidade (máxima, com amostragem adaptativa) de amostras por pixel. Se não for especificada, será camera.samples_per_pixel.
+
+            - sample_offset: int - Quantidade de amostras por pixel de passadas anteriores (índice da primeira amostra de cada pixel nesta passada).
+
+        ---
+
+        Retorno:
+
+            - tuple[np.ndarray, np.ndarray, np.ndarray, list[tuple[int, float, float]]] - Tupla contendo o buffer de acumulação (altura, largura, 3) com a soma das cores lineares de cada pixel, a matriz (altura, largura) com a quantidade de amostras de cada pixel, a matriz (altura, largura, feature_channels) com a soma das características de cada pixel e, para cada bloco, o pid do processo que o renderizou, o instante (time.time) em que começou a ser renderizado e o tempo de CPU gasto. Os três arrays são compartilhados e só são válidos até a próxima chamada de render ou close.
+        '''
+        self.frame_id += 1
+        framebuffer = self.__framebuffer(camera.image_height, camera.image_width)
+        framebuffer.fill(0)
+        self.__progress.value = 0
+
+        # Estado do frame, serializado uma única vez e lido por cada processo no seu primeiro bloco do frame
+        state = pickle.dumps((camera, dynamic_world, self.__shared_memory.name), protocol=pickle.HIGHEST_PROTOCOL)
+        state_memory = SharedMemory(name=frame_state_name(self.__frame_state_prefix, self.frame_id), create=True, size=len(state))
+        try:
+            state_memory.buf[:len(state)] = state
+
+            # Os processos atuais do pool: se algum morrer, o pool cria outro, mas o bloco que ele renderizava se perde
+            workers = list(self.__pool._pool)
+            tiles = camera.tiles()
+            tasks = [(self.frame_id, samples, sample_offset, tile) for tile in tiles]
+            result = self.__pool.map_async(render_tile, tasks, chunksize=1)
+            with tqdm(total=tiles_pixels(tiles)) as progress_bar:
+                while not result.ready():
+                    result.wait(0.1)
+                    progress_bar.update(self.__progress.value - progress_bar.n)
+                    dead = [worker for worker in workers if worker.exitcode is not None]
+                    if len(dead) > 0 and not result.ready():
+                        self.__pool.terminate()
+                        self.__pool = None
+                        raise RuntimeError(f'Um processo de renderização (pid {dead[0].pid}) terminou inesperadamente com o código {dead[0].exitcode}: o frame não pode ser concluído.')
+            tiles_info = result.get()
+        finally:
+            state_memory.close()
+            state_memory.unlink()
+
+        # Estatísticas da estrutura de cada processo: os contadores só crescem durante o frame, então vale as do último bloco (com mais raios) de cada processo
+        workers_statistics: 'dict[int, dict]' = {}
+        for pid, _, _, statistics in tiles_info:
+            if statistics is not None and (pid not in workers_statistics or statistics['rays'] >= workers_statistics[pid]['rays']):
+                workers_statistics[pid] = statistics
+        self.__accelerator_statistics = Accelerator.merge_statistics(list(workers_statistics.values())) if len(workers_statistics) > 0 else None
+
+        return framebuffer[..., :3], framebuffer[..., COUNT_CHANNEL], framebuffer[..., FEATURE_CHANNELS], [tile_info[:3] for tile_info in tiles_info]
+
+    def accelerator_statistics(self) -> dict:
+        '''
+        Estatísticas da estrutura de aceleração do último frame, juntadas entre os processos (ver Accelerator.merge_statistics): os raios e os nós visitados são os de todos os processos.
+        '''
+        return self.__accelerator_statistics
+
+
+# Canais do buffer de acumulação compartilhado: soma das cores (3), quantidade de amostras (1) e soma das características (feature_channels)
+COUNT_CHANNEL = 3
+FEATURE_CHANNELS = slice(4, 4 + feature_channels)
+FRAMEBUFFER_CHANNELS = 4 + feature_channels
+
+# Estado de cada processo. A parte estática da cena é definida uma única vez por init_worker, e o restante é atualizado a cada frame.
+worker_static_world: HittableList = None
+worker_progress: Synchronized = None
+worker_frame_state_prefix: str = None
+worker_frame_id: int = None
+worker_camera = None
+worker_world: HittableList = None
+worker_integrator: WavefrontIntegrator = None
+worker_accelerator_statistics: dict = None  # Estatísticas da estrutura do processo logo após a sua construção ou reajuste no frame atual
+worker_shared_memory: SharedMemory = None
+worker_framebuffer: np.ndarray = None
+
+
+def frame_state_name(prefix: str, frame_id: int) -> str:
+    '''
+    Nome da memória compartilhada com o estado (câmera, objetos dinâmicos e nome do buffer de acumulação) de um frame de um executor.
+    '''
+    return f'{prefix}_{frame_id}'
+
+
+def init_worker(static_world: HittableList, progress: Synchronized, frame_state_prefix: str):
+    '''
+    Inicializa um processo, guardando a parte estática da cena (usado para multiprocessamento).
+
+    ---
+
+    Parâmetros:
+
+        - static_world: HittableList - Objetos da cena que não mudam entre os frames.
+
+        - progress: Synchronized - Contador compartilhado com a quantidade de pixels já renderizados, para atualizar a barra de progresso.
+
+        - frame_state_prefix: str - Prefixo dos nomes das memórias compartilhadas com o estado de cada frame (ver frame_state_name).
+    '''
+    global worker_static_world, worker_progress, worker_frame_state_prefix
+    worker_static_world = static_world
+    worker_progress = progress
+    worker_frame_state_prefix = frame_state_prefix
+
+
+def update_worker_frame(frame_id: int):
+    '''
+    Atualiza o estado do processo para um novo frame: câmera, cena (objetos estáticos + dinâmicos) e buffer de acumulação compartilhado, lidos da memória compartilhada com o estado do frame (ver ProcessExecutor.render). Não faz nada se o processo já estiver no frame informado.
+
+    ---
+
+    Parâmetros:
+
+        - frame_id: int - Identificador do frame.
+    '''
+    global worker_frame_id, worker_camera, worker_world, worker_integrator, worker_accelerator_statistics, worker_shared_memory, worker_framebuffer
+    if worker_frame_id == frame_id:
+        return
+
+    state_memory = SharedMemory(name=frame_state_name(worker_frame_state_prefix, frame_id))
+    try:
+        # O tamanho da memória compartilhada pode ser arredondado para cima (páginas), mas o pickle ignora os bytes após o fim do objeto
+        camera, dynamic_world, shared_memory_name = pickle.loads(state_memory.buf)
+    finally:
+        state_memory.close()
+
+    worker_frame_id = frame_id
+    worker_camera = camera
+    worker_camera.initialize()  # A grade de pixels não é enviada aos processos (ver Camera.__getstate__)
+    previous_accelerator = worker_world.accelerator if worker_world is not None else None
+    worker_world = HittableList(dynamic_world.accelerator_name or worker_static_world.accelerator_name)
+    worker_world.objects = worker_static_world.objects + dynamic_world.objects
+    worker_world.update_accelerator(previous_accelerator)  # Construída (ou reajustada) em cada processo (a estrutura não é enviada entre os processos)
+    worker_integrator = WavefrontIntegrator(worker_world) if camera.wavefront else None
+    accelerator = worker_world.accelerator
+    worker_accelerator_statistics = dict(accelerator.statistics(), structure=type(accelerator).__name__) if accelerator is not None else None
+
+    if worker_shared_memory is None or worker_shared_memory.name != shared_memory_name:
+        if worker_shared_memory is not None:
+            worker_framebuffer = None
+            worker_shared_memory.close()
+        worker_shared_memory = SharedMemory(name=shared_memory_name)
+        worker_framebuffer = np.ndarray((camera.image_height, camera.image_width, FRAMEBUFFER_CHANNELS), dtype=np.float64, buffer=worker_shared_memory.buf)
+
+
+def render_tile(task: 'tuple[int, int, int, tuple[int, int, int, int]]') -> 'tuple[int, float, float, dict]':
+    '''
+    Renderiza um bloco (tile) da imagem (usado para multiprocessamento).
+
+    A soma das cores lineares, a quantidade de amostras e a soma das características de cada pixel são escritas diretamente no buffer de acumulação compartilhado.
+
+    ---
+
+    Parâmetros:
+
+        - task: tuple[int, int, int, tuple[int, int, int, int]] - Tupla contendo o identificador do frame (o restante do estado do frame é lido por update_worker_frame), a quantidade de amostras por pixel (None para camera.samples_per_pixel), a quantidade de amostras por pixel de passadas anteriores e o bloco a ser renderizado: (linha inicial, linha final, coluna inicial, coluna final). As linhas e colunas finais não são incluídas.
+
+    ---
+
+    Retorno:
+
+        - tuple[int, float, float, dict] - Tupla contendo o pid do processo, o instante (time.time) em que o bloco começou a ser renderizado, o tempo de CPU (em segundos) gasto para renderizar o bloco e as estatísticas da estrutura de aceleração do processo até o fim do bloco (None se a cena não tem estrutura).
+    '''
+    start_timestamp = time()
+    start_time = process_time()
+    frame_id, samples, sample_offset, tile = task
+    update_worker_frame(frame_id)
+
+    camera = worker_camera
+    starting_line, end_line, starting_column, end_column = tile
+
+    pixels, counts, features = camera.render_tile(worker_world, tile, samples, sample_offset, worker_integrator)
+    worker_framebuffer[starting_line:end_line, starting_column:end_column, :3] = pixels
+    worker_framebuffer[starting_line:end_line, starting_column:end_column, COUNT_CHANNEL] = counts
+    worker_framebuffer[starting_line:end_line, starting_column:end_column, FEATURE_CHANNELS] = features
+
+    with worker_progress.get_lock():
+        worker_progress.value += (end_line - starting_line) * (end_column - starting_column)
+
+    statistics = None
+    if worker_accelerator_statistics is not None:
+        # A organização da estrutura não muda durante o frame: apenas os contadores de uso são atualizados
+        accelerator = worker_world.accelerator
+        statistics = dict(worker_accelerator_statistics, rays=accelerator.rays, average_nodes_visited=accelerator.nodes_visited / accelerator.rays if accelerator.rays > 0 else None)
+
+    return os.getpid(), start_timestamp, process_time() - start_time, statistics
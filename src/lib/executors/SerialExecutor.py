@@ -0,0 +1,56 @@
+import numpy as np
+
+from lib.HittableList import HittableList
+from lib.constants import feature_channels
+from lib.WavefrontIntegrator import WavefrontIntegrator
+from lib.executors.Executor import Executor, tiles_pixels
+
+from tqdm import tqdm
+
+from time import process_time, time
+import os
+
+
+class SerialExecutor(Executor):
+
+    def __init__(self, static_world: HittableList = None):
+        '''
+        Construtor de um executor serial: todos os blocos são renderizados, um após o outro, no próprio processo.
+
+        ---
+
+        Parâmetros:
+
+            - static_world: HittableList - Objetos da cena que não mudam entre os frames.
+        '''
+        super().__init__(1, static_world)
+
+    def render(self, camera, dynamic_world: HittableList, samples: int = None, sample_offset: int = 0) -> 'tuple[np.ndarray, np.ndarray, np.ndarray, list[tuple[int, float, float]]]':
+        '''
+        Renderiza uma passada de amostras de um frame, bloco a bloco (ver Executor.render).
+        '''
+        world = self.world(dynamic_world)
+        integrator = WavefrontIntegrator(world) if camera.wavefront else None
+
+        pixels = np.zeros((camera.image_height, camera.image_width, 3), dtype=np.float64)
+        counts = np.zeros((camera.image_height, camera.image_width), dtype=np.int64)
+        features = np.zeros((camera.image_height, camera.image_width, feature_channels), dtype=np.float64)
+        tiles_stats = []
+
+        tiles = camera.tiles()
+        with tqdm(total=tiles_pixels(tiles)) as progress_bar:
+            for tile in tiles:
+                start_timestamp = time()
+                start_time = process_time()
+
+                starting_line, end_line, starting_column, end_column = tile
+                (
+                    pixels[starting_line:end_line, starting_column:end_column],
+                    counts[starting_line:end_line, starting_column:end_column],
+                    features[starting_line:end_line, starting_column:end_column]
+                ) = camera.render_tile(world, tile, samples, sample_offset, integrator)
+
+                tiles_stats.append((os.getpid(), start_timestamp, process_time() - start_time))
+                progress_bar.update((end_line - starting_line) * (end_column - starting_column))
+
+        return pixels, counts, features, tiles_stats
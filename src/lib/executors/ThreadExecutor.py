@@ -0,0 +1,82 @@
+import numpy as np
+
+from lib.HittableList import HittableList
+from lib.constants import feature_channels
+from lib.WavefrontIntegrator import WavefrontIntegrator
+from lib.executors.Executor import Executor, tiles_pixels
+
+from tqdm import tqdm
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from time import thread_time, time
+import threading
+
+
+class ThreadExecutor(Executor):
+
+    def __init__(self, num_threads: int, static_world: HittableList = None):
+        '''
+        Construtor de um executor com um pool de threads persistente. Os blocos são distribuídos dinamicamente entre as threads, que escrevem diretamente no buffer de acumulação.
+
+        Como as threads compartilham o GIL do Python, o ganho de desempenho vem principalmente do integrador wavefront (as operações do NumPy liberam o GIL). Não há custo de criação de processos nem de cópia da cena.
+
+        ---
+
+        Parâmetros:
+
+            - num_threads: int - Quantidade de threads a serem criadas.
+
+            - static_world: HittableList - Objetos da cena que não mudam entre os frames.
+        '''
+        super().__init__(num_threads, static_world)
+        self.frame_id = 0
+        self.__pool = ThreadPoolExecutor(num_threads)
+        self.__thread_state = threading.local()  # Integrador wavefront de cada thread (o gerador de números aleatórios dele não pode ser compartilhado)
+
+    def close(self):
+        '''
+        Finaliza as threads.
+        '''
+        if self.__pool is not None:
+            self.__pool.shutdown()
+            self.__pool = None
+
+    def render(self, camera, dynamic_world: HittableList, samples: int = None, sample_offset: int = 0) -> 'tuple[np.ndarray, np.ndarray, np.ndarray, list[tuple[int, float, float]]]':
+        '''
+        Renderiza uma passada de amostras de um frame, bloco a bloco (ver Executor.render). O identificador de cada worker é o identificador da thread.
+        '''
+        self.frame_id += 1
+        frame_id = self.frame_id
+        world = self.world(dynamic_world)
+
+        pixels = np.zeros((camera.image_height, camera.image_width, 3), dtype=np.float64)
+        counts = np.zeros((camera.image_height, camera.image_width), dtype=np.int64)
+        features = np.zeros((camera.image_height, camera.image_width, feature_channels), dtype=np.float64)
+
+        def render_tile(tile: 'tuple[int, int, int, int]') -> 'tuple[int, float, float]':
+            start_timestamp = time()
+            start_time = thread_time()
+
+            state = self.__thread_state
+            if getattr(state, 'frame_id', None) != frame_id:
+                state.frame_id = frame_id
+                state.integrator = WavefrontIntegrator(world) if camera.wavefront else None
+
+            starting_line, end_line, starting_column, end_column = tile
+            (
+                pixels[starting_line:end_line, starting_column:end_column],
+                counts[starting_line:end_line, starting_column:end_column],
+                features[starting_line:end_line, starting_column:end_column]
+            ) = camera.render_tile(world, tile, samples, sample_offset, state.integrator)
+
+            return threading.get_ident(), start_timestamp, thread_time() - start_time
+
+        tiles = camera.tiles()
+        futures = {self.__pool.submit(render_tile, tile): tile for tile in tiles}
+        with tqdm(total=tiles_pixels(tiles)) as progress_bar:
+            for future in as_completed(futures):
+                future.result()  # Propaga as exceções das threads
+                starting_line, end_line, starting_column, end_column = futures[future]
+                progress_bar.update((end_line - starting_line) * (end_column - starting_column))
+
+        return pixels, counts, features, [future.result() for future in futures]
@@ -0,0 +1,42 @@
+'''
+    Criação dos executores a partir do nome do backend de execução.
+'''
+
+from lib.HittableList import HittableList
+from lib.executors.Executor import Executor
+from lib.executors.SerialExecutor import SerialExecutor
+from lib.executors.ThreadExecutor import ThreadExecutor
+from lib.executors.ProcessExecutor import ProcessExecutor
+
+
+# Backends de execução disponíveis
+backends = ['serial', 'thread', 'process']
+
+
+def create_executor(backend: str, num_workers: int = 1, static_world: HittableList = None) -> Executor:
+    '''
+    Cria um executor a partir do nome do backend de execução.
+
+    ---
+
+    Parâmetros:
+
+        - backend: str - Nome do backend: 'serial' (no próprio processo), 'thread' (pool de threads) ou 'process' (pool de processos).
+
+        - num_workers: int - Quantidade de threads ou processos (ignorado pelo backend serial).
+
+        - static_world: HittableList - Objetos da cena que não mudam entre os frames.
+
+    ---
+
+    Retorno:
+
+        - Executor - Executor criado.
+    '''
+    if backend == 'serial':
+        return SerialExecutor(static_world)
+    if backend == 'thread':
+        return ThreadExecutor(num_workers, static_world)
+    if backend == 'process':
+        return ProcessExecutor(num_workers, static_world)
+    raise ValueError(f'Backend de execução desconhecido: {backend}. Os backends disponíveis são: {", ".join(backends)}.')
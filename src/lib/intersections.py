@@ -0,0 +1,135 @@
+'''
+    Intersecções vetorizadas (com NumPy) de vários raios com uma primitiva, usadas pelo integrador wavefront e pelas estruturas de aceleração em arrays (ver lib.accelerators.FlatBVH), e de um raio com vários triângulos de uma malha (ver Model.hit).
+'''
+
+import numpy as np
+
+
+def sphere_hits(origins: np.ndarray, directions: np.ndarray, center: np.ndarray, radius: float, t_min: float, closest: np.ndarray, a: np.ndarray = None) -> 'tuple[np.ndarray, np.ndarray]':
+    '''
+    Versão vetorizada de Sphere.hit: intersecção de vários raios com uma esfera.
+
+    ---
+
+    Parâmetros:
+
+        - origins: np.ndarray - Array (N, 3) com as origens dos raios.
+
+        - directions: np.ndarray - Array (N, 3) com as direções dos raios.
+
+        - center: np.ndarray - Vetor (3,) com o centro da esfera.
+
+        - radius: float - Raio da esfera.
+
+        - t_min: float - Valor mínimo de t para considerar uma intersecção.
+
+        - closest: np.ndarray - Array (N,) com o valor máximo de t de cada raio (o acerto mais próximo encontrado até agora).
+
+        - a: np.ndarray - Array (N,) com o quadrado do comprimento de cada direção. Se não for informado, é calculado (informe-o para testar várias esferas com os mesmos raios).
+
+    ---
+
+    Retorno:
+
+        - tuple[np.ndarray, np.ndarray] - Tupla contendo um array (N,) de booleanos com os raios que atingem a esfera e um array (N,) com o valor t de cada intersecção (válido apenas onde o raio atinge a esfera).
+    '''
+    if a is None:
+        a = np.einsum('ij,ij->i', directions, directions)
+    oc = origins - center
+    half_b = np.einsum('ij,ij->i', oc, directions)
+    c = np.einsum('ij,ij->i', oc, oc) - radius ** 2
+    discriminant = half_b ** 2 - a * c
+    valid = discriminant >= 0
+    root = np.sqrt(np.where(valid, discriminant, 0))
+    t = (-half_b - root) / a
+    near_ok = valid & (t >= t_min) & (t <= closest)
+    t_far = (-half_b + root) / a
+    far_ok = valid & ~near_ok & (t_far >= t_min) & (t_far <= closest)
+    return near_ok | far_ok, np.where(near_ok, t, t_far)
+
+def triangle_hits(origins: np.ndarray, directions: np.ndarray, vertexes: np.ndarray, normal: np.ndarray, d: float, edge_normals: np.ndarray, t_min: float, closest: np.ndarray) -> 'tuple[np.ndarray, np.ndarray]':
+    '''
+    Versão vetorizada de Triangle.hit: intersecção de vários raios com um triângulo (plano do triângulo e, depois, o lado de cada aresta em que o ponto está).
+
+    ---
+
+    Parâmetros:
+
+        - origins: np.ndarray - Array (N, 3) com as origens dos raios.
+
+        - directions: np.ndarray - Array (N, 3) com as direções dos raios.
+
+        - vertexes: np.ndarray - Array (3, 3) com os vértices do triângulo.
+
+        - normal: np.ndarray - Vetor (3,) com a normal (não normalizada) do triângulo.
+
+        - d: float - Constante do plano do triângulo (-normal · vértice 1).
+
+        - edge_normals: np.ndarray - Array (3, 3) com normal x aresta de cada aresta (v1 -> v2, v2 -> v3 e v3 -> v1).
+
+        - t_min: float - Valor mínimo de t para considerar uma intersecção.
+
+        - closest: np.ndarray - Array (N,) com o valor máximo de t de cada raio.
+
+    ---
+
+    Retorno:
+
+        - tuple[np.ndarray, np.ndarray] - Tupla contendo um array (N,) de booleanos com os raios que atingem o triângulo e um array (N,) com o valor t de cada intersecção (válido apenas onde o raio atinge o triângulo).
+    '''
+    normal_dot_ray_dir = directions @ normal
+    not_parallel = normal_dot_ray_dir != 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = -(origins @ normal + d) / normal_dot_ray_dir
+    hit = not_parallel & (t >= t_min) & (t <= closest)
+    if not hit.any():
+        return hit, t
+    points = origins + np.where(hit, t, 0)[:, None] * directions
+    for edge in range(3):
+        # n · (aresta x (P - v)) == (n x aresta) · (P - v)
+        hit &= (points - vertexes[edge]) @ edge_normals[edge] >= 0
+    return hit, t
+
+def mesh_hits(origin: np.ndarray, direction: np.ndarray, vertexes: np.ndarray, edges: np.ndarray, t_min: float, t_max: float) -> 'tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]':
+    '''
+    Intersecção de um raio com vários triângulos (uma malha) pelo algoritmo de Möller–Trumbore, para todos os triângulos de uma só vez. Além de t, o algoritmo encontra as coordenadas baricêntricas do ponto de acerto, usadas na interpolação das normais dos vértices.
+
+    https://en.wikipedia.org/wiki/M%C3%B6ller%E2%80%93Trumbore_intersection_algorithm
+
+    ---
+
+    Parâmetros:
+
+        - origin: np.ndarray - Vetor (3,) com a origem do raio.
+
+        - direction: np.ndarray - Vetor (3,) com a direção do raio.
+
+        - vertexes: np.ndarray - Array (T, 3, 3) com os vértices de cada triângulo.
+
+        - edges: np.ndarray - Array (T, 2, 3) com as arestas v1 -> v2 e v1 -> v3 de cada triângulo.
+
+        - t_min: float - Valor mínimo de t para considerar uma intersecção.
+
+        - t_max: float - Valor máximo de t para considerar uma intersecção.
+
+    ---
+
+    Retorno:
+
+        - tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray] - Tupla contendo um array (T,) de booleanos com os triângulos atingidos pelo raio, um array (T,) com o valor t de cada intersecção e dois arrays (T,) com as coordenadas baricêntricas u e v (pesos dos vértices 2 e 3; o peso do vértice 1 é 1 - u - v), válidos apenas onde o raio atinge o triângulo.
+    '''
+    edges_1 = edges[:, 0]
+    edges_2 = edges[:, 1]
+    p = np.cross(direction, edges_2)
+    determinant = np.einsum('ij,ij->i', edges_1, p)
+    not_parallel = determinant != 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inverse_determinant = 1.0 / determinant
+        s = origin - vertexes[:, 0]
+        u = np.einsum('ij,ij->i', s, p) * inverse_determinant
+        q = np.cross(s, edges_1)
+        v = (q @ direction) * inverse_determinant
+        t = np.einsum('ij,ij->i', edges_2, q) * inverse_determinant
+        # Triângulos degenerados (determinante 0) têm u, v e t infinitos ou NaN, e são descartados por not_parallel
+        hit = not_parallel & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= t_min) & (t <= t_max)
+    return hit, t, u, v
@@ -3,6 +3,10 @@ from lib.vec.Vec3 import Color
 from lib.Ray import Ray
 
 class Material:
+
+    # Identificador do material nas AOVs (ver Camera.aovs). Materiais sem identificador ficam com 0
+    material_id: int = 0
+
     def scatter(self, ray: Ray, rec) -> 'tuple[bool, Ray, Color]':
         '''
         Gera um raio novo (possivelmente) a partir do raio que atingiu o objeto.
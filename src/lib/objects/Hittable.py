@@ -2,6 +2,7 @@
 from lib.Ray import Ray
 from lib.HitRecord import HitRecord
 from lib.Interval import Interval
+from lib.AABB import AABB
 
 
 class Hittable:
@@ -11,6 +12,9 @@ class Hittable:
     Basicamente, define que a classe filha precisa implementar o método hit
     '''
 
+    # Identificador do objeto nas AOVs (ver Camera.aovs). Objetos sem identificador ficam com 0
+    object_id: int = 0
+
     def hit(self, ray: Ray, t_interval: Interval) -> "tuple[bool, HitRecord]":
         '''
         Dado um raio e um intervalo de t, será verificado se o raio atinge o objeto.
@@ -30,4 +34,16 @@ class Hittable:
             Se o raio atingiu o objeto, então, será retornado uma tupla contendo True e um HitRecord com as informações da intersecção.
             Caso contrário, será retornado uma tupla contendo False e None.
         '''
+        raise NotImplementedError('Esse método método deve ser implementado na classe filha.')
+
+    def bounding_box(self) -> AABB:
+        '''
+        Retorna a caixa alinhada aos eixos que envolve o objeto, usada pelas estruturas de aceleração (ver lib.accelerators).
+
+        ---
+
+        Retorno:
+
+            - AABB - Caixa que envolve o objeto.
+        '''
         raise NotImplementedError('Esse método método deve ser implementado na classe filha.')
\ No newline at end of file
@@ -1,11 +1,24 @@
 
 from lib.vec.Vec3 import Vec3
-from lib.objects.Triangle import Triangle
+from lib.objects.Hittable import Hittable
+from lib.objects.Triangle import Triangle, BOX_PADDING
 from lib.objects.TriangleFaceIndexes import TriangleFaceIndexes
 from lib.materials.Material import Material
+from lib.Ray import Ray
+from lib.HitRecord import HitRecord
+from lib.Interval import Interval
+from lib.AABB import AABB
+from lib.accelerators.BVH import BVH
+from lib.intersections import mesh_hits
+import numpy as np
 import re
 
-class Model:
+
+# Quantidade de triângulos a partir da qual o modelo constrói uma BVH sobre as suas faces, para que hit só teste os triângulos candidatos (ver Model.hit)
+MESH_BVH_MIN_TRIANGLES = 64
+
+
+class Model(Hittable):
 
     def __init__(self, file_path: str, material: Material):
         '''
@@ -17,6 +30,8 @@ class Model:
 
         Definição de formato definida em: https://en.wikipedia.org/wiki/Wavefront_.obj_file
 
+        Além das faces (objetos Triangle), o modelo guarda os triângulos em arrays do NumPy (ver triangle_vertexes), e pode ser adicionado a uma HittableList como um único objeto (ver HittableList.add): nesse caso, hit testa todos os triângulos com uma única operação vetorizada (Möller–Trumbore), ao invés de um objeto Triangle por vez.
+
         ---
 
         Parâmetros:
@@ -27,6 +42,7 @@ class Model:
         self.__normals: list[Vec3] = []
         self.__faces: list[Triangle] = []
         self.__faces_indexes: list[TriangleFaceIndexes] = []
+        self.__bvh: BVH = None
         self.material = material
 
         with open(file_path, 'r') as file:
@@ -156,9 +172,21 @@ class Model:
         delta_y = y_max - y_min
         delta_z = z_max - z_min
 
+        # Arrays dos triângulos: índices dos vértices, normais das faces (as mesmas de cada Triangle) e normais dos vértices (zeradas nas faces sem normais)
+        self.__vertex_indexes = np.array([face_indexes[0] for face_indexes in self.__faces_indexes], dtype=np.int64).reshape(-1, 3)
+        self.__face_normals = np.array([face.normal.vec for face in self.__faces], dtype=np.float64).reshape(-1, 3)
+        self.__smooth = np.array([face.normals is not None for face in self.__faces], dtype=bool)
+        self.__vertex_normals = np.array(
+            [[normal.vec for normal in face.normals] if face.normals is not None else np.zeros((3, 3)) for face in self.__faces],
+            dtype=np.float64
+        ).reshape(-1, 3, 3)
+
         # Posicionando o modelo no centro do mundo (0, 0, 0)
         self.translate(-mass_center)
-        
+
+        if len(self.__faces) >= MESH_BVH_MIN_TRIANGLES:
+            self.__bvh = BVH(self.__faces)
+
 
     @property
     def vertexes(self):
@@ -188,6 +216,32 @@ class Model:
         '''
         return self.__faces
     
+    @property
+    def triangle_vertexes(self) -> np.ndarray:
+        '''
+        Retorna os vértices de todos os triângulos do modelo (na ordem de faces), atualizados a cada scale e translate.
+
+        ---
+
+        Retorno:
+
+            - np.ndarray - Array (T, 3, 3) com os três vértices de cada triângulo.
+        '''
+        return self.__triangle_vertexes
+
+    @property
+    def triangle_edges(self) -> np.ndarray:
+        '''
+        Retorna as arestas v1 -> v2 e v1 -> v3 de todos os triângulos do modelo, usadas pelo Möller–Trumbore.
+
+        ---
+
+        Retorno:
+
+            - np.ndarray - Array (T, 2, 3) com as duas arestas de cada triângulo.
+        '''
+        return self.__triangle_edges
+
     @property
     def faces_indexes(self):
         '''
@@ -201,6 +255,18 @@ class Model:
         '''
         return self.__faces_indexes
 
+    @property
+    def object_id(self) -> int:
+        '''
+        Identificador do modelo nas AOVs (ver Camera.aovs). É o identificador de todas as suas faces.
+        '''
+        return self.__faces[0].object_id if len(self.__faces) > 0 else 0
+
+    @object_id.setter
+    def object_id(self, object_id: int):
+        for face in self.__faces:
+            face.object_id = object_id
+
     def scale(self, scale_factor: float):
         '''
         Escala o modelo.
@@ -213,6 +279,7 @@ class Model:
         '''
         for vertex in self.__vertexes:
             vertex *= scale_factor
+        self.__update_triangles()
     
     def translate(self, translation_vector: Vec3):
         '''
@@ -225,4 +292,78 @@ class Model:
             - translation_vector: Vec3 - Vetor de translação.
         '''
         for vertex in self.__vertexes:
-            vertex += translation_vector
\ No newline at end of file
+            vertex += translation_vector
+        self.__update_triangles()
+
+    def __update_triangles(self):
+        '''
+        Recalcula os arrays dos vértices e das arestas dos triângulos a partir dos vértices do modelo, descarta as constantes da intersecção de cada face (ver Triangle.invalidate) e reajusta a BVH das faces (se houver), após os vértices serem alterados.
+        '''
+        for face in self.__faces:
+            face.invalidate()
+        vertexes = np.array([vertex.vec for vertex in self.__vertexes], dtype=np.float64).reshape(-1, 3)
+        self.__triangle_vertexes = vertexes[self.__vertex_indexes]
+        self.__triangle_edges = self.__triangle_vertexes[:, 1:] - self.__triangle_vertexes[:, :1]
+        if self.__bvh is not None:
+            self.__bvh.refit(self.__faces)
+
+    def hit(self, ray: Ray, t_interval: Interval) -> "tuple[bool, HitRecord]":
+        '''
+        Verifica se um raio atinge o modelo, testando todos os seus triângulos de uma só vez (ver lib.intersections.mesh_hits) e escolhendo o acerto mais próximo. Em modelos grandes (ver MESH_BVH_MIN_TRIANGLES), apenas os triângulos das folhas da BVH das faces atravessadas pelo raio são testados.
+
+        Nas faces com normais nos vértices, a normal do ponto de acerto é interpolada com as coordenadas baricêntricas do Möller–Trumbore; nas demais, é a normal da face. O resultado é o mesmo de testar cada face (Triangle.hit).
+
+        ---
+
+        Parâmetros:
+
+            - ray: Ray - Raio a ser verificado.
+
+            - t_interval: Interval - Intervalo de t em que o raio pode atingir o modelo.
+
+        ---
+
+        Retorno:
+
+            - tuple[bool, HitRecord] - Tupla contendo um booleano que indica se o raio atingiu o modelo e um registro de acerto (hit record) com informações sobre o acerto. Caso o raio não atinja o modelo, o registro de acerto é None.
+        '''
+        vertexes = self.__triangle_vertexes
+        edges = self.__triangle_edges
+        candidates = None
+        if self.__bvh is not None:
+            candidates = self.__bvh.candidates(ray, t_interval)
+            if len(candidates) == 0:
+                return False, None
+            vertexes = vertexes[candidates]
+            edges = edges[candidates]
+
+        hit, t, u, v = mesh_hits(ray.origin.vec, ray.direction.vec, vertexes, edges, t_interval.min, t_interval.max)
+        if not hit.any():
+            return False, None
+
+        nearest = np.argmin(np.where(hit, t, np.inf))
+        k = candidates[nearest] if candidates is not None else nearest
+        t = t[nearest]
+        intersect_point = ray.at(t)
+
+        if self.__smooth[k]:
+            w2, w3 = u[nearest], v[nearest]
+            w1 = 1.0 - w2 - w3
+            normals = self.__vertex_normals[k]
+            normal = Vec3(w1 * normals[0] + w2 * normals[1] + w3 * normals[2]).unit_vector()
+        else:
+            normal = self.__faces[k].normal
+
+        return True, HitRecord(intersect_point, normal, t, ray, self.material, self.object_id)
+
+    def bounding_box(self) -> AABB:
+        '''
+        Retorna a caixa alinhada aos eixos que envolve todos os triângulos do modelo (alargada em eixos sem espessura, como em Triangle.bounding_box).
+        '''
+        vertexes = self.__triangle_vertexes.reshape(-1, 3)
+        minimum = vertexes.min(axis=0)
+        maximum = vertexes.max(axis=0)
+        flat = maximum - minimum < BOX_PADDING
+        minimum[flat] -= BOX_PADDING / 2
+        maximum[flat] += BOX_PADDING / 2
+        return AABB(minimum, maximum)
@@ -5,6 +5,7 @@ from lib.Ray import Ray
 from lib.HitRecord import HitRecord
 from lib.Interval import Interval
 from lib.materials.Material import Material
+from lib.AABB import AABB
 
 import numpy as np
 
@@ -40,6 +41,13 @@ class Sphere(Hittable):
         Raio da esfera.
         '''
         return self.__radius
+    
+    @property
+    def material(self):
+        '''
+        Material da esfera.
+        '''
+        return self.__material
 
     def hit(self, ray: Ray, t_interval: Interval) -> "tuple[bool, HitRecord]":
         '''
@@ -78,7 +86,14 @@ class Sphere(Hittable):
             
             p = ray.at(t)
             normal = (p - self.center) / self.radius
-            return True, HitRecord(p, normal, t, ray, self.__material)
+            return True, HitRecord(p, normal, t, ray, self.__material, self.object_id)
+
+    def bounding_box(self) -> AABB:
+        '''
+        Retorna a caixa alinhada aos eixos que envolve a esfera.
+        '''
+        radius = abs(self.radius)
+        return AABB(self.center.vec - radius, self.center.vec + radius)
     
     def rotate(self, axis: str, angle: float) -> 'Sphere':
         '''
@@ -96,6 +111,8 @@ class Sphere(Hittable):
 
         Retorno:
 
-            - Sphere - Esfera rotacionada.
+            - Sphere - Esfera rotacionada (com o mesmo identificador).
         '''
-        return Sphere(self.center.rotate(axis, angle), self.radius, self.__material)
\ No newline at end of file
+        rotated = Sphere(self.center.rotate(axis, angle), self.radius, self.__material)
+        rotated.object_id = self.object_id
+        return rotated
\ No newline at end of file
@@ -7,10 +7,15 @@ from lib.Ray import Ray
 from lib.HitRecord import HitRecord
 from lib.Interval import Interval
 from lib.materials.Material import Material
+from lib.AABB import AABB
 
 import numpy as np
 
 
+# Espessura mínima da caixa envolvente (ver Triangle.bounding_box)
+BOX_PADDING = 1e-4
+
+
 def barycentric(point1: Point3, point2: Point3, point3: Point3, intersect_point: Point3):
     '''
     Calcula as coordenadas baricêntricas de um ponto em relação a um triângulo.
@@ -88,6 +93,36 @@ class Triangle(Hittable):
         v1_to_v2 = self.vertex_2 - self.vertex_1
         v1_to_v3 = self.vertex_3 - self.vertex_1
         self.normal = v1_to_v2.cross(v1_to_v3)
+
+        # Constantes da intersecção, que dependem apenas dos vértices (ver __update_constants). São calculadas no primeiro teste de um raio
+        self.__constants = None
+
+    def __update_constants(self):
+        '''
+        Calcula as constantes usadas por hit: as arestas (v1 -> v2, v2 -> v3 e v3 -> v1), a constante d do plano do triângulo (-normal · vértice 1) e, se o triângulo tem normais nos vértices, os produtos escalares das coordenadas baricêntricas (ver barycentric) que não dependem do ponto de acerto.
+        '''
+        edge_1 = self.vertex_2 - self.vertex_1
+        edge_2 = self.vertex_3 - self.vertex_2
+        edge_3 = self.vertex_1 - self.vertex_3
+        d = -self.normal.dot(self.vertex_1)
+
+        barycentric_constants = None
+        if self.__normals is not None:
+            v0 = edge_1
+            v1 = self.vertex_3 - self.vertex_1
+            d00 = v0.dot(v0)
+            d01 = v0.dot(v1)
+            d11 = v1.dot(v1)
+            denom = d00 * d11 - d01 * d01
+            barycentric_constants = (v0, v1, d00, d01, d11, denom)
+
+        self.__constants = (edge_1, edge_2, edge_3, d, barycentric_constants)
+
+    def invalidate(self):
+        '''
+        Descarta as constantes da intersecção, que são recalculadas no próximo teste de um raio. É chamado por scale e translate, e deve ser chamado sempre que os vértices forem alterados de outra forma (por exemplo, por Model.scale e Model.translate, que alteram os vértices compartilhados entre as faces).
+        '''
+        self.__constants = None
     
     @property
     def vertexes(self) -> np.ndarray:
@@ -145,6 +180,13 @@ class Triangle(Hittable):
         '''
         return self.__normals[2] if self.__normals is not None else None
     
+    @property
+    def material(self) -> Material:
+        '''
+        Retorna o material do triângulo.
+        '''
+        return self.__material
+    
     def __getitem__(self, index) -> Point3:
         '''
         Retorna o vértice especificado.
@@ -172,12 +214,15 @@ class Triangle(Hittable):
             - tuple[bool, HitRecord] - Tupla contendo um booleano que indica se o raio atingiu a triângulo e um registro de acerto (hit record) com informações sobre o acerto. Caso o raio não atinja a triângulo, o registro de acerto é None.
         '''
 
+        if self.__constants is None:
+            self.__update_constants()
+        edge_1, edge_2, edge_3, d, barycentric_constants = self.__constants
+
         # Descobrindo o valor P: intersecção do raio com o plano formado pelo triângulo
         normal_dot_ray_dir = self.normal.dot(ray.direction)
         if normal_dot_ray_dir == 0:
             return False, None  # O raio é paralelo ao plano
         
-        d = -self.normal.dot(self.vertex_1)
         t = -(self.normal.dot(ray.origin) + d) / normal_dot_ray_dir
 
         if t not in t_interval:
@@ -188,34 +233,49 @@ class Triangle(Hittable):
         # Verificando se o ponto de intersecção está dentro ou fora do triângulo
         # Todo lugar que retornar False, quer dizer que o ponto está à direita da aresta, logo, fora do triângulo
         # Só estará dentro do triângulo se para todas as arestas, o ponto estiver para esquerda
-        edge_1 = self.vertex_2 - self.vertex_1
         vp1= intersect_point - self.vertex_1
         c = edge_1.cross(vp1)
         if self.normal.dot(c) < 0:
             return False, None
         
-        edge_2 = self.vertex_3 - self.vertex_2
         vp2= intersect_point - self.vertex_2
         c = edge_2.cross(vp2)
         if self.normal.dot(c) < 0:
             return False, None
 
-        edge_3 = self.vertex_1 - self.vertex_3
         vp3= intersect_point - self.vertex_3
         c = edge_3.cross(vp3)
         if self.normal.dot(c) < 0:
             return False, None
         
         if self.__normals is None:
-            return True, HitRecord(intersect_point, self.normal, t, ray, self.__material)
+            return True, HitRecord(intersect_point, self.normal, t, ray, self.__material, self.object_id)
         else:
-            # Calculando as coordenadas baricêntricas
-            w1, w2, w3 = barycentric(self.vertex_1, self.vertex_2, self.vertex_3, intersect_point)
+            # Calculando as coordenadas baricêntricas (como em barycentric, com as constantes do triângulo já calculadas)
+            v0, v1, d00, d01, d11, denom = barycentric_constants
+            v2 = intersect_point - self.vertex_1
+            d20 = v2.dot(v0)
+            d21 = v2.dot(v1)
+            w2 = (d11 * d20 - d01 * d21) / denom
+            w3 = (d00 * d21 - d01 * d20) / denom
+            w1 = 1.0 - w2 - w3
             normal = w1 * self.normal_1 + w2 * self.normal_2 + w3 * self.normal_3
             normal = normal.unit_vector()
 
-            return True, HitRecord(intersect_point, normal, t, ray, self.__material)
+            return True, HitRecord(intersect_point, normal, t, ray, self.__material, self.object_id)
     
+    def bounding_box(self) -> AABB:
+        '''
+        Retorna a caixa alinhada aos eixos que envolve o triângulo. Em eixos em que o triângulo não tem espessura (por exemplo, um chão plano), a caixa é alargada em BOX_PADDING, para que o teste do raio com a caixa não dependa de arredondamentos.
+        '''
+        vertexes = np.array([vertex.vec for vertex in self.__vertexes])
+        minimum = vertexes.min(axis=0)
+        maximum = vertexes.max(axis=0)
+        flat = maximum - minimum < BOX_PADDING
+        minimum[flat] -= BOX_PADDING / 2
+        maximum[flat] += BOX_PADDING / 2
+        return AABB(minimum, maximum)
+
     def scale(self, factor: float):
         '''
         Escala o triângulo.
@@ -228,6 +288,7 @@ class Triangle(Hittable):
         '''
         for i in range(len(self.__vertexes)):
             self.__vertexes[i] *= factor
+        self.invalidate()
     
     def translate(self, offset: Vec3):
         '''
@@ -241,4 +302,5 @@ class Triangle(Hittable):
         '''
         for i in range(len(self.__vertexes)):
             self.__vertexes[i] += offset
+        self.invalidate()
     
\ No newline at end of file
@@ -0,0 +1,21 @@
+import numpy as np
+
+from lib.samplers.Sampler import Sampler
+from lib.utils import hash_key, hash_keys, counter_double, counter_doubles
+
+
+class RandomSampler(Sampler):
+
+    independent = True
+
+    def __init__(self):
+        '''
+        Construtor do amostrador Monte Carlo padrão: cada dimensão de cada amostra é um número aleatório independente, baseado em contador (hash da chave do pixel, do índice da amostra e da dimensão).
+        '''
+        pass
+
+    def samples(self, pixel_keys: np.ndarray, sample_numbers: np.ndarray, dimension: int) -> np.ndarray:
+        return counter_doubles(hash_keys(pixel_keys, sample_numbers), dimension)
+
+    def sample(self, pixel_key: int, sample_number: int, dimension: int) -> float:
+        return counter_double(hash_key(pixel_key, sample_number), dimension)
@@ -0,0 +1,53 @@
+import numpy as np
+
+
+class Sampler:
+
+    # Verdadeiro se as amostras são números aleatórios independentes, que podem vir de qualquer gerador quando a câmera não tem semente
+    independent = False
+
+    def samples(self, pixel_keys: np.ndarray, sample_numbers: np.ndarray, dimension: int) -> np.ndarray:
+        '''
+        Retorna, para cada amostra, a coordenada dimension do seu ponto amostral (um número entre 0 e 1).
+
+        Cada amostra de um pixel é um ponto em um hipercubo: as dimensões 0 e 1 são o jitter do raio primário e as seguintes são os números usados em cada reflexão (ver WavefrontIntegrator). Um amostrador decide como esses pontos são distribuídos: independentes (Monte Carlo) ou bem espalhados entre as amostras do mesmo pixel (quasi-Monte Carlo), o que diminui o ruído para a mesma quantidade de amostras.
+
+        ---
+
+        Parâmetros:
+
+            - pixel_keys: np.ndarray - Array (N,) com a chave (np.uint64) do pixel de cada amostra (hash_key(Camera.random_key(), pixel)).
+
+            - sample_numbers: np.ndarray - Array (N,) com o índice de cada amostra dentro do seu pixel.
+
+            - dimension: int - Dimensão do ponto amostral.
+
+        ---
+
+        Retorno:
+
+            - np.ndarray - Array (N,) de números entre 0 e 1.
+        '''
+        raise NotImplementedError
+
+    def sample(self, pixel_key: int, sample_number: int, dimension: int) -> float:
+        '''
+        Versão escalar de samples, para uma única amostra (usada pelo Camera.ray_color, através de lib.utils.random_double).
+
+        ---
+
+        Parâmetros:
+
+            - pixel_key: int - Chave do pixel.
+
+            - sample_number: int - Índice da amostra dentro do pixel.
+
+            - dimension: int - Dimensão do ponto amostral.
+
+        ---
+
+        Retorno:
+
+            - float - Número entre 0 e 1.
+        '''
+        raise NotImplementedError
@@ -0,0 +1,117 @@
+import numpy as np
+
+from lib.samplers.Sampler import Sampler
+from lib.utils import mix64, mix64_array
+
+
+MASK_32 = 0xFFFFFFFF
+UINT32_UNIT = 2.0 ** -32
+
+# Constantes da permutação de Laine-Karras (Burley, "Practical Hash-based Owen Scrambling", 2020)
+LAINE_KARRAS_MULTIPLIERS = [0x6C50B47C, 0xB82F1E52, 0xC7AFE638, 0x8D22F6E6]
+
+
+def reverse_bits(value: int) -> int:
+    '''
+    Inverte a ordem dos bits de um inteiro de 32 bits.
+    '''
+    return int(f'{value:032b}'[::-1], 2)
+
+def reverse_bits_array(values: np.ndarray) -> np.ndarray:
+    '''
+    Versão vetorizada de reverse_bits, para um array de np.uint32.
+    '''
+    values = ((values >> 1) & 0x55555555) | ((values & 0x55555555) << 1)
+    values = ((values >> 2) & 0x33333333) | ((values & 0x33333333) << 2)
+    values = ((values >> 4) & 0x0F0F0F0F) | ((values & 0x0F0F0F0F) << 4)
+    values = ((values >> 8) & 0x00FF00FF) | ((values & 0x00FF00FF) << 8)
+    return (values >> 16) | (values << 16)
+
+def laine_karras_permutation(value: int, seed: int) -> int:
+    '''
+    Permutação de Laine-Karras: embaralha um inteiro de 32 bits de forma que cada bit dependa apenas dele mesmo e dos bits menos significativos. Aplicada aos bits invertidos, é um embaralhamento de Owen (nested uniform scrambling).
+    '''
+    value = (value + seed) & MASK_32
+    for multiplier in LAINE_KARRAS_MULTIPLIERS:
+        value ^= (value * multiplier) & MASK_32
+    return value
+
+def laine_karras_permutation_array(values: np.ndarray, seeds: np.ndarray) -> np.ndarray:
+    '''
+    Versão vetorizada de laine_karras_permutation, para arrays de np.uint32.
+    '''
+    values = values + seeds
+    for multiplier in LAINE_KARRAS_MULTIPLIERS:
+        values ^= values * np.uint32(multiplier)
+    return values
+
+def sobol_reversed_tables() -> 'tuple[np.ndarray, list[list[int]]]':
+    '''
+    Tabelas da segunda dimensão da sequência de Sobol, com os bits invertidos: a coordenada (invertida) do ponto de índice i é o ou-exclusivo de tables[k][byte k de i], para k de 0 a 3.
+
+    ---
+
+    Retorno:
+
+        - tuple[np.ndarray, list[list[int]]] - As tabelas (4, 256), como array de np.uint32 e como listas do Python.
+    '''
+    # Números de direção da segunda dimensão de Sobol (polinômio primitivo x + 1)
+    directions = [1 << 31]
+    for _ in range(31):
+        directions.append(directions[-1] ^ (directions[-1] >> 1))
+    directions = [reverse_bits(direction) for direction in directions]
+
+    tables = [[0] * 256 for _ in range(4)]
+    for table in range(4):
+        for byte in range(256):
+            for bit in range(8):
+                if (byte >> bit) & 1:
+                    tables[table][byte] ^= directions[8 * table + bit]
+    return np.array(tables, dtype=np.uint32), tables
+
+SOBOL_REVERSED_TABLES, SOBOL_REVERSED_LISTS = sobol_reversed_tables()
+
+
+class SobolSampler(Sampler):
+
+    def __init__(self):
+        '''
+        Construtor de um amostrador quasi-Monte Carlo com a sequência de Sobol 2D embaralhada (Owen scrambling por hash, Burley 2020).
+
+        As dimensões são agrupadas em pares (jitter do pixel, direção de cada reflexão, ...). Em cada par, as amostras de um pixel são os pontos de uma sequência de Sobol 2D, que são bem espalhados no quadrado [0, 1)² (cada potência de 2 de amostras forma uma rede estratificada). Para que os pares e os pixels não fiquem correlacionados, cada par de cada pixel embaralha a ordem das amostras e os bits das coordenadas com sementes próprias, derivadas da chave do pixel.
+
+        O embaralhamento mantém cada coordenada uniformemente distribuída, então a imagem continua sem viés. O ruído diminui mais rápido com a quantidade de amostras do que com números aleatórios independentes, principalmente quando ela é uma potência de 2.
+        '''
+        pass
+
+    def samples(self, pixel_keys: np.ndarray, sample_numbers: np.ndarray, dimension: int) -> np.ndarray:
+        pair, component = divmod(dimension, 2)
+        pair_keys = mix64_array(pixel_keys ^ np.uint64(pair))
+        component_seeds = (mix64_array(pair_keys ^ np.uint64(component + 1)) & np.uint64(MASK_32)).astype(np.uint32)
+
+        # Embaralha a ordem das amostras do pixel neste par (Owen scrambling do índice)
+        index = np.asarray(sample_numbers).astype(np.uint32)
+        index = reverse_bits_array(laine_karras_permutation_array(reverse_bits_array(index), (pair_keys & np.uint64(MASK_32)).astype(np.uint32)))
+
+        # Coordenada do ponto de Sobol com os bits invertidos (a primeira dimensão de Sobol é o próprio índice invertido)
+        if component == 0:
+            bits = index
+        else:
+            bits = SOBOL_REVERSED_TABLES[0][index & 0xFF] ^ SOBOL_REVERSED_TABLES[1][(index >> 8) & 0xFF] ^ SOBOL_REVERSED_TABLES[2][(index >> 16) & 0xFF] ^ SOBOL_REVERSED_TABLES[3][index >> 24]
+
+        return reverse_bits_array(laine_karras_permutation_array(bits, component_seeds)) * UINT32_UNIT
+
+    def sample(self, pixel_key: int, sample_number: int, dimension: int) -> float:
+        pair, component = divmod(dimension, 2)
+        pair_key = mix64(pixel_key ^ pair)
+        component_seed = mix64(pair_key ^ (component + 1)) & MASK_32
+
+        index = reverse_bits(laine_karras_permutation(reverse_bits(sample_number & MASK_32), pair_key & MASK_32))
+
+        if component == 0:
+            bits = index
+        else:
+            tables = SOBOL_REVERSED_LISTS
+            bits = tables[0][index & 0xFF] ^ tables[1][(index >> 8) & 0xFF] ^ tables[2][(index >> 16) & 0xFF] ^ tables[3][index >> 24]
+
+        return reverse_bits(laine_karras_permutation(bits, component_seed)) * UINT32_UNIT
@@ -0,0 +1,34 @@
+'''
+    Criação dos amostradores a partir do nome.
+'''
+
+from lib.samplers.Sampler import Sampler
+from lib.samplers.RandomSampler import RandomSampler
+from lib.samplers.SobolSampler import SobolSampler
+
+
+# Amostradores disponíveis
+samplers = ['random', 'sobol']
+
+
+def create_sampler(name: str) -> Sampler:
+    '''
+    Cria um amostrador a partir do seu nome.
+
+    ---
+
+    Parâmetros:
+
+        - name: str - Nome do amostrador: 'random' (números aleatórios independentes) ou 'sobol' (quasi-Monte Carlo, sequência de Sobol embaralhada).
+
+    ---
+
+    Retorno:
+
+        - Sampler - Amostrador criado.
+    '''
+    if name == 'random':
+        return RandomSampler()
+    if name == 'sobol':
+        return SobolSampler()
+    raise ValueError(f'Amostrador desconhecido: {name}. Os amostradores disponíveis são: {", ".join(samplers)}.')
@@ -0,0 +1,25 @@
+import numpy as np
+
+from lib.sinks.Sink import Sink
+
+from typing import Callable
+
+
+class CallbackSink(Sink):
+    def __init__(self, callback: 'Callable[[np.ndarray, str], None]'):
+        '''
+        Construtor de um destino que repassa a imagem renderizada (em memória) para uma função.
+
+        ---
+
+        Parâmetros:
+
+            - callback: Callable[[np.ndarray, str], None] - Função chamada com a matriz (altura, largura, 3) das cores gamma da imagem e o nome do arquivo.
+        '''
+        self.callback = callback
+
+    def write(self, framebuffer: np.ndarray, filename: str):
+        '''
+        Chama a função com a imagem renderizada e o nome do arquivo.
+        '''
+        self.callback(framebuffer, filename)
@@ -0,0 +1,23 @@
+import numpy as np
+
+from lib.Image import Image
+from lib.ImageIO import ImageWriter
+from lib.sinks.Sink import Sink
+
+
+class FileSink(Sink):
+    def write(self, framebuffer: np.ndarray, filename: str):
+        '''
+        Salva a imagem renderizada no arquivo informado (o formato é inferido a partir da extensão, normalmente PNG).
+
+        ---
+
+        Parâmetros:
+
+            - framebuffer: np.ndarray - Matriz (altura, largura, 3) com as cores gamma da imagem, entre 0 e 0.999.
+
+            - filename: str - Nome do arquivo de imagem a ser salvo.
+        '''
+        if filename is None:
+            raise ValueError('É preciso informar o nome do arquivo para salvar a imagem.')
+        ImageWriter(Image.from_float_matrix(framebuffer)).save(filename)
@@ -0,0 +1,22 @@
+import numpy as np
+
+from lib.Image import Image
+from lib.ImageIO import ImageWriter
+from lib.sinks.Sink import Sink
+
+
+class NotebookSink(Sink):
+    def write(self, framebuffer: np.ndarray, filename: str):
+        '''
+        Mostra a imagem renderizada no notebook (IPython). O IPython só é importado aqui, para que renderizações fora de um notebook não dependam dele.
+
+        ---
+
+        Parâmetros:
+
+            - framebuffer: np.ndarray - Matriz (altura, largura, 3) com as cores gamma da imagem, entre 0 e 0.999.
+
+            - filename: str - Nome do arquivo da imagem (não utilizado).
+        '''
+        from IPython.display import display
+        display(ImageWriter(Image.from_float_matrix(framebuffer)).image)
@@ -0,0 +1,11 @@
+import numpy as np
+
+from lib.sinks.Sink import Sink
+
+
+class NullSink(Sink):
+    def write(self, framebuffer: np.ndarray, filename: str):
+        '''
+        Descarta a imagem renderizada (útil para medir o desempenho sem o custo de salvar ou mostrar a imagem).
+        '''
+        pass
@@ -0,0 +1,17 @@
+import numpy as np
+
+
+class Sink:
+    def write(self, framebuffer: np.ndarray, filename: str):
+        '''
+        Recebe uma imagem renderizada (por exemplo, para salvá-la ou mostrá-la).
+
+        ---
+
+        Parâmetros:
+
+            - framebuffer: np.ndarray - Matriz (altura, largura, 3) com as cores gamma da imagem, entre 0 e 0.999.
+
+            - filename: str - Nome do arquivo da imagem (pode ser None, se nenhum foi informado na renderização).
+        '''
+        raise NotImplementedError
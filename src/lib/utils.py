@@ -3,7 +3,24 @@
 '''
 
 from lib.constants import pi
-import random
+from lib.RandomPool import RandomPool, uniform_unit_vector
+import numpy as np
+import math
+import threading
+import os
+
+
+# Cada thread possui o seu próprio gerador de números aleatórios, para que as threads de renderização possam ser semeadas de forma independente
+thread_state = threading.local()
+
+def reset_random_generator():
+    '''
+    Descarta o gerador de números aleatórios (e o fluxo baseado em contador) da thread atual. Chamada nos processos filhos criados com fork, para que eles não repitam a sequência de números aleatórios do processo pai.
+    '''
+    thread_state.__dict__.pop('generator', None)
+    thread_state.__dict__.pop('stream_sampler', None)
+
+os.register_at_fork(after_in_child=reset_random_generator)
 
 
 def degrees_to_radians(degrees: float):
@@ -24,9 +41,37 @@ def degrees_to_radians(degrees: float):
     '''
     return degrees * pi / 180.0
 
+def random_generator() -> RandomPool:
+    '''
+    Retorna o gerador de números aleatórios da thread atual (criado na primeira chamada). Os números são sorteados em blocos (ver RandomPool).
+
+    ---
+
+    Retorno:
+
+        - RandomPool - Gerador de números aleatórios da thread.
+    '''
+    try:
+        return thread_state.generator
+    except AttributeError:
+        thread_state.generator = RandomPool()
+        return thread_state.generator
+
+def seed_random(seed: int):
+    '''
+    Define a semente do gerador de números aleatórios da thread atual (usado por random_double e, consequentemente, pelos vetores e materiais aleatórios).
+
+    ---
+
+    Parâmetros:
+
+        - seed: int - Semente.
+    '''
+    random_generator().seed(seed)
+
 def random_double():
     '''
-    Gera um número aleatório entre 0 e 1.
+    Gera um número aleatório entre 0 e 1, utilizando o gerador da thread atual. Se um fluxo de amostras estiver ativo na thread (start_random_stream), o número é a próxima dimensão da amostra atual.
 
     ---
 
@@ -34,7 +79,13 @@ def random_double():
 
         - float - Número aleatório entre 0 e 1.
     '''
-    return random.random()
+    sampler = getattr(thread_state, 'stream_sampler', None)
+    if sampler is None:
+        return random_generator().double()
+
+    dimension = thread_state.stream_dimension
+    thread_state.stream_dimension = dimension + 1
+    return sampler.sample(thread_state.stream_pixel_key, thread_state.stream_sample_number, dimension)
 
 def random_double_range(min: float, max: float):
     '''
@@ -54,3 +105,207 @@ def random_double_range(min: float, max: float):
         - float - Número aleatório entre min e max.
     '''
     return min + (max - min) * random_double()
+
+def random_unit_vector_array() -> np.ndarray:
+    '''
+    Gera um vetor unitário aleatório (uniforme na superfície da esfera unitária), lido do bloco pré-sorteado do gerador da thread atual. Se um fluxo de amostras estiver ativo, o vetor é calculado a partir das duas próximas dimensões da amostra.
+
+    ---
+
+    Retorno:
+
+        - np.ndarray - Array (3,) com o vetor (não deve ser modificado).
+    '''
+    if getattr(thread_state, 'stream_sampler', None) is None:
+        return random_generator().unit_vector()
+    return uniform_unit_vector(random_double(), random_double())
+
+def random_in_unit_sphere_array() -> np.ndarray:
+    '''
+    Gera um vetor aleatório dentro da esfera unitária (uniforme no volume), sem rejeição, lido do bloco pré-sorteado do gerador da thread atual. Se um fluxo de amostras estiver ativo, o vetor é calculado a partir das três próximas dimensões da amostra.
+
+    ---
+
+    Retorno:
+
+        - np.ndarray - Array (3,) com o vetor (não deve ser modificado).
+    '''
+    if getattr(thread_state, 'stream_sampler', None) is None:
+        return random_generator().in_unit_sphere()
+    direction = uniform_unit_vector(random_double(), random_double())
+    return direction * math.cbrt(random_double())
+
+
+# Números aleatórios baseados em contador: cada número é o hash (splitmix64) de uma chave e de um índice (dimensão), sem estado.
+# A chave de uma amostra é derivada de (semente, frame, pixel, amostra), então o número usado em cada ponto do caminho de um raio
+# não depende de qual worker renderizou o pixel, nem da ordem em que os pixels foram renderizados.
+MASK_64 = 0xFFFFFFFFFFFFFFFF
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+MIX_MULTIPLIER_1 = 0xBF58476D1CE4E5B9
+MIX_MULTIPLIER_2 = 0x94D049BB133111EB
+DOUBLE_UNIT = 2.0 ** -53
+
+def mix64(value: int) -> int:
+    '''
+    Função de mistura do splitmix64: embaralha os bits de um inteiro de 64 bits (é uma bijeção, então valores diferentes nunca colidem).
+
+    ---
+
+    Parâmetros:
+
+        - value: int - Inteiro de 64 bits.
+
+    ---
+
+    Retorno:
+
+        - int - Inteiro de 64 bits embaralhado.
+    '''
+    value = (value + GOLDEN_GAMMA) & MASK_64
+    value = ((value ^ (value >> 30)) * MIX_MULTIPLIER_1) & MASK_64
+    value = ((value ^ (value >> 27)) * MIX_MULTIPLIER_2) & MASK_64
+    return value ^ (value >> 31)
+
+def mix64_array(values: np.ndarray) -> np.ndarray:
+    '''
+    Versão vetorizada de mix64, para um array de np.uint64 (as operações dão a volta em 64 bits naturalmente).
+
+    ---
+
+    Parâmetros:
+
+        - values: np.ndarray - Array de np.uint64.
+
+    ---
+
+    Retorno:
+
+        - np.ndarray - Array de np.uint64 embaralhado.
+    '''
+    values = values + np.uint64(GOLDEN_GAMMA)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(MIX_MULTIPLIER_1)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(MIX_MULTIPLIER_2)
+    return values ^ (values >> np.uint64(31))
+
+def hash_key(key: int, *values: int) -> int:
+    '''
+    Combina uma chave com vários inteiros não negativos (ex: semente, frame, pixel, amostra), em ordem: para cada valor, key = mix64(key ^ valor).
+
+    ---
+
+    Parâmetros:
+
+        - key: int - Chave inicial de 64 bits.
+
+        - values: int - Inteiros a serem combinados com a chave.
+
+    ---
+
+    Retorno:
+
+        - int - Chave de 64 bits.
+    '''
+    for value in values:
+        key = mix64(key ^ (value & MASK_64))
+    return key
+
+def hash_keys(key, values: np.ndarray) -> np.ndarray:
+    '''
+    Versão vetorizada de hash_key: combina uma chave (ou um array de chaves) com cada elemento de um array de inteiros não negativos (o elemento k do resultado é hash_key(key, values[k]), ou hash_key(key[k], values[k])).
+
+    ---
+
+    Parâmetros:
+
+        - key: int | np.ndarray - Chave de 64 bits ou array de chaves (np.uint64).
+
+        - values: np.ndarray - Array de inteiros.
+
+    ---
+
+    Retorno:
+
+        - np.ndarray - Array de chaves (np.uint64).
+    '''
+    return mix64_array(np.asarray(key, dtype=np.uint64) ^ np.asarray(values).astype(np.uint64))
+
+def counter_double(key: int, dimension: int) -> float:
+    '''
+    Número aleatório entre 0 e 1 da dimensão dimension do fluxo identificado pela chave key.
+
+    ---
+
+    Parâmetros:
+
+        - key: int - Chave do fluxo (hash_key).
+
+        - dimension: int - Índice do número dentro do fluxo.
+
+    ---
+
+    Retorno:
+
+        - float - Número aleatório entre 0 e 1 (o mesmo para a mesma chave e dimensão).
+    '''
+    return (mix64(key ^ dimension) >> 11) * DOUBLE_UNIT
+
+def counter_doubles(keys: np.ndarray, dimension: int) -> np.ndarray:
+    '''
+    Versão vetorizada de counter_double: um número aleatório para cada chave, todos da mesma dimensão.
+
+    ---
+
+    Parâmetros:
+
+        - keys: np.ndarray - Array de chaves (np.uint64).
+
+        - dimension: int - Índice do número dentro dos fluxos.
+
+    ---
+
+    Retorno:
+
+        - np.ndarray - Array de números aleatórios entre 0 e 1.
+    '''
+    return (mix64_array(keys ^ np.uint64(dimension)) >> np.uint64(11)) * DOUBLE_UNIT
+
+def start_random_stream(sampler=None, pixel_key: int = 0, sample_number: int = 0):
+    '''
+    Ativa, na thread atual, o fluxo de números da amostra sample_number do pixel pixel_key: as próximas chamadas de random_double retornam as dimensões 0, 1, 2, ... dessa amostra, calculadas pelo amostrador (ver lib.samplers). Sem amostrador, volta a usar o gerador da thread.
+
+    ---
+
+    Parâmetros:
+
+        - sampler: Sampler - Amostrador, ou None para desativar o fluxo.
+
+        - pixel_key: int - Chave do pixel.
+
+        - sample_number: int - Índice da amostra dentro do pixel.
+    '''
+    thread_state.stream_sampler = sampler
+    thread_state.stream_pixel_key = pixel_key
+    thread_state.stream_sample_number = sample_number
+    thread_state.stream_dimension = 0
+
+
+def standard_error(count, total, squared_total):
+    '''
+    Calcula o erro padrão da média de um conjunto de amostras, a partir da soma e da soma dos quadrados das amostras. Funciona tanto com números quanto com arrays do NumPy (elemento a elemento).
+
+    ---
+
+    Parâmetros:
+
+        - count: int | np.ndarray - Quantidade de amostras (pelo menos 2).
+        - total: float | np.ndarray - Soma das amostras.
+        - squared_total: float | np.ndarray - Soma dos quadrados das amostras.
+
+    ---
+
+    Retorno:
+
+        - float | np.ndarray - Erro padrão da média (desvio padrão amostral dividido pela raiz da quantidade de amostras).
+    '''
+    variance = np.maximum(squared_total - total * total / count, 0.0) / (count - 1)
+    return np.sqrt(variance / count)
@@ -2,7 +2,7 @@
 from typing import Union
 import numpy as np
 from lib.vec.Vec import Vec
-from lib.utils import random_double_range, degrees_to_radians
+from lib.utils import random_double_range, random_unit_vector_array, random_in_unit_sphere_array, degrees_to_radians
 import math
 
 
@@ -561,13 +561,12 @@ class Vec3(Vec):
         '''
         return Vec3([random_double_range(min, max), random_double_range(min, max), random_double_range(min, max)])
     
-    # Não entendi o motivo de ficar sorteando várias vezes, pq não só sortear um e depois fazer o unitário (e talvez dividir ?)
-    # Talvez seja para não enviesar a probalidade (aumentando a probabilidade) de sair um vetor unitário em direção a um
-    # do cantos do cubo, já que a probabilidade disso acontecer é maior.
     @staticmethod
     def random_in_unit_sphere() -> 'Vec3':
         '''
-        Retorna um vetor aleatório dentro da esfera unitária.
+        Retorna um vetor aleatório dentro da esfera unitária (uniforme no volume).
+
+        O vetor é lido de um bloco pré-sorteado (ver lib.RandomPool), ao invés de sortear pontos no cubo [-1, 1]³ até que um caia dentro da esfera: o resultado tem a mesma distribuição, sem o laço de rejeição e sem criar um Vec3 por tentativa.
 
         Exemplo:
 
@@ -580,16 +579,12 @@ class Vec3(Vec):
 
             - Vec3 - Vetor aleatório dentro da esfera unitária.
         '''
-        while True:
-            p = Vec3.random_range(-1, 1)
-            if p.squared_length() >= 1:
-                continue
-            return p
+        return Vec3(random_in_unit_sphere_array())
 
     @staticmethod
     def random_unit_vector() -> 'Vec3':
         '''
-        Retorna um vetor aleatório unitário.
+        Retorna um vetor aleatório unitário (uniforme na superfície da esfera unitária).
 
         Exemplo:
 
@@ -602,7 +597,7 @@ class Vec3(Vec):
 
             - Vec3 - Vetor aleatório unitário.
         '''
-        return Vec3.random_in_unit_sphere().unit_vector()
+        return Vec3(random_unit_vector_array())
     
     @staticmethod
     def random_on_hemisphere(normal: 'Vec3') -> 'Vec3':
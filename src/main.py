@@ -4,14 +4,23 @@ Código principal para gerar a animação.
 Nele, você poderá escolher a quantidade de subprocessos que serão usados (para aproveitar ao máximo a CPU, mas, quão maior, mais utilizará do seu computador), qualidade da animação (diponíveis em resolutions.py) e os frames que serão gerados.
 '''
 
+# Quantidade máxima de pixels de um frame para que os frames sejam renderizados em paralelo inteiros (um frame por processo) ao invés de divididos em blocos
+FRAME_PARALLEL_MAX_PIXELS = 50_000
+
 if __name__ == '__main__':
     from Animation import Animation
     from time import time
     import os
     from resolutions import resolutions as possible_configs
+    from lib.JobDatabase import JobDatabase, DEFAULT_DATABASE
+    from lib.LeaseKeeper import LeaseKeeper
+    import socket
 
     qnt_threads = int(input('Número de threads a serem criadas (digite um número): '))
 
+    default_backend = 'serial' if qnt_threads == 1 else 'process'
+    backend = input(f'Backend de execução (serial, thread ou process) [{default_backend}]: ').strip().lower() or default_backend
+
     possible_configs_keys = list(possible_configs.keys())
 
     for i in range(len(possible_configs_keys)):
@@ -21,15 +30,45 @@ if __name__ == '__main__':
 
     config = possible_configs[possible_configs_keys[config_index]]
 
+    use_wavefront = input('Usar o integrador wavefront (vetorizado com NumPy)? [s/N]: ').strip().lower() == 's'
+    accelerator = input('Estrutura de aceleração dos objetos (bvh ou flat_bvh, a única usada pelo integrador wavefront; deixe vazio para testar todos os objetos em cada raio): ').strip().lower() or None
+    use_adaptive = input('Usar amostragem adaptativa (a quantidade de amostras da configuração passa a ser o máximo por pixel)? [s/N]: ').strip().lower() == 's'
+    samples_per_pass = None
+    if not use_adaptive:
+        samples_per_pass = input('Amostras por passada, para renderização progressiva com checkpoints (deixe vazio para desativar): ').strip()
+        samples_per_pass = int(samples_per_pass) if samples_per_pass else None
+
+    sampler = input('Amostrador (random ou sobol, quasi-Monte Carlo com menos ruído por amostra) [random]: ').strip().lower() or 'random'
+    seed = input('Semente dos números aleatórios, para frames reproduzíveis (deixe vazio para aleatória): ').strip()
+    seed = int(seed) if seed else None
+    save_aovs = input('Salvar as AOVs (normal, albedo, distância e identificadores do objeto e do material do primeiro acerto) de cada frame em frame_N_aovs.npz? [s/N]: ').strip().lower() == 's'
+    use_temporal = input('Reaproveitar as amostras dos frames anteriores (reprojeção temporal, permite bem menos amostras por frame; os frames são gerados em ordem)? [s/N]: ').strip().lower() == 's'
+    static_camera = input('Manter a câmera parada (apenas as esferas giram)? [s/N]: ').strip().lower() == 's'
+    use_dirty_regions = static_camera and not use_temporal and input('Re-renderizar apenas a região que mudou desde o frame anterior (esferas, suas sombras e os reflexos do cubo; os frames são gerados em ordem)? [s/N]: ').strip().lower() == 's'
+    use_denoiser = input('Usar o denoiser (remove o ruído guiado por normal, albedo e distância, permitindo menos amostras)? [s/N]: ').strip().lower() == 's'
+
     animation = Animation(
         image_width=config['image_width'],
         samples_per_pixel=config['samples_per_pixel'],
         max_depth=config['max_depth'],
-        num_cores=qnt_threads
+        num_cores=qnt_threads,
+        backend=backend,
+        wavefront=use_wavefront,
+        accelerator=accelerator,
+        adaptive=use_adaptive,
+        samples_per_pass=samples_per_pass,
+        seed=seed,
+        sampler=sampler,
+        denoise=use_denoiser,
+        save_aovs=save_aovs,
+        temporal=use_temporal,
+        static_camera=static_camera,
+        dirty_regions=use_dirty_regions
     )
 
     start_frame = int(input('Digite o frame inicial: '))
     end_frame = int(input('Digite o frame final: '))
+    use_job_database = input(f'Dividir os frames com outras máquinas (ou processos) pelo banco de tarefas {DEFAULT_DATABASE}? [s/N]: ').strip().lower() == 's'
 
     if not os.path.exists('animation_frames'):
         os.mkdir('animation_frames')
@@ -38,8 +77,38 @@ if __name__ == '__main__':
 
     cur_time = time()
 
-    for i in range(start_frame, end_frame + 1):
-        print(f'Gerando frame {i}...')
-        animation.generate_frame(i, f'animation_frames/{possible_configs_keys[config_index]}/frame_{i}.png')
+    frames = [(i, f'animation_frames/{possible_configs_keys[config_index]}/frame_{i}.png') for i in range(start_frame, end_frame + 1)]
+
+    # Sem o banco de tarefas, frames pequenos são renderizados inteiros em paralelo (um frame por processo), pois dividir cada frame em blocos entre os processos custa mais do que renderizá-lo
+    animation.camera.initialize()
+    pixels_per_frame = animation.camera.image_width * animation.camera.image_height
+    if use_job_database:
+        # Cada frame é reservado no banco antes de ser renderizado, então vários processos (em uma ou mais máquinas) podem dividir os mesmos frames
+        config_name = possible_configs_keys[config_index]
+        owner = f'{socket.gethostname()}:{os.getpid()}'
+        with JobDatabase(DEFAULT_DATABASE) as jobs, animation:
+            jobs.add_jobs(config_name, [i for i, _ in frames])
+            while (i := jobs.claim(config_name, owner, (start_frame, end_frame))) is not None:
+                print(f'Gerando frame {i}...')
+                frame_start_time = time()
+                try:
+                    with LeaseKeeper(jobs, config_name, i, owner) as lease:
+                        animation.generate_frame(i, jobs.frame_filename(config_name, i))
+                except BaseException:
+                    jobs.release(config_name, i, owner)
+                    raise
+                if lease.lost:
+                    # O frame pertence a outro processo, que o conclui
+                    print(f'A reserva do frame {i} expirou e ele foi reservado por outro processo: o frame não foi concluído por este processo.')
+                elif not jobs.complete(config_name, i, owner, time() - frame_start_time):
+                    print(f'O frame {i} não foi concluído: a imagem está incompleta (o frame voltou para a fila) ou a reserva foi perdida.')
+    elif qnt_threads > 1 and len(frames) > 1 and pixels_per_frame <= FRAME_PARALLEL_MAX_PIXELS and not use_temporal and not use_dirty_regions:
+        print(f'Frames pequenos ({pixels_per_frame} pixels): usando o modo paralelo por frame, com {qnt_threads} processos.')
+        animation.generate_frames_parallel(frames, qnt_threads)
+    else:
+        with animation:
+            for i, save_path in frames:
+                print(f'Gerando frame {i}...')
+                animation.generate_frame(i, save_path)
     
     print(f'Frames gerados em {time() - cur_time} segundos.')
\ No newline at end of file
@@ -0,0 +1,56 @@
+'''
+Testes dos executores (lib/executors).
+
+Devem ser executados a partir do repositório base, da seguinte forma: `python3 -m unittest discover -s src/tests -t src`
+'''
+
+import unittest
+import contextlib
+import io
+
+from Animation import Animation
+from lib.sinks.NullSink import NullSink
+
+
+def render_frames(backend: str, frames: int, accelerator: str = 'bvh', num_cores: int = 2) -> str:
+    '''
+    Renderiza os primeiros frames de uma animação pequena e retorna o que foi mostrado na saída padrão.
+    '''
+    output = io.StringIO()
+    animation = Animation(image_width=32, samples_per_pixel=1, max_depth=2, num_cores=num_cores, backend=backend, seed=1, sinks=[NullSink()], accelerator=accelerator)
+    with contextlib.redirect_stdout(output), animation:
+        for frame in range(frames):
+            animation.generate_frame(frame, None)
+    return output.getvalue()
+
+
+class TestAcceleratorStatistics(unittest.TestCase):
+
+    def test_process_backend_reports_statistics(self):
+        # Cada processo constrói a sua estrutura: as estatísticas devem ser juntadas e mostradas como nos demais backends
+        for backend in ['serial', 'thread', 'process']:
+            with self.subTest(backend=backend):
+                lines = [line for line in render_frames(backend, 1).splitlines() if line.startswith('Estrutura de aceleração')]
+                self.assertEqual(len(lines), 1)
+                self.assertIn('construída em', lines[0])
+                self.assertIn('nós visitados por raio', lines[0])
+                self.assertNotIn('(0 raios)', lines[0])
+
+    def test_process_backend_reports_refit(self):
+        # A partir do segundo frame, a estrutura do processo é reajustada, e o tempo do reajuste deve ser mostrado.
+        # Com um único processo, ele renderiza os dois frames (com mais processos, um processo que não renderizou o primeiro frame constrói a sua estrutura no segundo)
+        lines = [line for line in render_frames('process', 2, num_cores=1).splitlines() if line.startswith('Estrutura de aceleração')]
+        self.assertEqual(len(lines), 2)
+        self.assertIn('construída em', lines[0])
+        self.assertIn('reajustada em', lines[1])
+
+    def test_process_backend_rays_match_serial(self):
+        # Os raios de todos os processos são somados: com a mesma semente, são os mesmos raios do backend serial
+        def rays(output: str) -> str:
+            return [line for line in output.splitlines() if line.startswith('Estrutura de aceleração')][0].rsplit('(', 1)[1]
+
+        self.assertEqual(rays(render_frames('process', 1)), rays(render_frames('serial', 1)))
+
+
+if __name__ == '__main__':
+    unittest.main()